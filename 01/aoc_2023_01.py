@@ -7,7 +7,16 @@ Date   : 2023-12-01
 Purpose: Solves day 01 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.backends import map_chunks  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 1
 
 
 NUMBERS: Final[list[str]] = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
@@ -32,21 +41,31 @@ zoneight234
 
 def load_data(filename: str):
     """Load inpit file."""
-    with open(filename, 'rt', encoding='utf-8') as file:
+    with open_input(filename) as file:
         return file.readlines()
 
 
-def part_01(data) -> str:
-    """Solves part 01"""
+def parse(data) -> list[str]:
+    """Parse input into calibration lines."""
+    return [line.rstrip() for line in data]
+
+
+def solve_01(lines: list[str]) -> str:
+    """Solves part 01 on parsed input."""
     return str(
         sum(
             build_number(
-                list(filter(lambda x: x.isdigit(), line.rstrip()))
-            ) for line in data
+                list(filter(lambda x: x.isdigit(), line))
+            ) for line in lines
         )
     )
 
 
+def part_01(data) -> str:
+    """Solves part 01"""
+    return solve_01(parse(data))
+
+
 def replace_first_and_last(data: str) -> str:
     """Recursion step to replace next number by digit."""
     idx: tuple[int, int] = (-1, -1)
@@ -85,18 +104,44 @@ def build_number(numbers: list[int]) -> int:
     return int(f"{numbers[0]}{numbers[-1]}")
 
 
-def part_02(data) -> str:
-    """solves part 02"""
+def solve_02(lines: list[str]) -> str:
+    """Solves part 02 on parsed input."""
     return str(
         sum(
             build_number(
                 list(filter(lambda x: x.isdigit(),
-                            replace_first_and_last(line.rstrip())))
-            ) for line in data
+                            replace_first_and_last(line)))
+            ) for line in lines
         )
     )
 
 
+def part_02(data) -> str:
+    """solves part 02"""
+    return solve_02(parse(data))
+
+
+def solve_both(lines: list[str]) -> tuple[str, str]:
+    """Solves both parts on parsed input."""
+    return solve_01(lines), solve_02(lines)
+
+
+def solve_01_parallel(lines: list[str]) -> str:
+    """Solves part 01 on chunks of lines in a process pool."""
+    return str(sum(map(int, map_chunks(solve_01, lines))))
+
+
+def solve_02_parallel(lines: list[str]) -> str:
+    """Solves part 02 on chunks of lines in a process pool."""
+    return str(sum(map(int, map_chunks(solve_02, lines))))
+
+
+BACKENDS: Final = {1: {'pure': solve_01, 'parallel': solve_01_parallel},
+                   2: {'pure': solve_02, 'parallel': solve_02_parallel}}
+
+BACKEND_THRESHOLDS: Final = {'parallel': None}  # never paid off on one cpu, 'python -m aoc bench --calibrate' finds out
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -110,6 +155,16 @@ def test_part_02():
     assert '281' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('142', '142') == solve_both(parse(TEST_DATA.split()))
+
+
+def test_parallel():
+    """Tests chunked parallel parts"""
+    assert ('142', '281') == (solve_01_parallel(parse(TEST_DATA.split())), solve_02_parallel(parse(TEST_DATA_2.split())))
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,10 +7,18 @@ Date   : 2023-12-02
 Purpose: Solves day 02 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final
 from dataclasses import dataclass
 from functools import reduce
 from operator import mul
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 1
 
 
 TEST_DATA: Final = """Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green
@@ -71,7 +79,7 @@ class Game:
 # --------------------------------------------------
 def load_data(filename: str):
     """Load input from file."""
-    with open(filename, 'rt', encoding='utf-8') as file:
+    with open_input(filename) as file:
         return file.readlines()
 
 
@@ -80,9 +88,18 @@ def parse_game(data) -> list[Game]:
     return [Game.from_str(line) for line in data]
 
 
+def parse(data) -> list[Game]:
+    """Parse input once for both parts."""
+    return parse_game(data)
+
+
 def part_01(data) -> str:
     """Solves part 01"""
-    games = parse_game(data)
+    return solve_01(parse(data))
+
+
+def solve_01(games: list[Game]) -> str:
+    """Solves part 01 on parsed games."""
     valid_game = {'red': 12, 'green': 13, 'blue': 14}
 
     return str(
@@ -95,8 +112,11 @@ def part_01(data) -> str:
 
 def part_02(data) -> str:
     """solves part 02"""
-    games = parse_game(data)
+    return solve_02(parse(data))
+
 
+def solve_02(games: list[Game]) -> str:
+    """Solves part 02 on parsed games."""
     return str(
         sum(
             reduce(mul, game.min_bag_size().values())
@@ -104,6 +124,11 @@ def part_02(data) -> str:
         )
 
 
+def solve_both(games: list[Game]) -> tuple[str, str]:
+    """Solves both parts on parsed games."""
+    return solve_01(games), solve_02(games)
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -117,6 +142,11 @@ def test_part_02():
     assert '2286' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('8', '2286') == solve_both(parse(TEST_DATA.split("\n")))
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,10 +7,19 @@ Date   : 2023-12-03
 Purpose: Solves day 03 from advent of code 2023.
 """
 
-from typing import Final, Optional
-from functools import reduce
-from operator import mul
+from pathlib import Path
+from typing import Final
+from dataclasses import dataclass, field
 import re
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc import metrics  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.grid import Grid  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 2
 
 
 TEST_DATA: Final = """467..114..
@@ -25,76 +34,87 @@ TEST_DATA: Final = """467..114..
 .664.598.."""
 
 
-REGEX_NUMBER: Final[re.Pattern] = re.compile(r'\d+')
+REGEX_NUMBER: Final[re.Pattern] = re.compile(rb'\d+')
 
+# every byte but '.' and the digits 1-9 counts as sign
+SIGNS: Final[bytes] = bytes(0 if byte in b'.123456789' else 1 for byte in range(256))
+
+GEAR: Final[int] = ord('*')
 
-# --------------------------------------------------
-def load_data(filename: str):
-    """Load input data."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
 
+@dataclass
+class Schematic:
+    """Engine schematic with the numbers found in it."""
+    grid: Grid
+    findings: list[tuple[int, int, int]] = field(default_factory=list)  # flat index, length, number
 
-def surrounds(j: int, i: int, finding: str, width: int, signs: list[tuple[int, int]]) -> bool:
-    """Check if finding at given coordinate 'touches' a sign given by list."""
-    for y in range(j-1, j+2):
-        for x in range(i-1, i+len(finding)+1):
-            if y < 0 or x < 0 or x == width:  # skip out of bounds
-                continue
-            if y == j and x in range(i, i + len(finding)):  # skip finding digits
-                continue
-            if (y, x) in signs:
-                return True
-    return False
+    def __post_init__(self) -> None:
+        if not self.findings:
+            self.findings = [(finding.start(), finding.end() - finding.start(), int(finding.group()))
+                             for finding in self.grid.finditer(REGEX_NUMBER)]
 
 
-def get_signs(data, restrict: Optional[str] = None) -> list[tuple[int, int]]:
-    """Find 'sign' elements in input data, optionally restrict to certain sign."""
-    signs = []
+# --------------------------------------------------
+def load_data(filename: str):
+    """Load input data."""
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
 
-    for j, line in enumerate(data):
-        for i, char in enumerate(line):
-            if restrict:
-                if restrict == char:
-                    signs.append((j, i))
-            elif char not in ['.', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                signs.append((j, i))
 
-    return signs
+def parse(data) -> Schematic:
+    """Parse schematic and locate its numbers once for both parts."""
+    return Schematic(grid=Grid.from_lines(line.rstrip() for line in data))
 
 
 def part_01(data) -> str:
     """Solves part 01"""
-    width = len(data[0])
+    return solve_01(parse(data))
+
+
+def solve_01(model: Schematic) -> str:
+    """Solves part 01 on parsed schematic."""
     schematic = 0
-    signs = get_signs(data)
+    cells, grid = model.grid.data, model.grid
+    counting, probes = metrics.ENABLED, 0
 
-    for j, line in enumerate(data):
-        for finding in REGEX_NUMBER.finditer(line):
-            if surrounds(j, finding.start(), finding.group(), width, signs):
-                schematic += int(finding.group())
+    for index, length, number in model.findings:
+        border = grid.border(index, length)
+        if counting:
+            probes += len(border)
+        if any(SIGNS[cells[cell]] for cell in border):
+            schematic += number
 
+    metrics.add('neighbour_probes', probes)
     return str(schematic)
 
 
 def part_02(data) -> str:
     """solves part 02"""
-    signs = get_signs(data, '*')
-    width = len(data[0])
-    findings = []
+    return solve_02(parse(data))
+
+
+def solve_02(model: Schematic) -> str:
+    """Solves part 02 on parsed schematic."""
+    cells, grid = model.grid.data, model.grid
+    adjacent: dict[int, list[int]] = {}  # gear index, numbers around
+    counting, probes = metrics.ENABLED, 0
+
+    for index, length, number in model.findings:
+        border = grid.border(index, length)
+        if counting:
+            probes += len(border)
+        for cell in border:
+            if cells[cell] == GEAR:
+                adjacent.setdefault(cell, []).append(number)
 
-    for j, line in enumerate(data):
-        for finding in REGEX_NUMBER.finditer(line):
-            if surrounds(j, finding.start(), finding.group(), width, signs):
-                findings.append((j, finding.start(), finding.group()))
+    metrics.add('neighbour_probes', probes)
 
-    gear_ratios = 0
-    for sign in signs:
-        adj = list(filter(lambda x: surrounds(x[0], x[1], x[2], width, [sign]), findings))
-        if len(adj) == 2:
-            gear_ratios += reduce(mul, map(lambda x: int(x[2]), adj))
+    return str(sum(numbers[0] * numbers[1] for numbers in adjacent.values() if len(numbers) == 2))
 
-    return str(gear_ratios)
+
+def solve_both(model: Schematic) -> tuple[str, str]:
+    """Solves both parts on parsed schematic."""
+    return solve_01(model), solve_02(model)
 
 
 # --------------------------------------------------
@@ -110,6 +130,18 @@ def test_part_02():
     assert '467835' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('4361', '467835') == solve_both(parse(TEST_DATA.split('\n')))
+
+
+def test_metrics():
+    """Tests neighbour probes get counted"""
+    with metrics.collecting() as counts:
+        solve_02(parse(TEST_DATA.split('\n')))
+    assert {'neighbour_probes': 10 * 6 + 2 * 28} == counts  # 2 rows and 2 ends around 10 numbers of 28 digits
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
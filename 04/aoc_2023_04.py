@@ -7,8 +7,19 @@ Date   : 2023-12-04
 Purpose: Solves day 04 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final
 from dataclasses import dataclass
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.tokens import first_line, tokenize  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 2
+
+PARSE_BYTES: Final = True  # parse() takes raw input bytes as well
 
 
 TEST_DATA: Final = """Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53
@@ -50,26 +61,77 @@ class Card:
         return len(set(self.winning).intersection(set(self.numbers)))
 
 
+@dataclass
+class Pile:
+    """All cards with their amount of matching numbers, computed once."""
+    cards: list[Card]
+    matches: dict[int, int]
+
+    @staticmethod
+    def from_cards(cards: list[Card]) -> "Pile":
+        """Count matches of every card."""
+        return Pile(cards=cards, matches={card.index: card.matchings() for card in cards})
+
+
 # --------------------------------------------------
 def load_data(filename: str):
     """Load input data."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
+
+
+def parse(data) -> Pile:
+    """Parse cards and count their matches once for both parts.
+
+    All cards hold equally many numbers, the first line tells how many of them are winning."""
+    first = first_line(data)
+    if not first:
+        return Pile.from_cards([])
+    winning = len(tokenize(first[:first.index('|')]).values) - 1
+    table = [row for row in tokenize(data).rows() if row]
+    if len({len(row) for row in table}) != 1:
+        raise ValueError("cards hold different amounts of numbers")
+    return Pile.from_cards([Card(index=row[0], winning=row[1:1 + winning], numbers=row[1 + winning:])
+                            for row in table])
 
 
 def part_01(data) -> str:
     """Solves part 01"""
-    return str(sum(Card.from_line(line).worth() for line in data))
+    return solve_01(parse(data))
+
+
+def solve_01(pile: Pile) -> str:
+    """Solves part 01 on parsed cards."""
+    return str(sum(pow(2, matches - 1) for matches in pile.matches.values() if matches))
 
 
 def part_02(data) -> str:
     """solves part 02"""
+    return solve_02(parse(data))
+
 
-    lookup = {}
-    for line in data:
-        card = Card.from_line(line)
-        lookup[card.index] = card.matchings()
+def solve_02(pile: Pile) -> str:
+    """Solves part 02 on parsed cards.
 
+    Counts copies per card instead of listing every copy, each card adds its
+    copies to the cards it wins."""
+    copies = {card_no: 1 for card_no in pile.matches}
+
+    for card_no, matches in pile.matches.items():
+        for index in range(card_no + 1, card_no + 1 + matches):
+            copies[index] = copies.get(index, 0) + copies[card_no]
+
+    return str(sum(copies.values()))
+
+
+def part_02_reference(data) -> str:
+    """Solves part 02 with the reference engine."""
+    return solve_02_reference(parse(data))
+
+
+def solve_02_reference(pile: Pile) -> str:
+    """Solves part 02 on parsed cards by listing every copy, quadratic in the number of copies."""
+    lookup = pile.matches
     cards = []
 
     for card_no, matches in lookup.items():
@@ -83,6 +145,14 @@ def part_02(data) -> str:
     return str(len(cards))
 
 
+def solve_both(pile: Pile) -> tuple[str, str]:
+    """Solves both parts on parsed cards."""
+    return solve_01(pile), solve_02(pile)
+
+
+ENGINES: Final = {2: {'reference': part_02_reference, 'fast': part_02}}
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -96,6 +166,16 @@ def test_part_02():
     assert '30' == part_02(data)
 
 
+def test_part_02_reference():
+    """Tests reference engine of part 02"""
+    assert '30' == part_02_reference(TEST_DATA.split('\n'))
+
+
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('13', '30') == solve_both(parse(TEST_DATA.split('\n')))
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,9 +7,23 @@ Date   : 2023-12-05
 Purpose: Solves day 05 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final, Optional
 from dataclasses import dataclass
-from tqdm import tqdm as tq
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc import metrics  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.progress import Progress  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.tokens import tokenize  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 2
+
+PARSE_BYTES: Final = True  # parse() takes raw input bytes as well
+
+CHUNK: Final = 4096  # seeds converted between progress updates
 
 
 TEST_DATA: Final = """seeds: 79 14 55 13
@@ -70,17 +84,51 @@ class Map:
 
     def convert(self, number: int) -> int:
         """Check if number is in range, copy otherwise."""
-        for entry in self.map:
+        for scanned, entry in enumerate(self.map, 1):
             if entry.source_start <= number < (entry.source_start + entry.range_length):
+                if metrics.ENABLED:
+                    self.count(scanned)
                 return number - entry.source_start + entry.destination_start
+        if metrics.ENABLED:
+            self.count(len(self.map))
         return number
 
+    @staticmethod
+    def count(scanned: int) -> None:
+        """Count a conversion and the entries it scanned."""
+        metrics.add('map_convert_calls')
+        metrics.add('map_entries_scanned', scanned)
+
+    def convert_ranges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Convert half open ranges, split where they cross entry borders."""
+        converted, pending = [], ranges
+        for entry in self.map:
+            source_end = entry.source_start + entry.range_length
+            shift = entry.destination_start - entry.source_start
+            unmatched = []
+            for start, end in pending:
+                low, high = max(start, entry.source_start), min(end, source_end)
+                if low < high:
+                    converted.append((low + shift, high + shift))
+                    unmatched += [(a, b) for a, b in ((start, low), (high, end)) if a < b]
+                else:
+                    unmatched.append((start, end))
+            pending = unmatched
+        return converted + pending
+
+
+@dataclass
+class Almanac:
+    """Seeds and the chain of maps to push them through."""
+    seeds: list[int]
+    maps: list[Map]
+
 
 # --------------------------------------------------
 def load_data(filename: str):
     """Load lines from input."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
 
 
 def chunks(data: list[int], chunk_size: int):
@@ -97,61 +145,101 @@ def convert(number: int, maps: list[Map]) -> int:
 
 
 def parse_input(data):
-    """Parse maps from data."""
-    _, items = data[0].split(":")
-    seeds: list[int] = list(map(int, items.strip().split()))
+    """Parse maps from data, any amount of maps separated by empty lines.
+
+    Every run of lines holding three numbers is a map, headers and empty lines hold none."""
+    tokens = tokenize(data, negative=False)
+    seeds: list[int] = tokens.line(0).tolist()
 
     maps: list[Map] = []
+    counts, offsets = tokens.counts().tolist(), tokens.offsets.tolist()
+    entries = tokens.values.tolist()
+
+    for line, count in enumerate(counts[1:], 1):
+        if count != 3:
+            continue
+        if counts[line - 1] != 3:
+            maps.append(Map(map=[]))
+        start = offsets[line]
+        dst_start, src_start, length = entries[start:start + 3]
+        maps[-1].map.append(Entry(destination_start=dst_start, source_start=src_start, range_length=length))
 
-    # start = 3
-    start = 0
-    end = 1
+    return seeds, maps
 
-    for i in range(7):
-        start += end + 2
-        if i != 6:  # ignore end calculation on last entry
-            end = (data[start:]).index("")
-        maps.append(Map(map=[Entry.from_line(line) for line in data[start:start+end]]))
 
-    return seeds, maps
+def parse(data) -> Almanac:
+    """Parse input once for both parts."""
+    seeds, maps = parse_input(data)
+    return Almanac(seeds=seeds, maps=maps)
 
 
 def part_01(data) -> str:
     """Solves part 01"""
-    seeds, maps = parse_input(data)
+    return solve_01(parse(data))
+
+
+def solve_01(almanac: Almanac) -> str:
+    """Solves part 01 on parsed almanac."""
+    seeds, maps = almanac.seeds, almanac.maps
 
-    return str(
-        min(
-            (  # generator
-                convert(seed, maps) for seed in tq(seeds, total=len(seeds))
-            )
-        )
-    )
+    return str(min(convert(seed, maps) for seed in seeds))
 
 
 def part_02(data) -> str:
     """solves part 02"""
-    seeds, maps = parse_input(data)
+    return solve_02(parse(data))
+
 
-    seed_pairs = chunks(seeds, 2)
+def solve_02(almanac: Almanac) -> str:
+    """Solves part 02 on parsed almanac.
+
+    Pushes whole seed ranges through the maps, the work depends on the number
+    of map entries and range pieces, not on the amount of seeds."""
+    seeds, maps = almanac.seeds, almanac.maps
+
+    ranges = [(pair[0], pair[0] + pair[1]) for pair in chunks(seeds, 2) if pair[1] > 0]
+    for item in maps:
+        ranges = item.convert_ranges(ranges)
+
+    return str(min((start for start, _ in ranges), default=None))
+
+
+def part_02_reference(data) -> str:
+    """Solves part 02 with the reference engine."""
+    return solve_02_reference(parse(data))
+
+
+def solve_02_reference(almanac: Almanac) -> str:
+    """Solves part 02 on parsed almanac by converting every single seed."""
+    seeds, maps = almanac.seeds, almanac.maps
+
+    seed_pairs = list(chunks(seeds, 2))
 
     lowest: Optional[int] = None
 
-    for pair in tq(seed_pairs, total=(len(seeds) / 2), position=0):
-        idx = pair[0]
-        with tq(total=pair[1], position=1, leave=False) as inner_bar:
-            while idx < pair[0] + pair[1]:
-                result = convert(idx, maps)
-                if lowest:
-                    lowest = min(lowest, result)
-                else:
-                    lowest = result
-                idx += 1
-                inner_bar.update(1)
+    with Progress(total=sum(pair[1] for pair in seed_pairs), desc='seed ranges') as bar:
+        for pair in seed_pairs:
+            for start in range(pair[0], pair[0] + pair[1], CHUNK):
+                stop = min(start + CHUNK, pair[0] + pair[1])
+                for idx in range(start, stop):
+                    result = convert(idx, maps)
+                    if lowest is not None:
+                        lowest = min(lowest, result)
+                    else:
+                        lowest = result
+                bar.update(stop - start)
 
     return str(lowest)
 
 
+def solve_both(almanac: Almanac) -> tuple[str, str]:
+    """Solves both parts on parsed almanac."""
+    return solve_01(almanac), solve_02(almanac)
+
+
+ENGINES: Final = {2: {'reference': part_02_reference, 'fast': part_02}}
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -165,11 +253,34 @@ def test_part_02():
     assert '46' == part_02(data)
 
 
+def test_part_02_reference():
+    """Tests reference engine of part 02"""
+    assert '46' == part_02_reference(TEST_DATA.split('\n'))
+
+
+def test_metrics():
+    """Tests conversions and scanned entries get counted"""
+    almanac = parse(TEST_DATA.split('\n'))
+    with metrics.collecting() as counts:
+        solve_01(almanac)
+    assert 4 * 7 == counts['map_convert_calls'] < counts['map_entries_scanned'] <= 4 * sum(len(item.map) for item in almanac.maps)
+    twice = Map(map=[Entry(destination_start=0, source_start=10, range_length=5)] * 2)
+    with metrics.collecting() as counts:
+        twice.convert(10)
+        twice.convert(20)
+    assert {'map_convert_calls': 2, 'map_entries_scanned': 1 + 2} == counts
+
+
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('35', '46') == solve_both(parse(TEST_DATA.split('\n')))
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
-    # data = load_data('./05/input')
-    data = TEST_DATA.split('\n')
+    data = load_data('./05/input')
+    # data = TEST_DATA.split('\n')
     print(part_01(data))
     print(part_02(data))
 
@@ -7,11 +7,22 @@ Date   : 2023-12-06
 Purpose: Solves day 06 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final
 from dataclasses import dataclass
 from functools import reduce
 from operator import mul
 import math
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.tokens import tokenize  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 2
+
+PARSE_BYTES: Final = True  # parse() takes raw input bytes as well
 
 
 TEST_DATA: Final = """Time:      7  15   30
@@ -36,14 +47,14 @@ def solve(time: int, distance: int) -> tuple[float, float]:
 # --------------------------------------------------
 def load_data(filename: str):
     """Load data from input."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
 
 
-def parse_input(data: list[str]) -> list[Race]:
+def parse_input(data) -> list[Race]:
     """Parse races out of input."""
-    times = map(int, data[0].split(':')[1].strip().split())
-    durations = map(int, data[1].split(':')[1].strip().split())
+    tokens = tokenize(data, negative=False)
+    times, durations = tokens.line(0).tolist(), tokens.line(1).tolist()
 
     return [Race(time=x[0], duration=x[1]) for x in zip(times, durations)]
 
@@ -59,10 +70,18 @@ def interval(boundaries: tuple[float, float]) -> int:
     )
 
 
+def parse(data) -> list[Race]:
+    """Parse input once for both parts."""
+    return parse_input(data)
+
+
 def part_01(data) -> str:
     """Solves part 01"""
-    races = parse_input(data)
+    return solve_01(parse(data))
 
+
+def solve_01(races: list[Race]) -> str:
+    """Solves part 01 on parsed races."""
     return str(
         reduce(mul, [interval(solve(race.time, race.duration)) for race in races])
     )
@@ -70,8 +89,11 @@ def part_01(data) -> str:
 
 def part_02(data) -> str:
     """solves part 02"""
-    races = parse_input(data)
+    return solve_02(parse(data))
+
 
+def solve_02(races: list[Race]) -> str:
+    """Solves part 02 on parsed races."""
     # fix wrongly parsed race input
     time = int("".join(map(str, map(lambda x: x.time, races))))
     duration = int("".join(map(str, map(lambda x: x.duration, races))))
@@ -81,6 +103,11 @@ def part_02(data) -> str:
     )
 
 
+def solve_both(races: list[Race]) -> tuple[str, str]:
+    """Solves both parts on parsed races."""
+    return solve_01(races), solve_02(races)
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -94,6 +121,11 @@ def test_part_02():
     assert '71503' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('288', '71503') == solve_both(parse(TEST_DATA.split('\n')))
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,9 +7,21 @@ Date   : 2023-12-07
 Purpose: Solves day 07 from advent of code 2023.
 """
 
+from pathlib import Path
 from typing import Final
 from enum import Enum
 from collections import Counter
+from functools import cmp_to_key
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc import metrics  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 1
+
+BENCH_SIZES: Final = (1, 10, 100, 371)  # 371000 of the 13 ** 5 distinct hands
 
 
 TEST_DATA: Final = """32T3K 765
@@ -36,6 +48,10 @@ RANK: Final[dict[str, int]] = {
 }
 
 
+# 'J' is a joker in part 2 and the weakest card
+RANK_JOKER: Final[dict[str, int]] = {**RANK, 'J': 1}
+
+
 class HandType(Enum):
     """Define your Hand."""
     HIGH_CARD = 1
@@ -92,6 +108,7 @@ class Hand:
     def __init__(self, cards: str, bid: int, use_joker: bool = False) -> None:
         self.cards = cards
         self.bid = bid
+        self.rank = RANK_JOKER if use_joker else RANK
         if use_joker:
             self.type = Hand.strength_joker(cards)
         else:
@@ -101,8 +118,8 @@ class Hand:
         """Compare hands against each other."""
         if self.type == other.type:
             for i in range(5):
-                if RANK[self.cards[i]] != RANK[other.cards[i]]:
-                    return RANK[self.cards[i]] < RANK[other.cards[i]]
+                if self.rank[self.cards[i]] != self.rank[other.cards[i]]:
+                    return self.rank[self.cards[i]] < self.rank[other.cards[i]]
             raise ValueError("illegal")  # Failure state
         return self.type.value < other.type.value
 
@@ -135,13 +152,38 @@ class Hand:
 # --------------------------------------------------
 def load_data(filename: str):
     """Load input from file."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
+
+
+def parse(data) -> list[tuple[str, int]]:
+    """Parse cards and bids once, hands are rated differently per part."""
+    return [(cards, int(bid)) for cards, bid in map(str.split, data)]
+
+
+def sort_hands(hands: list[Hand]) -> list[Hand]:
+    """Sort hands by rank, counting comparisons while metrics are collected."""
+    if not metrics.ENABLED:
+        return sorted(hands)
+    comparisons = 0
+
+    def compare(first: Hand, second: Hand) -> int:
+        nonlocal comparisons
+        comparisons += 1
+        return -1 if first < second else 1
+    ranked = sorted(hands, key=cmp_to_key(compare))
+    metrics.add('sort_comparisons', comparisons)
+    return ranked
 
 
 def part_01(data) -> str:
     """Solves part 01."""
-    hands = sorted([Hand.from_line(line=line) for line in data])
+    return solve_01(parse(data))
+
+
+def solve_01(table: list[tuple[str, int]]) -> str:
+    """Solves part 01 on parsed cards and bids."""
+    hands = sort_hands([Hand(cards=cards, bid=bid) for cards, bid in table])
 
     return str(
         sum(
@@ -152,9 +194,12 @@ def part_01(data) -> str:
 
 def part_02(data) -> str:
     """solves part 02."""
-    # we need to pimp 'J's score, yes, that's really direty
-    RANK['J'] = 1
-    hands = sorted([Hand.from_line(line=line, use_joker=True) for line in data])
+    return solve_02(parse(data))
+
+
+def solve_02(table: list[tuple[str, int]]) -> str:
+    """Solves part 02 on parsed cards and bids."""
+    hands = sort_hands([Hand(cards=cards, bid=bid, use_joker=True) for cards, bid in table])
 
     return str(
         sum(
@@ -163,6 +208,11 @@ def part_02(data) -> str:
     )
 
 
+def solve_both(table: list[tuple[str, int]]) -> tuple[str, str]:
+    """Solves both parts on parsed cards and bids."""
+    return solve_01(table), solve_02(table)
+
+
 # --------------------------------------------------
 def test_part_01():
     """Tests part 01"""
@@ -176,6 +226,18 @@ def test_part_02():
     assert '5905' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('6440', '5905') == solve_both(parse(TEST_DATA.split('\n')))
+
+
+def test_metrics():
+    """Tests sorting counts comparisons and ranks the same"""
+    with metrics.collecting() as counts:
+        assert '6440' == solve_01(parse(TEST_DATA.split('\n')))
+    assert 4 <= counts['sort_comparisons'] <= 10
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,9 +7,23 @@ Date   : 2023-12-08
 Purpose: Solves day 08 from advent of code 2023.
 """
 
-from typing import Final, Any, Generator
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Any, Generator, Optional
+from dataclasses import dataclass
 from functools import reduce
+import os
 import re
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc import metrics  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+PARSER_VERSION: Final = 1
 
 
 LINE_REGEX: Final[re.Pattern] = re.compile(r'^([0-9A-Z]{3})\ =\ \(([0-9A-Z]{3}),\ ([0-9A-Z]{3})\)$')
@@ -69,11 +83,18 @@ def lowest_common_multiplier_many(args: list[int]) -> int:
     return reduce(lowest_common_multiplier, args)
 
 
+@dataclass
+class Network:
+    """Instructions and routing nodes."""
+    instructions: str
+    nodes: dict[str, tuple[str, str]]
+
+
 # --------------------------------------------------
 def load_data(filename: str):
     """Load lines from input data."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
 
 
 def parse_nodes(data: list[str]) -> dict[str, tuple[str, str]]:
@@ -97,11 +118,19 @@ def instruction_generator(instructions: str) -> Generator[str, Any, None]:
             yield instruction
 
 
+def parse(data) -> Network:
+    """Parse input once for both parts."""
+    return Network(instructions=data[0].rstrip(), nodes=parse_nodes(data[2:]))
+
+
 def part_01(data) -> str:
     """Solves part 01"""
-    instructions = data[0]
+    return solve_01(parse(data))
+
 
-    nodes = parse_nodes(data[2:])
+def solve_01(network: Network) -> str:
+    """Solves part 01 on parsed network."""
+    instructions, nodes = network.instructions, network.nodes
     key = 'AAA'
 
     for count, instruction in enumerate(instruction_generator(instructions), start=1):
@@ -118,11 +147,86 @@ def find_path_length(key: str, instructions: str, nodes: dict[str, tuple[str, st
     for count, instruction in enumerate(instruction_generator(instructions), start=1):
         value = nodes[key][MAP_INST_TO_IDX[instruction]]
         if value[2] == 'Z':
+            metrics.add('path_steps', count)
             return count
         key = value
     return 0  # just to get rid of pylints R1710
 
 
+@dataclass
+class LockstepSimulator:
+    """Brute force simulation of all ghosts walking the network in lockstep.
+
+    Nodes are compiled to integer indices, so all ghost positions live in one
+    array. One full pass over the instructions is precomputed for every node,
+    thus each iteration advances all ghosts by a whole instruction cycle and
+    checks every intermediate step for all ghosts sitting on a Z node at once.
+    """
+    trajectory: "np.ndarray"  # position after k + 1 steps of a cycle, shape (len(instructions), nodes)
+    on_target: "np.ndarray"   # trajectory mapped to 'node ends with Z', same shape
+    starts: "np.ndarray"      # start node indices of all ghosts
+
+    @staticmethod
+    def compile(instructions: str, nodes: dict[str, tuple[str, str]], start_suffix: str = 'A',
+                target_suffix: str = 'Z') -> "LockstepSimulator":
+        """Compile parsed nodes into left/right index tables and precompute one cycle."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        names = list(nodes)
+        index = {name: i for i, name in enumerate(names)}
+        table = np.array([[index[nodes[name][side]] for name in names] for side in range(2)], dtype=np.int32)
+        is_target = np.array([name.endswith(target_suffix) for name in names], dtype=bool)
+
+        positions = np.arange(len(names), dtype=np.int32)
+        trajectory = np.empty((len(instructions), len(names)), dtype=np.int32)
+        for step, instruction in enumerate(instructions):
+            positions = table[MAP_INST_TO_IDX[instruction], positions]
+            trajectory[step] = positions
+
+        return LockstepSimulator(
+            trajectory=trajectory,
+            on_target=is_target[trajectory],
+            starts=np.array([index[name] for name in names if name.endswith(start_suffix)], dtype=np.int32))
+
+    def run(self, max_steps: int = 10 ** 9, checkpoint: Optional[str] = None,
+            checkpoint_every: int = 100_000) -> Optional[int]:
+        """Walk until all ghosts stand on a target node, None if step budget is exhausted.
+
+        If a checkpoint file is given, the state is written to it every
+        'checkpoint_every' cycles and an existing checkpoint is resumed from."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        cycle_length = len(self.trajectory)
+        cycle, positions = 0, self.starts
+        if checkpoint and os.path.isfile(checkpoint):
+            cycle, positions = self.load_checkpoint(checkpoint)
+
+        while cycle * cycle_length < max_steps:
+            hits = np.flatnonzero(self.on_target[:, positions].all(axis=1))
+            if hits.size:
+                steps = cycle * cycle_length + int(hits[0]) + 1
+                return steps if steps <= max_steps else None
+            positions = self.trajectory[-1, positions]
+            cycle += 1
+            if checkpoint and cycle % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint, cycle, positions)
+
+        return None
+
+    def save_checkpoint(self, filename: str, cycle: int, positions: "np.ndarray") -> None:
+        """Store simulation state, written to a temporary file first to survive interrupts."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        with open(filename + '.tmp', 'wb') as file:
+            np.savez(file, starts=self.starts, cycle=cycle, positions=positions)
+        os.replace(filename + '.tmp', filename)
+
+    def load_checkpoint(self, filename: str) -> tuple[int, "np.ndarray"]:
+        """Restore simulation state, refuse checkpoints of another map."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        with np.load(filename) as state:
+            if not np.array_equal(state['starts'], self.starts):
+                raise ValueError("checkpoint does not belong to this map")
+            return int(state['cycle']), state['positions']
+
+
 def part_02(data) -> str:
     """Solves part 2.
 
@@ -130,8 +234,12 @@ def part_02(data) -> str:
     terminating value in it's path, so the problem reduces in finding the lowest
     common multiplyer.
     """
-    instructions = data[0]
-    nodes = parse_nodes(data[2:])
+    return solve_02(parse(data))
+
+
+def solve_02(network: Network) -> str:
+    """Solves part 02 on parsed network."""
+    instructions, nodes = network.instructions, network.nodes
     node_keys = [key for key in nodes if key[2] == 'A']
 
     path_lengths = [find_path_length(key, instructions, nodes) for key in node_keys]
@@ -139,24 +247,22 @@ def part_02(data) -> str:
     return str(lowest_common_multiplier_many(path_lengths))
 
 
-# def part_02(data) -> str:
-#     """solves part 02"""
-
-#     # brute force, this never ends
-#     instructions = data[0]
+def solve_both(network: Network) -> tuple[str, str]:
+    """Solves both parts on parsed network."""
+    return solve_01(network), solve_02(network)
 
-#     nodes = parse_nodes(data[2:])
-#     node_keys = [key for key in nodes if key[2] == 'A']
 
-#     for count, instruction in enumerate(instruction_generator(instructions), start=1):
-#         values = [nodes[key][MAP_INST_TO_IDX[instruction]] for key in node_keys]
+def part_02_lockstep(data, max_steps: int = 10 ** 9) -> str:
+    """Solves part 2 by brute force, used to validate the lcm shortcut on arbitrary maps."""
+    network = parse(data)
+    simulator = LockstepSimulator.compile(network.instructions, network.nodes)
+    steps = simulator.run(max_steps=max_steps)
+    if steps is None:
+        raise ValueError(f"no solution within {max_steps} steps")
+    return str(steps)
 
-#         if all(list(map(lambda x: x[2] == 'Z', values))):
-#             break
 
-#         node_keys = values
-
-#     return str(count)
+ENGINES: Final = {2: {'reference': part_02_lockstep, 'fast': part_02}}
 
 
 # --------------------------------------------------
@@ -172,6 +278,34 @@ def test_part_02():
     assert '6' == part_02(data)
 
 
+def test_part_02_lockstep():
+    """Tests brute force part 02 against lcm shortcut"""
+    data = STAGE_TWO_TEST_DATA.split('\n')
+    assert part_02(data) == part_02_lockstep(data)
+
+
+def test_metrics():
+    """Tests steps walked get counted"""
+    with metrics.collecting() as counts:
+        solve_02(parse(STAGE_TWO_TEST_DATA.split('\n')))
+    assert {'path_steps': 2 + 3} == counts
+
+
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('2', '2') == solve_both(parse(TEST_DATA.split('\n')))
+
+
+def test_lockstep_budget_and_checkpoint(tmp_path):
+    """Tests step budget and resuming from checkpoint"""
+    data = STAGE_TWO_TEST_DATA.split('\n')
+    simulator = LockstepSimulator.compile(data[0], parse_nodes(data[2:]))
+    assert simulator.run(max_steps=5) is None
+    checkpoint = str(tmp_path / 'state.npz')
+    simulator.save_checkpoint(checkpoint, 2, simulator.trajectory[-1, simulator.trajectory[-1, simulator.starts]])
+    assert 6 == simulator.run(checkpoint=checkpoint)
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -7,7 +7,24 @@ Date   : 2023-12-09
 Purpose: Solves day 09 from advent of code 2023.
 """
 
-from typing import Final
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from math import comb
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+from aoc.tokens import Tokens, tokenize  # noqa: E402  pylint: disable=wrong-import-position
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+PARSER_VERSION: Final = 3
+
+PARSE_BYTES: Final = True  # parse() takes raw input bytes as well
 
 
 TEST_DATA: Final = """0 3 6 9 12 15
@@ -18,8 +35,8 @@ TEST_DATA: Final = """0 3 6 9 12 15
 # --------------------------------------------------
 def load_data(filename: str):
     """Load input lines."""
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return [line.rstrip() for line in file.readlines()]
+    with open_input(filename) as file:
+        return [line.rstrip() for line in file]
 
 
 def extrapolate(values: list[int]) -> int:
@@ -48,34 +65,192 @@ def extrapolate_backwards(values: list[int]) -> int:
     return ext
 
 
+@lru_cache(maxsize=None)
+def binomial_weights(length: int) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Weights turning a row of given length into its next and previous value.
+
+    Summing up the difference pyramid equals evaluating the interpolating
+    polynomial one step beyond either end, which is a binomial weighted sum."""
+    forward = tuple((-1) ** (length - 1 - i) * comb(length, i) for i in range(length))
+    backward = tuple((-1) ** i * comb(length, i + 1) for i in range(length))
+    return forward, backward
+
+
+class OnlinePredictor:
+    """Incremental extrapolation of a history arriving value by value.
+
+    Only the trailing edge (last value of every difference row) and the
+    leading edge (first value of every difference row) are kept."""
+    def __init__(self) -> None:
+        self.trailing: list[int] = []
+        self.leading: list[int] = []
+
+    def append(self, value: int) -> int:
+        """Add next history value, returns new forward prediction."""
+        for depth, previous in enumerate(self.trailing):
+            self.trailing[depth], value = value, value - previous
+        self.trailing.append(value)
+        self.leading.append(value)
+        return self.forward()
+
+    def forward(self) -> int:
+        """Predicted next value."""
+        return sum(self.trailing)
+
+    def backward(self) -> int:
+        """Predicted previous value."""
+        ext = 0
+        for value in reversed(self.leading):
+            ext = value - ext
+        return ext
+
+
+INT64_LIMIT: Final[int] = 2 ** 63 - 1
+
+SMALL_GROUP: Final[int] = 2 ** 14  # values, exact python ints are quick enough
+
+
+def solve_rows(rows: list[list[int]]) -> tuple[int, int]:
+    """Sum of next and previous values of all rows.
+
+    Rows of equal length are stacked into one array and solved by a single
+    matrix product, groups which might overflow int64 use exact python ints."""
+    groups: dict[int, list[list[int]]] = {}
+    for row in rows:
+        groups.setdefault(len(row), []).append(row)
+    return solve_groups(groups)
+
+
+def solve_groups(groups: dict[int, Any]) -> tuple[int, int]:
+    """Sum of next and previous values of rows grouped by length, as lists or 2d arrays.
+
+    Small groups of lists do not pay for importing numpy."""
+    total_next, total_previous = 0, 0
+    for length, group in groups.items():
+        if isinstance(group, list) and len(group) * length <= SMALL_GROUP:
+            next_value, previous_value = solve_exact(group)
+        else:
+            next_value, previous_value = solve_stacked(group)
+        total_next += next_value
+        total_previous += previous_value
+    return total_next, total_previous
+
+
+def solve_exact(group: list[list[int]]) -> tuple[int, int]:
+    """Sums of next and previous values of equally long rows, with python ints."""
+    forward, backward = binomial_weights(len(group[0]))
+    total_next, total_previous = 0, 0
+    for row in group:
+        total_next += sum(w * v for w, v in zip(forward, row))
+        total_previous += sum(w * v for w, v in zip(backward, row))
+    return total_next, total_previous
+
+
+def solve_stacked(group: Any) -> tuple[int, int]:
+    """Sums of next and previous values of equally long rows by one matrix product, exact if it might overflow."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    length = group.shape[1] if isinstance(group, np.ndarray) else len(group[0])
+    forward, backward = binomial_weights(length)
+    if isinstance(group, np.ndarray):
+        largest_value = int(np.abs(group).max())
+    else:
+        largest_value = max(abs(value) for row in group for value in row)
+    largest_weight = max(map(abs, forward + backward))
+    if largest_weight > INT64_LIMIT or largest_value * largest_weight * length >= INT64_LIMIT // len(group):
+        return solve_exact(group.tolist() if isinstance(group, np.ndarray) else group)
+    weights = np.array([forward, backward], dtype=np.int64).T
+    result = (np.array(group, dtype=np.int64) @ weights).sum(axis=0)
+    return int(result[0]), int(result[1])
+
+
+@dataclass
+class Report:
+    """History rows as flat arrays the model cache can memory map, both extrapolations are computed together once."""
+    values: "np.ndarray"
+    offsets: "np.ndarray"  # row i holds values[offsets[i]:offsets[i + 1]]
+
+    def groups(self) -> dict[int, "np.ndarray"]:
+        """Non-empty rows stacked into one 2d array per length."""
+        return Tokens(values=self.values, offsets=self.offsets).groups()
+
+    @cached_property
+    def extrapolated(self) -> tuple[int, int]:
+        """Sums of next and previous values."""
+        return solve_groups(self.groups())
+
+
+def parse_rows(data) -> list[list[int]]:
+    """Parse history rows."""
+    return [row for row in tokenize(data).rows() if row]
+
+
+def parse(data) -> Report:
+    """Parse input once for both parts."""
+    tokens = tokenize(data)
+    return Report(values=tokens.values, offsets=tokens.offsets)
+
+
 def part_01(data) -> str:
     """Solves part 01"""
-    return str(
-        sum(
-            (  # generator
-                extrapolate(
-                    list(
-                        map(int, line.split())
-                    )
-                ) for line in data
-            )
-        )
-    )
+    return solve_01(parse(data))
 
 
 def part_02(data) -> str:
     """solves part 02"""
-    return str(
-        sum(
-            (  # generator
-                extrapolate_backwards(
-                    list(
-                        map(int, line.split())
-                    )
-                ) for line in data
-            )
-        )
-    )
+    return solve_02(parse(data))
+
+
+def solve_01(report: Report) -> str:
+    """Solves part 01 on parsed report."""
+    return str(report.extrapolated[0])
+
+
+def solve_02(report: Report) -> str:
+    """Solves part 02 on parsed report."""
+    return str(report.extrapolated[1])
+
+
+def solve_both(report: Report) -> tuple[str, str]:
+    """Solves both parts on parsed report."""
+    return solve_01(report), solve_02(report)
+
+
+def extrapolate_pure(report: Report) -> tuple[int, int]:
+    """Sums of next and previous values with python ints only, no numpy to import for small inputs."""
+    totals = [solve_exact(group if isinstance(group, list) else group.tolist()) for group in report.groups().values()]
+    return sum(total for total, _ in totals), sum(total for _, total in totals)
+
+
+def extrapolate_vectorized(report: Report) -> tuple[int, int]:
+    """Sums of next and previous values with one matrix product per row length."""
+    totals = [solve_stacked(group) for group in report.groups().values()]
+    return sum(total for total, _ in totals), sum(total for _, total in totals)
+
+
+def solve_01_pure(report: Report) -> str:
+    """Solves part 01 on parsed report without numpy."""
+    return str(extrapolate_pure(report)[0])
+
+
+def solve_02_pure(report: Report) -> str:
+    """Solves part 02 on parsed report without numpy."""
+    return str(extrapolate_pure(report)[1])
+
+
+def solve_01_vectorized(report: Report) -> str:
+    """Solves part 01 on parsed report with numpy."""
+    return str(extrapolate_vectorized(report)[0])
+
+
+def solve_02_vectorized(report: Report) -> str:
+    """Solves part 02 on parsed report with numpy."""
+    return str(extrapolate_vectorized(report)[1])
+
+
+BACKENDS: Final = {1: {'pure': solve_01_pure, 'vectorized': solve_01_vectorized},
+                   2: {'pure': solve_02_pure, 'vectorized': solve_02_vectorized}}
+
+BACKEND_THRESHOLDS: Final = {'vectorized': 256 * 2 ** 10}  # bytes, where it overtook pure in 'python -m aoc bench --calibrate'
 
 
 # --------------------------------------------------
@@ -91,6 +266,50 @@ def test_part_02():
     assert '2' == part_02(data)
 
 
+def test_solve_both():
+    """Tests solving both parts on one parsed model"""
+    assert ('114', '2') == solve_both(parse(TEST_DATA.split('\n')))
+
+
+def test_solve_rows():
+    """Tests batched solver against difference pyramid"""
+    rows = parse_rows(TEST_DATA.split('\n')) + [[i ** 4 - 3 * i for i in range(6)]]
+    assert (sum(map(extrapolate, rows)), sum(map(extrapolate_backwards, rows))) == solve_rows(rows)
+    # huge values have to take the exact path
+    big = [[10 ** 15 * i ** 3 for i in range(21)]]
+    assert (extrapolate(big[0]), extrapolate_backwards(big[0])) == solve_rows(big)
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    assert solve_rows(big) == solve_stacked(np.array(big)) and solve_rows(rows[:3]) == solve_stacked(rows[:3])
+    # weights of long rows exceed int64 whatever the values are
+    assert (0, 0) == solve_stacked(np.zeros((300, 70), dtype=np.int64)) == solve_rows([[0] * 70] * 300)
+
+
+def test_huge_values():
+    """Tests values beyond int64 get extrapolated exactly"""
+    data = ['10000000000000000000 20000000000000000000 30000000000000000000']
+    assert ['40000000000000000000', '0'] == [part_01(data), part_02(data)]
+    assert ['40000000000000000000', '0'] == [solve_01_vectorized(parse(data)), solve_02_pure(parse(data))]
+
+
+def test_backends():
+    """Tests pure and vectorized backends agree"""
+    assert ['114', '2'] == [solve_01_pure(parse(TEST_DATA)), solve_02_vectorized(parse(TEST_DATA.encode()))]
+    report = parse(TEST_DATA + '\n' + '-3 ' * 40)
+    assert solve_02_pure(report) == solve_02_vectorized(report) == solve_02(report)
+
+
+def test_online_predictor():
+    """Tests incremental predictor against full extrapolation"""
+    for values in parse_rows(TEST_DATA.split('\n')):
+        predictor = OnlinePredictor()
+        predictions = [predictor.append(value) for value in values]
+        assert extrapolate(values) == predictions[-1]
+        assert extrapolate_backwards(values) == predictor.backward()
+    predictor = OnlinePredictor()
+    assert [1, 5, 10] == [predictor.append(value) for value in (1, 3, 6)]
+    assert 0 == predictor.backward()
+
+
 # --------------------------------------------------
 def main() -> None:
     """Main wrapper."""
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+"""
+Author : Martin Schuh <development@rebouny.net>
+Purpose: Shared tooling to run, time and inspect the daily solutions.
+"""
+
+from pathlib import Path
+from typing import Final
+
+
+ROOT: Final[Path] = Path(__file__).resolve().parent.parent
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+"""Entry point for 'python -m aoc'."""
+
+from aoc.runner import main
+
+
+if __name__ == '__main__':
+    main()
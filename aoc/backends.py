@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Execution backends per day and their dispatch by input size.
+
+Days offering more than one way to solve a part register them by kind, every
+backend takes the parsed model like solve_NN(), so models stay cached:
+
+    BACKENDS = {1: {'pure': solve_01_pure, 'vectorized': solve_01_vectorized}}
+    BACKEND_THRESHOLDS = {'vectorized': 16 * 2 ** 10}
+
+Kinds are ordered by their fixed cost, numpy imports and array setup for
+'vectorized', pool startup for 'parallel'. The dispatcher takes the costliest
+available kind whose threshold (input size in bytes) is reached, so small
+inputs stay on the cheap path. Thresholds of a day are defaults, calibrated
+ones measured by 'python -m aoc bench --calibrate' on this machine win. A
+kind without threshold is only used when asked for or when it is the only one.
+
+Backends are engines as well, 'python -m aoc check' compares them.
+"""
+
+import functools
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Final, Iterable, Optional
+
+from aoc import cache
+
+
+KINDS: Final[tuple[str, ...]] = ('pure', 'vectorized', 'parallel')
+
+AUTO: Final[str] = 'auto'
+
+THRESHOLDS_FILE: Final[Path] = cache.CACHE_DIR / 'backends.json'
+
+
+def registered(module: ModuleType) -> dict[int, dict[str, Callable]]:
+    """Backends of a day per part, empty if it has none."""
+    return getattr(module, 'BACKENDS', {})
+
+
+def as_engines(module: ModuleType) -> dict[int, dict[str, Callable]]:
+    """Backends of a day per part as engines, taking input lines."""
+    return {part: {kind: functools.partial(solve_lines, module, func) for kind, func in available.items()}
+            for part, available in registered(module).items()}
+
+
+def solve_lines(module: ModuleType, func: Callable, lines: list[str]) -> str:
+    """Parse lines and solve them with a backend."""
+    return func(module.parse(lines))
+
+
+def part_key(day: int, part: int) -> str:
+    """Key of a (day, part) in the thresholds file."""
+    return f'{day:02d}-{part}'
+
+
+def load_thresholds(filename: Path = THRESHOLDS_FILE) -> dict[str, dict[str, Optional[int]]]:
+    """Calibrated thresholds per (day, part), None where a kind never paid off."""
+    try:
+        with open(filename, 'rt', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_thresholds(thresholds: dict[str, dict[str, Optional[int]]], filename: Path = THRESHOLDS_FILE) -> None:
+    """Merge calibrated thresholds into the thresholds file."""
+    merged = load_thresholds(filename) | thresholds
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    staging = filename.with_suffix(f'.tmp{os.getpid()}')
+    with open(staging, 'wt', encoding='utf-8') as file:
+        json.dump(merged, file, indent=1, sort_keys=True)
+    os.replace(staging, filename)
+
+
+def thresholds_for(module: ModuleType, day: int, part: int,
+                   calibrated: Optional[dict[str, dict[str, Optional[int]]]] = None) -> dict[str, Optional[int]]:
+    """Thresholds applying to a part, calibrated ones over the day's defaults."""
+    defaults = dict(getattr(module, 'BACKEND_THRESHOLDS', {}))
+    return defaults | (calibrated or {}).get(part_key(day, part), {})
+
+
+def choose(available: Iterable[str], size: int, thresholds: dict[str, Optional[int]]) -> str:
+    """Costliest kind whose threshold the input size reaches, the cheapest one otherwise."""
+    kinds = sorted(available, key=lambda kind: KINDS.index(kind) if kind in KINDS else len(KINDS))
+    if not kinds:
+        raise ValueError("no backends to choose from")
+    chosen = kinds[0]
+    for kind in kinds[1:]:
+        threshold = thresholds.get(kind)
+        if threshold is not None and size >= threshold:
+            chosen = kind
+    return chosen
+
+
+def plan(module: ModuleType, day: int, parts: Iterable[int], size: int, backend: str = AUTO,
+         calibrated: Optional[dict[str, dict[str, Optional[int]]]] = None) -> dict[int, Optional[str]]:
+    """Backend per part, None for parts the day offers no backends for.
+
+    Raises ValueError if a requested backend does not exist for a part that has backends."""
+    chosen: dict[int, Optional[str]] = {}
+    for part in parts:
+        available = registered(module).get(part, {})
+        if not available:
+            chosen[part] = None
+        elif backend == AUTO:
+            chosen[part] = choose(available, size, thresholds_for(module, day, part, calibrated))
+        elif backend in available:
+            chosen[part] = backend
+        else:
+            raise ValueError(f"day {day} part {part} has no {backend} backend, only {', '.join(available)}")
+    return chosen
+
+
+# --------------------------------------------------
+def map_chunks(func: Callable[[list], Any], items: list, workers: Optional[int] = None,
+               chunks_per_worker: int = 4) -> list:
+    """Results of func on consecutive chunks of items, computed on a process pool.
+
+    func has to be a module level function, it gets pickled by reference."""
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    workers = workers or os.cpu_count() or 1
+    size = max(1, -(-len(items) // (workers * chunks_per_worker)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, [items[start:start + size] for start in range(0, len(items), size)]))
+
+
+def calibrate(day: int, part: int, sizes: Optional[tuple[int, ...]] = None, repeat: int = 3,
+              max_seconds: float = 2.0, seed: int = 0) -> tuple[dict[str, Optional[int]], list[dict]]:
+    """Time every backend of a part over growing generated inputs and derive thresholds.
+
+    A kind's threshold is the smallest measured input size from which on it
+    beats all cheaper kinds at every larger measured size, None if it never
+    does. Sizes get skipped once the slowest backend took longer than 'max_seconds'."""
+    from aoc import bench, days, generators  # pylint: disable=import-outside-toplevel
+    module = days.load(day)
+    available = registered(module).get(part, {})
+    kinds = sorted(available, key=lambda kind: KINDS.index(kind) if kind in KINDS else len(KINDS))
+
+    timings = []
+    for size in sorted(sizes or getattr(module, 'BENCH_SIZES', bench.DEFAULT_SIZES)):
+        lines = generators.generate(day, size=size, seed=seed).lines
+        model = module.parse(lines)
+        row = {'size': size, 'bytes': sum(len(line) + 1 for line in lines), 'times': {}}
+        for kind in kinds:
+            times, _ = bench.time_call(available[kind], model, repeat=repeat, warmup=1)
+            row['times'][kind] = min(times)
+        timings.append(row)
+        if max(row['times'].values()) > max_seconds:
+            break
+
+    thresholds: dict[str, Optional[int]] = {}
+    for position, kind in enumerate(kinds[1:], start=1):
+        wins = [row['times'][kind] <= min(row['times'][cheaper] for cheaper in kinds[:position]) for row in timings]
+        thresholds[kind] = None
+        for index in range(len(timings) - 1, -1, -1):
+            if not wins[index]:
+                break
+            thresholds[kind] = timings[index]['bytes']
+    return thresholds, timings
+
+
+def format_calibration(day: int, part: int, thresholds: dict[str, Optional[int]], timings: list[dict]) -> str:
+    """Render timings and derived thresholds of a part."""
+    lines = [f'day {day:02d} part {part}: ' + ', '.join(
+        f'{kind} from {threshold} bytes' if threshold is not None else f'{kind} never'
+        for kind, threshold in thresholds.items())]
+    for row in timings:
+        lines.append(f"  {row['size']:>6}x {row['bytes']:>10} bytes  " + '  '.join(
+            f'{kind} {seconds * 1e3:9.3f}ms' for kind, seconds in row['times'].items()))
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------
+def test_choose():
+    """Tests dispatch by size, unknown thresholds and explicit backends"""
+    thresholds = {'vectorized': 1000, 'parallel': None}
+    assert 'pure' == choose(['vectorized', 'pure', 'parallel'], 999, thresholds)
+    assert 'vectorized' == choose(['vectorized', 'pure', 'parallel'], 10 ** 9, thresholds)
+    assert 'vectorized' == choose(['vectorized'], 0, {})
+    module = ModuleType('day99')
+    module.BACKENDS = {1: {'pure': len, 'parallel': len}}  # type: ignore[attr-defined]
+    module.BACKEND_THRESHOLDS = {'parallel': 10}  # type: ignore[attr-defined]
+    assert {1: 'parallel', 2: None} == plan(module, 99, (1, 2), 10)
+    assert {1: 'pure', 2: None} == plan(module, 99, (1, 2), 10, calibrated={'99-1': {'parallel': None}})
+    assert {1: 'pure', 2: None} == plan(module, 99, (1, 2), 10, backend='pure')
+    try:
+        plan(module, 99, (1,), 10, backend='vectorized')
+        assert False, 'missing backend accepted'
+    except ValueError:
+        pass
+
+
+def test_calibrate():
+    """Tests thresholds are derived from timings of every backend"""
+    thresholds, timings = calibrate(9, 1, sizes=(1, 2), repeat=1)
+    assert ['vectorized'] == list(thresholds) and [1, 2] == [row['size'] for row in timings]
+    assert {'pure', 'vectorized'} == set(timings[0]['times']) and 'day 09 part 1' in format_calibration(
+        9, 1, thresholds, timings)
+
+
+def test_map_chunks():
+    """Tests chunked results come back in order"""
+    assert [6, 15, 24] == map_chunks(sum, list(range(1, 10)), workers=1, chunks_per_worker=3)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Stored performance baselines and a regression gate against them.
+
+Usage  : python -m aoc baseline [DAY ...] [--part N] [--sizes N ...] [--update] [--json]
+
+Timings and peak memory per (day, part, input size) of generated inputs are
+kept in baseline.json next to the solutions, under version control. A check
+measures again and compares. Timings are noisy, so a slowdown only counts as
+regression if it exceeds the relative tolerance, an absolute floor and a
+multiple of the measured spread all at once, and parts showing one get
+measured a second time to confirm it. Peak memory is deterministic enough for
+a relative tolerance and a small floor.
+
+Baselines are only comparable on the machine they were recorded on, a check
+on another machine warns about that.
+"""
+
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Final, Iterable, Optional
+
+from aoc import ROOT, bench, days, memory
+
+
+BASELINE_FILE: Final[Path] = ROOT / 'baseline.json'
+
+VERSION: Final[int] = 1
+
+SIZES: Final[tuple[int, ...]] = (1, 10)
+
+TIME_TOLERANCE: Final[float] = 0.25  # relative slowdown of the best run
+MIN_SECONDS: Final[float] = 2e-4  # differences below are timer and cache noise
+NOISE_FACTOR: Final[float] = 3.0  # multiples of the combined standard deviation
+
+MEMORY_TOLERANCE: Final[float] = 0.10
+MIN_BYTES: Final[int] = 64 * 2 ** 10
+
+
+@dataclass
+class Entry:
+    """Performance of a (day, part) at one input size, times in seconds."""
+    best: float
+    median: float
+    stdev: float
+    repeat: int
+    peak_memory: Optional[int] = None  # bytes
+
+
+@dataclass
+class Verdict:
+    """Comparison of a measured entry with its baseline."""
+    key: str
+    status: str  # 'ok', 'regression', 'improvement', 'new', 'missing' or 'error'
+    baseline: Optional[Entry]
+    current: Optional[Entry]
+    reasons: list[str]
+
+
+# --------------------------------------------------
+def entry_key(day: int, part: int, size: int) -> str:
+    """Key of an entry in the baseline file."""
+    return f'{day:02d}-{part}-{size}'
+
+
+def machine() -> str:
+    """Rough identity of the machine timings were taken on."""
+    import platform  # pylint: disable=import-outside-toplevel
+    return (f'{platform.machine()} {platform.processor() or platform.system()} {os.cpu_count()} cpus'
+            f' python {platform.python_version()}')
+
+
+def load(filename: Path = BASELINE_FILE) -> tuple[dict[str, Entry], Optional[str]]:
+    """Recorded entries and the machine they were recorded on, nothing if there is no baseline."""
+    try:
+        with open(filename, 'rt', encoding='utf-8') as file:
+            stored = json.load(file)
+    except FileNotFoundError:
+        return {}, None
+    if stored.get('version') != VERSION:
+        raise ValueError(f"{filename} has version {stored.get('version')}, expected {VERSION}")
+    return {key: Entry(**values) for key, values in stored['entries'].items()}, stored.get('machine')
+
+
+def store(entries: dict[str, Entry], filename: Path = BASELINE_FILE) -> None:
+    """Merge entries into the baseline file, sorted for readable diffs."""
+    recorded, _ = load(filename)
+    recorded.update(entries)
+    content = {'version': VERSION, 'machine': machine(),
+               'entries': {key: asdict(recorded[key]) for key in sorted(recorded)}}
+    staging = filename.with_suffix(f'.tmp{os.getpid()}')
+    with open(staging, 'wt', encoding='utf-8') as file:
+        json.dump(content, file, indent=1)
+        file.write('\n')
+    os.replace(staging, filename)
+
+
+def measure(day: int, part: int, sizes: Optional[tuple[int, ...]] = None, repeat: int = 7,
+            warmup: int = 1, max_seconds: float = 1.0, seed: int = 0) -> tuple[dict[str, Entry], dict[str, str]]:
+    """Benchmark a part and take the peak memory of one extra run per measured size.
+
+    Returns entries and the error of the size the benchmark failed at, if any,
+    wrong answers make no baseline. The peak is taken without allocation
+    sites, tracing costs enough as it is."""
+    from aoc import generators  # pylint: disable=import-outside-toplevel
+    sizes = tuple(sorted(sizes or SIZES))
+    benchmark = bench.bench_part(day, part, sizes, repeat=repeat, warmup=warmup, max_seconds=max_seconds, seed=seed)
+    errors = {}
+    if benchmark.error and benchmark.failed_size is not None:
+        errors[entry_key(day, part, benchmark.failed_size)] = benchmark.error
+
+    func = getattr(days.load(day), f'part_{part:02d}')
+    entries = {}
+    for measurement in benchmark.measurements:
+        if measurement.size == benchmark.failed_size:  # timed, but with a wrong answer
+            continue
+        lines = generators.generate(day, size=measurement.size, seed=seed).lines
+        with memory.MemoryTracker(sites=False) as tracker:
+            func(lines)
+        entries[entry_key(day, part, measurement.size)] = Entry(
+            best=measurement.best, median=measurement.median, stdev=measurement.stdev,
+            repeat=len(measurement.times), peak_memory=tracker.report.peak)
+    return entries, errors
+
+
+# --------------------------------------------------
+def compare_entry(key: str, baseline: Optional[Entry], current: Optional[Entry],
+                  tolerance: float = TIME_TOLERANCE, memory_tolerance: float = MEMORY_TOLERANCE,
+                  error: Optional[str] = None) -> Verdict:
+    """Judge a measurement against its baseline, failing where it used to work is a regression."""
+    if error is not None:
+        return Verdict(key, 'error' if baseline is None else 'regression', baseline, None, [error])
+    if baseline is None or current is None:
+        return Verdict(key, 'new' if baseline is None else 'missing', baseline, current, [])
+
+    reasons, better = [], []
+    delta = current.best - baseline.best
+    noise = max(MIN_SECONDS, NOISE_FACTOR * math.hypot(baseline.stdev, current.stdev))
+    if abs(delta) > max(tolerance * baseline.best, noise):
+        change = f'time {baseline.best * 1e3:.3f}ms -> {current.best * 1e3:.3f}ms ({delta / baseline.best:+.0%})'
+        (reasons if delta > 0 else better).append(change)
+
+    if baseline.peak_memory is not None and current.peak_memory is not None:
+        grown = current.peak_memory - baseline.peak_memory
+        if abs(grown) > max(memory_tolerance * baseline.peak_memory, MIN_BYTES):
+            change = (f'peak {memory.format_size(baseline.peak_memory)} -> {memory.format_size(current.peak_memory)}'
+                      f' ({grown / max(baseline.peak_memory, 1):+.0%})')
+            (reasons if grown > 0 else better).append(change)
+
+    status = 'regression' if reasons else 'improvement' if better else 'ok'
+    return Verdict(key, status, baseline, current, reasons or better)
+
+
+def compare(baselines: dict[str, Entry], current: dict[str, Entry], errors: Optional[dict[str, str]] = None,
+            keys: Optional[Iterable[str]] = None, tolerance: float = TIME_TOLERANCE,
+            memory_tolerance: float = MEMORY_TOLERANCE) -> list[Verdict]:
+    """Verdicts for given keys, all measured and failed ones by default."""
+    errors = errors or {}
+    return [compare_entry(key, baselines.get(key), current.get(key), tolerance, memory_tolerance, errors.get(key))
+            for key in sorted(keys if keys is not None else current.keys() | errors.keys())]
+
+
+def gate(baselines: dict[str, Entry], jobs: Iterable[tuple[int, int]], sizes: Optional[tuple[int, ...]] = None,
+         repeat: int = 7, max_seconds: float = 1.0, tolerance: float = TIME_TOLERANCE,
+         memory_tolerance: float = MEMORY_TOLERANCE) -> tuple[dict[str, Entry], list[Verdict]]:
+    """Measure (day, part) jobs and judge them, a second measurement has to confirm slowdowns."""
+    current: dict[str, Entry] = {}
+    errors: dict[str, str] = {}
+    for day, part in jobs:
+        entries, failed = measure(day, part, sizes, repeat=repeat, max_seconds=max_seconds)
+        current |= entries
+        errors |= failed
+    verdicts = compare(baselines, current, errors, tolerance=tolerance, memory_tolerance=memory_tolerance)
+
+    suspects = {verdict.key[:4] for verdict in verdicts if verdict.status == 'regression' and verdict.current is not None}
+    for suspect in sorted(suspects):
+        entries, _ = measure(int(suspect[:2]), int(suspect[3]), sizes, repeat=repeat, max_seconds=max_seconds)
+        current |= {key: faster(current[key], entry) for key, entry in entries.items() if key in current}
+    if suspects:
+        verdicts = compare(baselines, current, errors, tolerance=tolerance, memory_tolerance=memory_tolerance)
+    return current, verdicts
+
+
+def faster(first: Entry, second: Entry) -> Entry:
+    """Least disturbed of two measurements."""
+    return first if first.best <= second.best else second
+
+
+def format_human(verdicts: list[Verdict]) -> str:
+    """Render verdicts, one line per entry."""
+    lines = []
+    for verdict in verdicts:
+        entry = verdict.current or verdict.baseline
+        summary = f'{entry.best * 1e3:10.3f}ms' if entry else ''
+        if entry and entry.peak_memory is not None:
+            summary += f'  peak {memory.format_size(entry.peak_memory):>9}'
+        lines.append(f'{verdict.key:<10} {verdict.status.upper():<12} {summary}'
+                     + ''.join(f'\n  {reason}' for reason in verdict.reasons))
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------
+def test_compare_entry():
+    """Tests noise, tolerance and memory thresholds"""
+    base = Entry(best=0.010, median=0.011, stdev=0.0005, repeat=7, peak_memory=10 * 2 ** 20)
+    assert 'ok' == compare_entry('k', base, Entry(0.011, 0.012, 0.0005, 7, 10 * 2 ** 20)).status
+    assert 'regression' == compare_entry('k', base, Entry(0.020, 0.021, 0.0005, 7, 10 * 2 ** 20)).status
+    assert 'ok' == compare_entry('k', base, Entry(0.020, 0.021, 0.004, 7, 10 * 2 ** 20)).status  # too noisy
+    assert 'ok' == compare_entry('k', Entry(1e-5, 1e-5, 0.0, 7), Entry(5e-5, 5e-5, 0.0, 7)).status  # below floor
+    assert 'improvement' == compare_entry('k', base, Entry(0.005, 0.005, 0.0, 7, 10 * 2 ** 20)).status
+    verdict = compare_entry('k', base, Entry(0.010, 0.011, 0.0005, 7, 20 * 2 ** 20))
+    assert 'regression' == verdict.status and verdict.reasons[0].startswith('peak')
+    assert ['new', 'missing'] == [compare_entry('k', None, base).status, compare_entry('k', base, None).status]
+
+
+def test_store_and_measure(tmp_path):
+    """Tests recording a baseline and comparing a run against it"""
+    filename = tmp_path / 'baseline.json'
+    entries, errors = measure(6, 1, sizes=(1, 2), repeat=3)
+    assert ['06-1-1', '06-1-2'] == sorted(entries) and entries['06-1-1'].peak_memory is not None and not errors
+    store(entries, filename)
+    store({'06-2-1': entries['06-1-1']}, filename)
+    recorded, recorded_on = load(filename)
+    assert 3 == len(recorded) and machine() == recorded_on
+    assert all(verdict.status != 'new' for verdict in compare(recorded, entries))
+    verdicts = compare(recorded, {}, {'06-1-2': 'size 2: wrong answer', '06-1-3': 'size 3: wrong answer'})
+    assert ['regression', 'error'] == [verdict.status for verdict in verdicts]
+
+
+def test_measure_wrong_answer(monkeypatch):
+    """Tests a wrong answer makes no entry and fails the size it happened at"""
+    monkeypatch.setattr(days.load(6), 'part_01', lambda data: 'wrong')
+    for sizes in ((1, 10), (1,)):
+        entries, errors = measure(6, 1, sizes=sizes, repeat=1)
+        assert {} == entries and ['06-1-1'] == list(errors) and 'wrong answer' in errors['06-1-1']
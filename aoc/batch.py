@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Solve many input files of one day and stream a json line per input.
+
+Usage  : python -m aoc batch DAY INPUT ... [--part N] [--jobs N] [--in-flight N] [--timeout S] [-o FILE]
+
+Inputs are files, directories (every file inside) or glob patterns. Files are
+solved on a process pool with a bounded number of submitted files, so huge
+directories are neither listed nor queued up front, and records are written as
+soon as a file is done. Failures are recorded per file and part, a file taking
+longer than the timeout gets interrupted inside its worker.
+"""
+
+import collections
+import glob
+import json
+import os
+import signal
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
+
+from aoc import days, progress
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+@dataclass
+class BatchRecord:
+    """Answers, errors and timings of one input file, times in seconds."""
+    day: int
+    input: str
+    answers: dict[str, Optional[str]] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    parse_time: float = 0.0
+    solve_time: dict[str, float] = field(default_factory=dict)
+    wall_time: float = 0.0
+    error: Optional[str] = None  # input failed as a whole
+
+
+def expand(inputs: Iterable[str]) -> Iterator[str]:
+    """Files given directly, inside given directories or matching given glob patterns, lazily."""
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            yield from sorted(entry.path for entry in os.scandir(pattern) if entry.is_file())
+        elif glob.has_magic(pattern):
+            yield from glob.iglob(pattern, recursive=True)
+        else:
+            yield pattern
+
+
+# --------------------------------------------------
+def interrupt(*_) -> None:
+    """Alarm handler ending the current file."""
+    raise TimeoutError('time limit exceeded')
+
+
+def solve_file(day: int, filename: str, parts: tuple[int, ...], timeout: Optional[float] = None) -> BatchRecord:
+    """Worker side, parse a file once and solve the parts within 'timeout' seconds overall."""
+    record = BatchRecord(day=day, input=filename)
+    start = time.perf_counter()
+    if timeout:
+        signal.signal(signal.SIGALRM, interrupt)
+        # repeats until cleared, in case the first alarm hits code swallowing exceptions
+        signal.setitimer(signal.ITIMER_REAL, timeout, min(timeout, 0.1))
+    try:
+        module = days.load(day)
+        fused = hasattr(module, 'parse')
+        model = module.parse(module.load_data(filename)) if fused else module.load_data(filename)
+        record.parse_time = time.perf_counter() - start
+
+        for part in parts:
+            begin = time.perf_counter()
+            try:
+                record.answers[str(part)] = getattr(module, f'solve_{part:02d}' if fused else f'part_{part:02d}')(model)
+            except TimeoutError:
+                raise
+            except Exception as exc:  # pylint: disable=broad-except
+                record.answers[str(part)] = None
+                record.errors[str(part)] = f'{type(exc).__name__}: {exc}'
+            record.solve_time[str(part)] = time.perf_counter() - begin
+    except Exception as exc:  # pylint: disable=broad-except
+        record.error = f'{type(exc).__name__}: {exc}'
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record.wall_time = time.perf_counter() - start
+    return record
+
+
+def run_batch(day: int, filenames: Iterable[str], parts: tuple[int, ...] = (1, 2),
+              workers: Optional[int] = None, in_flight: Optional[int] = None,
+              timeout: Optional[float] = None) -> Iterator[BatchRecord]:
+    """Solve files on a process pool and yield records in order of completion.
+
+    At most 'in_flight' files are submitted at any time, twice the number of
+    workers by default. A crashing worker breaks the pool for all files in
+    flight, the pool gets replaced and these files are solved again one at a
+    time, only a file crashing on its own counts as failed."""
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait  # pylint: disable=import-outside-toplevel
+    from concurrent.futures.process import BrokenProcessPool  # pylint: disable=import-outside-toplevel
+    progress.disable()
+    workers = workers or os.cpu_count() or 1
+    in_flight = in_flight or 2 * workers
+    pending: dict["Future", tuple[str, bool]] = {}  # file and whether it runs alone
+    suspects: collections.deque[str] = collections.deque()
+    queue = iter(filenames)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            if suspects:
+                if not pending:
+                    filename = suspects.popleft()
+                    pending[pool.submit(solve_file, day, filename, parts, timeout)] = (filename, True)
+            else:
+                for filename in queue:
+                    pending[pool.submit(solve_file, day, filename, parts, timeout)] = (filename, False)
+                    if len(pending) >= in_flight:
+                        break
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            if not any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                for future in done:
+                    yield future.result()
+                    del pending[future]
+                continue
+
+            pool.shutdown(wait=True, cancel_futures=True)  # settles every future of the broken pool
+            for future, (filename, alone) in pending.items():
+                if not future.cancelled() and not isinstance(future.exception(), BrokenProcessPool):
+                    yield future.result()
+                elif alone:
+                    yield BatchRecord(day=day, input=filename, error='worker crashed')
+                else:
+                    suspects.append(filename)
+            pending.clear()
+            pool = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def write_records(records: Iterable[BatchRecord], output: TextIO) -> dict[str, int]:
+    """Write one json line per record, returns counts of solved and failed inputs."""
+    counts = {'inputs': 0, 'failed': 0}
+    for record in records:
+        counts['inputs'] += 1
+        counts['failed'] += bool(record.error or record.errors)
+        output.write(json.dumps(asdict(record)) + '\n')
+        output.flush()
+    return counts
+
+
+# --------------------------------------------------
+def test_run_batch(tmp_path):
+    """Tests a failing file does not stop the others"""
+    module = days.load(6)
+    for name in 'abc':
+        (tmp_path / f'{name}.txt').write_text(module.TEST_DATA, encoding='utf-8')
+    (tmp_path / 'broken.txt').write_text('Time: x\n', encoding='utf-8')
+    records = list(run_batch(6, expand([str(tmp_path / '*.txt')]), workers=2, in_flight=2, timeout=30))
+    assert 4 == len(records)
+    answers = {Path(record.input).name: record.answers for record in records}
+    assert {'1': '288', '2': '71503'} == answers['a.txt'] == answers['c.txt']
+    assert [record for record in records if record.error or record.errors][0].input.endswith('broken.txt')
+
+
+def test_worker_crash(tmp_path, monkeypatch):
+    """Tests only the file killing its worker fails, the others in flight get solved again"""
+    module = days.load(6)
+    parse = module.parse
+
+    def crashing(data):
+        if 'crash' in data[0]:
+            os._exit(1)  # pylint: disable=protected-access
+        return parse(data)
+    monkeypatch.setattr(module, 'parse', crashing)  # forked workers inherit it
+    for name in 'abcde':
+        (tmp_path / f'{name}.txt').write_text(module.TEST_DATA, encoding='utf-8')
+    (tmp_path / 'b-crash.txt').write_text('crash\n', encoding='utf-8')
+    records = list(run_batch(6, sorted(expand([str(tmp_path / '*.txt')])), parts=(1,), workers=2, in_flight=4))
+    assert 6 == len(records)
+    assert ['b-crash.txt'] == [Path(record.input).name for record in records if record.error]
+    assert all(record.error == 'worker crashed' or record.answers == {'1': '288'} for record in records)
+
+
+def test_timeout(tmp_path):
+    """Tests slow files get interrupted"""
+    from aoc import generators  # pylint: disable=import-outside-toplevel
+    (tmp_path / 'input').write_text(generators.generate(3, size=50).text(), encoding='utf-8')
+    record = solve_file(3, str(tmp_path / 'input'), (1, 2), timeout=1e-3)
+    assert 'TimeoutError: time limit exceeded' == record.error
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Benchmark how every day's solvers scale with input size.
+
+Usage  : python -m aoc bench [DAY ...] [--sizes 1 10 100 1000] [--repeat N] [--json]
+"""
+
+import math
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Final, Optional
+
+from aoc import days
+
+
+DEFAULT_SIZES: Final[tuple[int, ...]] = (1, 10, 100, 1000)
+
+COMPLEXITY_CLASSES: Final[list[tuple[float, str]]] = [
+    (0.0, 'O(1)'),
+    (1.0, 'O(n)'),
+    (2.0, 'O(n^2)'),
+    (3.0, 'O(n^3)'),
+]
+
+
+@dataclass
+class Measurement:
+    """Timings of repeated runs at one input size, in seconds."""
+    size: int
+    times: list[float]
+
+    @property
+    def best(self) -> float:
+        """Fastest run, least disturbed by noise."""
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        """Median run."""
+        return statistics.median(self.times)
+
+    @property
+    def stdev(self) -> float:
+        """Spread of runs."""
+        return statistics.stdev(self.times) if len(self.times) > 1 else 0.0
+
+
+@dataclass
+class Benchmark:
+    """All measurements of a (day, part) and the fitted growth."""
+    day: int
+    part: int
+    measurements: list[Measurement] = field(default_factory=list)
+    skipped: list[int] = field(default_factory=list)
+    error: Optional[str] = None
+    failed_size: Optional[int] = None  # size the error happened at
+
+    def exponent(self) -> Optional[float]:
+        """Fitted exponent k of time ~ size^k."""
+        return fit_exponent([(m.size, m.median) for m in self.measurements])
+
+    def complexity(self) -> str:
+        """Nearest complexity class of fitted exponent."""
+        exponent = self.exponent()
+        if exponent is None:
+            return '?'
+        return classify(exponent)
+
+    def as_dict(self) -> dict:
+        """Plain representation for json reports."""
+        return {
+            'day': self.day, 'part': self.part, 'error': self.error, 'skipped': self.skipped,
+            'exponent': self.exponent(), 'complexity': self.complexity(),
+            'measurements': [{'size': m.size, 'best': m.best, 'median': m.median, 'mean': statistics.fmean(m.times),
+                              'stdev': m.stdev, 'repeat': len(m.times)} for m in self.measurements],
+        }
+
+
+# --------------------------------------------------
+def fit_exponent(points: list[tuple[int, float]]) -> Optional[float]:
+    """Least squares slope in log-log space."""
+    points = [(size, seconds) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    x_mean, y_mean = statistics.fmean(xs), statistics.fmean(ys)
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    if denominator == 0:
+        return None
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / denominator
+
+
+def classify(exponent: float) -> str:
+    """Map exponent to nearest polynomial class, anything steeper is flagged."""
+    if exponent > 3.5:
+        return 'super-polynomial'
+    return min(COMPLEXITY_CLASSES, key=lambda entry: abs(entry[0] - exponent))[1]
+
+
+def time_call(func: Callable, data, repeat: int, warmup: int) -> tuple[list[float], str]:
+    """Time repeated calls after some warmup calls, returns times and result."""
+    for _ in range(warmup):
+        func(data)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def bench_part(day: int, part: int, sizes: Optional[tuple[int, ...]] = None, repeat: int = 5,
+               warmup: int = 1, max_seconds: float = 2.0, seed: int = 0) -> Benchmark:
+    """Benchmark one part over growing generated inputs.
+
+    Sizes default to the day's BENCH_SIZES, if it has some, or DEFAULT_SIZES.
+    Sizes whose predicted run time exceeds 'max_seconds' are skipped, so an
+    accidentally quadratic solver does not stall the whole suite. Results are
+    checked against the generated answers."""
+    from aoc import generators  # pylint: disable=import-outside-toplevel
+    module = days.load(day)
+    func = getattr(module, f'part_{part:02d}')
+    benchmark = Benchmark(day=day, part=part)
+
+    for size in sorted(sizes or getattr(module, 'BENCH_SIZES', DEFAULT_SIZES)):
+        if benchmark.measurements and predict(benchmark, size) > max_seconds:
+            benchmark.skipped.append(size)
+            continue
+        try:
+            generated = generators.generate(day, size=size, seed=seed)
+            times, result = time_call(func, generated.lines, repeat=repeat, warmup=warmup)
+        except Exception as exc:  # pylint: disable=broad-except
+            benchmark.error, benchmark.failed_size = f'size {size}: {type(exc).__name__}: {exc}', size
+            break
+        benchmark.measurements.append(Measurement(size=size, times=times))
+        if generated.answers.get(part) not in (None, result):
+            benchmark.error = f'size {size}: wrong answer {result}, expected {generated.answers[part]}'
+            benchmark.failed_size = size
+            break
+
+    return benchmark
+
+
+def predict(benchmark: Benchmark, size: int) -> float:
+    """Extrapolate run time of a single call from the largest measured size."""
+    last = benchmark.measurements[-1]
+    exponent = max(1.0, benchmark.exponent() or 1.0)
+    return last.median * (size / last.size) ** exponent
+
+
+def format_human(benchmarks: list[Benchmark]) -> str:
+    """Render benchmark results as table."""
+    lines = []
+    for bench in benchmarks:
+        exponent = bench.exponent()
+        fitted = f'n^{exponent:.2f}' if exponent is not None else '-'
+        lines.append(f'day {bench.day:02d} part {bench.part}: {bench.complexity()} ({fitted})'
+                     + (f'  ERROR {bench.error}' if bench.error else ''))
+        for m in bench.measurements:
+            lines.append(f'  {m.size:>6}x  median {m.median * 1e3:10.3f}ms  best {m.best * 1e3:10.3f}ms'
+                         f'  stdev {m.stdev * 1e3:8.3f}ms')
+        if bench.skipped:
+            lines.append(f'  skipped sizes {", ".join(map(str, bench.skipped))}')
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------
+def test_fit_exponent():
+    """Tests fitting of growth exponent"""
+    assert abs(2.0 - fit_exponent([(1, 1.0), (10, 100.0), (100, 10000.0)])) < 1e-9
+    assert 'O(n)' == classify(1.1)
+    assert fit_exponent([(1, 1.0)]) is None
+
+
+def test_bench_part():
+    """Tests benchmarking with skipped sizes"""
+    bench = bench_part(9, 1, sizes=(1, 2, 10 ** 6), repeat=2, warmup=0)
+    assert [1, 2] == [m.size for m in bench.measurements] and [10 ** 6] == bench.skipped
+    assert bench.error is None
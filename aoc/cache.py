@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Persistent on-disk cache of parsed input models and answers.
+
+Models are keyed by day, the day's PARSER_VERSION and the hash of the input
+file, so days have to bump PARSER_VERSION whenever parse() or its model
+changes. Array fields of dataclass models are stored as '.npy' files and memory
+mapped on load, everything else is pickled. The cache is bounded in size and
+evicts least recently used entries. Set AOC_NO_CACHE=1 to bypass it.
+
+Answers are keyed by day, part, input hash and the hash of the solver source,
+which covers the day module and the shared 'aoc' modules it uses, so editing
+a solution invalidates its answers.
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import sys
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Final, Optional
+
+from aoc import ROOT
+from aoc.inputs import read_chunks
+
+
+CACHE_DIR: Final[Path] = Path(os.getenv('AOC_CACHE_DIR', str(ROOT / '.cache')))
+
+MAX_CACHE_BYTES: Final[int] = int(os.getenv('AOC_CACHE_SIZE', str(256 * 2 ** 20)))
+
+MAX_RESULTS: Final[int] = int(os.getenv('AOC_CACHE_RESULTS', '10000'))
+
+MODEL_FILE: Final[str] = 'model.pkl'
+
+
+def enabled() -> bool:
+    """Cache is on unless bypassed by environment."""
+    return os.getenv('AOC_NO_CACHE', '') in ('', '0')
+
+
+def file_hash(filename: str) -> str:
+    """Content hash of a file, read in chunks, of the decoded content if it is compressed."""
+    digest = hashlib.sha256()
+    for chunk in read_chunks(filename):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def model_key(module: ModuleType, input_hash: str) -> str:
+    """Entry name of a parsed model."""
+    return f'{module.__name__}-v{getattr(module, "PARSER_VERSION", 0)}-{input_hash[:32]}'
+
+
+# --------------------------------------------------
+def load_model(module: ModuleType, filename: str, use_cache: bool = True,
+               directory: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES,
+               input_hash: Optional[str] = None, read: Optional[Callable[[], Any]] = None) -> Any:
+    """Load and parse input of a day, served from cache when possible.
+
+    'read' replaces the day's load_data(), e.g. to take lines from shared memory."""
+    read = read or (lambda: module.load_data(filename))
+    if not (use_cache and enabled()):
+        return module.parse(read())
+
+    entry = directory / 'models' / model_key(module, input_hash or file_hash(filename))
+    model = read_entry(entry)
+    if model is None:
+        model = module.parse(read())
+        write_entry(entry, model)
+        evict(directory / 'models', max_bytes)
+    return model
+
+
+def read_entry(entry: Path) -> Optional[Any]:
+    """Restore model of a cache entry, None on miss or unreadable entry."""
+    try:
+        with open(entry / MODEL_FILE, 'rb') as file:
+            model = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+        return None
+
+    if dataclasses.is_dataclass(model):
+        arrays = {path.stem: path for path in entry.glob('*.npy')}
+        if arrays:
+            import numpy as np  # pylint: disable=import-outside-toplevel
+            for name, path in arrays.items():
+                object.__setattr__(model, name, np.load(path, mmap_mode='r'))
+    os.utime(entry / MODEL_FILE)  # recently used
+    return model
+
+
+def write_entry(entry: Path, model: Any) -> None:
+    """Store model, array fields go into separate files to be memory mapped."""
+    staging = entry.with_name(entry.name + f'.tmp{os.getpid()}')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    arrays = array_fields(model)
+    if arrays:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        for name, value in arrays.items():
+            np.save(staging / f'{name}.npy', value)
+        model = dataclasses.replace(model, **{name: None for name in arrays})
+
+    with open(staging / MODEL_FILE, 'wb') as file:
+        pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        staging.rename(entry)
+    except OSError:  # written concurrently by someone else
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def array_fields(model: Any) -> dict[str, Any]:
+    """Numpy array fields of a dataclass model."""
+    numpy = sys.modules.get('numpy')
+    if numpy is None or not dataclasses.is_dataclass(model):
+        return {}
+    return {field.name: getattr(model, field.name) for field in dataclasses.fields(model)
+            if isinstance(getattr(model, field.name), numpy.ndarray)}
+
+
+def entry_size(entry: Path) -> int:
+    """Bytes used by a cache entry."""
+    return sum(path.stat().st_size for path in entry.iterdir())
+
+
+def evict(directory: Path, max_bytes: int) -> None:
+    """Drop least recently used entries until the cache fits its budget."""
+    entries = []
+    for entry in directory.iterdir():
+        try:
+            entries.append(((entry / MODEL_FILE).stat().st_mtime, entry_size(entry), entry))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+
+@lru_cache(maxsize=None)
+def solver_hash(module: ModuleType) -> str:
+    """Hash of a day's source and of the shared modules it refers to."""
+    digest = hashlib.sha256(inspect.getsource(module).encode('utf-8'))
+    shared = {name: sys.modules[name] for value in vars(module).values()
+              for name in [getattr(value, '__module__', None) or getattr(value, '__name__', '')]
+              if isinstance(name, str) and name.startswith('aoc.') and name in sys.modules}
+    for name in sorted(shared):
+        digest.update(inspect.getsource(shared[name]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def result_path(module: ModuleType, part: int, input_hash: str, directory: Path) -> Path:
+    """File holding a memoized answer."""
+    return directory / 'results' / f'{module.__name__}-{part}-{input_hash[:32]}-{solver_hash(module)[:32]}.json'
+
+
+def load_result(module: ModuleType, part: int, input_hash: str, directory: Path = CACHE_DIR) -> Optional[str]:
+    """Memoized answer or None."""
+    if not enabled():
+        return None
+    path = result_path(module, part, input_hash, directory)
+    try:
+        with open(path, 'rt', encoding='utf-8') as file:
+            result = json.load(file)['result']
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(path)  # recently used
+    return result
+
+
+def store_result(module: ModuleType, part: int, input_hash: str, result: str,
+                 directory: Path = CACHE_DIR, max_results: int = MAX_RESULTS) -> None:
+    """Memoize answer and keep only the most recently used ones."""
+    if not enabled():
+        return
+    path = result_path(module, part, input_hash, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_suffix(f'.tmp{os.getpid()}')
+    with open(staging, 'wt', encoding='utf-8') as file:
+        json.dump({'day': module.__name__, 'part': part, 'result': result}, file)
+    os.replace(staging, path)
+
+    results = sorted(path.parent.glob('*.json'), key=lambda p: p.stat().st_mtime)
+    for stale in results[:max(0, len(results) - max_results)]:
+        stale.unlink(missing_ok=True)
+
+
+# --------------------------------------------------
+def test_load_model(tmp_path):
+    """Tests models are cached and reloaded, array fields memory mapped"""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from aoc import days, generators  # pylint: disable=import-outside-toplevel
+    module = days.load(9)
+    (tmp_path / 'input').write_text(generators.generate(9, size=2).text(), encoding='utf-8')  # tokenized by numpy
+    first = load_model(module, str(tmp_path / 'input'), directory=tmp_path)
+    second = load_model(module, str(tmp_path / 'input'), directory=tmp_path)
+    assert first is not second and isinstance(second.values, np.memmap)
+    assert (first.values == second.values).all() and first.extrapolated == second.extrapolated
+    assert 1 == len(list((tmp_path / 'models').iterdir()))
+
+
+def test_array_fields(tmp_path):
+    """Tests array fields are memory mapped"""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    model = days.load(8).LockstepSimulator(trajectory=np.arange(6).reshape(2, 3), on_target=np.zeros((2, 3), bool),
+                                           starts=np.array([0]))
+    write_entry(tmp_path / 'entry', model)
+    restored = read_entry(tmp_path / 'entry')
+    assert isinstance(restored.trajectory, np.memmap) and 5 == restored.trajectory[1, 2]
+
+
+def test_results(tmp_path):
+    """Tests answers are memoized per input and limited in number"""
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    module = days.load(6)
+    assert load_result(module, 1, 'abc', tmp_path) is None
+    store_result(module, 1, 'abc', '288', tmp_path)
+    assert '288' == load_result(module, 1, 'abc', tmp_path)
+    assert load_result(module, 2, 'abc', tmp_path) is None
+    for part in range(5):
+        store_result(module, part, 'def', str(part), tmp_path, max_results=3)
+    assert 3 == len(list((tmp_path / 'results').iterdir()))
+
+
+def test_evict(tmp_path):
+    """Tests least recently used entries get evicted"""
+    for name in 'abc':
+        write_entry(tmp_path / name, list(range(1000)))
+    os.utime(tmp_path / 'a' / MODEL_FILE, (0, 0))
+    evict(tmp_path, 2 * entry_size(tmp_path / 'b'))
+    assert ['b', 'c'] == sorted(path.name for path in tmp_path.iterdir())
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Long-lived solver daemon keeping day modules and parsed models warm.
+
+Usage  : python -m aoc serve [--socket PATH] [--jobs N]
+         python -m aoc ask DAY [--part N] [--input FILE | --stdin] [--socket PATH]
+
+Clients talk newline delimited json over a Unix domain socket, one request per
+line and one response line per request:
+
+    {"op": "solve", "day": 9, "parts": [1, 2], "path": "09/input"}
+    {"op": "solve", "day": 9, "data": "0 3 6 9 12 15\\n..."}
+    {"op": "ping"}  {"op": "shutdown"}
+
+The event loop only reads requests and hashes inline data, solving runs on a
+pool of worker processes. Every worker keeps imported day modules and a few
+recently used models, keyed by the input file's identity or the hash of inline
+data. Requests for the same input always go to the same worker, so repeated
+requests skip import and parsing. asyncio and the pool are only imported by
+the server side, clients stay quick to start.
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Optional
+
+from aoc import cache, days, progress
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+
+SOCKET_PATH: Final[Path] = Path(os.getenv('AOC_SOCKET', str(cache.CACHE_DIR / 'daemon.sock')))
+
+WARM_MODELS: Final[int] = 32
+
+LIMIT: Final[int] = 2 ** 30  # longest request line, inline inputs included
+
+models: OrderedDict[tuple, Any] = OrderedDict()  # per worker process
+
+
+# --------------------------------------------------
+def input_key(day: int, path: Optional[str], data: Optional[str]) -> tuple:
+    """Identity of an input, changes whenever the file gets rewritten."""
+    if data is not None:
+        return day, 'data', hashlib.sha256(data.encode('utf-8')).hexdigest()
+    stat = os.stat(path)  # type: ignore[arg-type]
+    return day, os.path.realpath(path), stat.st_mtime_ns, stat.st_size  # type: ignore[arg-type]
+
+
+def warm_model(key: tuple, path: Optional[str], data: Optional[str], use_cache: bool) -> tuple[Any, bool]:
+    """Model of an input, parsed at most once per worker while it stays warm."""
+    if key in models:
+        models.move_to_end(key)
+        return models[key], True
+
+    module = days.load(key[0])
+    fused = hasattr(module, 'parse')
+    if data is not None:
+        lines = [line.rstrip() for line in data.splitlines()]
+        model = module.parse(lines) if fused else lines
+    elif fused:
+        model = cache.load_model(module, path, use_cache)  # type: ignore[arg-type]
+    else:
+        model = module.load_data(path)
+
+    models[key] = model
+    while len(models) > WARM_MODELS:
+        models.popitem(last=False)
+    return model, False
+
+
+def solve(key: tuple, parts: list[int], path: Optional[str], data: Optional[str],
+          use_cache: bool = True) -> dict:
+    """Worker side of a solve request."""
+    start = time.perf_counter()
+    module = days.load(key[0])
+    model, warm = warm_model(key, path, data, use_cache)
+    parse_time = time.perf_counter() - start
+
+    fused = hasattr(module, 'parse')
+    results = []
+    for part in parts:
+        start = time.perf_counter()
+        try:
+            result, error = getattr(module, f'solve_{part:02d}' if fused else f'part_{part:02d}')(model), None
+        except Exception as exc:  # pylint: disable=broad-except
+            result, error = None, f'{type(exc).__name__}: {exc}'
+        results.append({'part': part, 'result': result, 'error': error, 'solve_time': time.perf_counter() - start})
+    return {'day': key[0], 'warm': warm, 'parse_time': parse_time, 'pid': os.getpid(), 'results': results}
+
+
+# --------------------------------------------------
+class Daemon:
+    """Accepts clients on a Unix socket and hands solving to a process pool."""
+    def __init__(self, path: Path = SOCKET_PATH, workers: Optional[int] = None, use_cache: bool = True) -> None:
+        self.path = path
+        self.workers = workers
+        self.use_cache = use_cache
+        self.pools: list["ProcessPoolExecutor"] = []
+        self.stopped: Optional["asyncio.Event"] = None
+
+    async def serve(self) -> None:
+        """Serve until shut down by request or signal."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        self.stopped = asyncio.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)  # left over by a killed daemon
+        if threading.current_thread() is threading.main_thread():
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, self.stopped.set)
+
+        self.pools = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers or os.cpu_count() or 1)]
+        try:
+            server = await asyncio.start_unix_server(self.handle, path=str(self.path), limit=LIMIT)
+            async with server:
+                await self.stopped.wait()
+        finally:
+            self.path.unlink(missing_ok=True)
+            for pool in self.pools:
+                pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter") -> None:
+        """Answer requests of one client in order."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+        try:
+            while line := await reader.readline():
+                response = await self.respond(line)
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.CancelledError):  # client gone, line too long or shutdown
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line: bytes) -> dict:
+        """Response to a single request, errors included."""
+        import asyncio  # pylint: disable=import-outside-toplevel
+        try:
+            request = json.loads(line)
+            op = request.get('op', 'solve')
+            if op == 'ping':
+                return {'ok': True, 'pid': os.getpid()}
+            if op == 'shutdown':
+                self.stopped.set()  # type: ignore[union-attr]
+                return {'ok': True}
+            if op != 'solve':
+                raise ValueError(f"unknown op {op}")
+
+            day, data = int(request['day']), request.get('data')
+            path = None if data is not None else str(days.input_path(day, request.get('path', '{day:02d}/input')))
+            parts = [int(part) for part in request.get('parts', (1, 2))]
+            key = await asyncio.to_thread(input_key, day, path, data)
+            pool = self.pools[hash(key) % len(self.pools)]  # same input, same warm worker
+            response = await asyncio.get_running_loop().run_in_executor(pool, solve, key, parts, path, data,
+                                                                        self.use_cache)
+            return {'ok': True} | response
+        except Exception as exc:  # pylint: disable=broad-except
+            return {'ok': False, 'error': f'{type(exc).__name__}: {exc}'}
+
+
+# --------------------------------------------------
+def request(payload: dict, path: Path = SOCKET_PATH, timeout: Optional[float] = None) -> dict:
+    """Send one request to a running daemon and wait for its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(path))
+        client.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        with client.makefile('rb') as stream:
+            return json.loads(stream.readline())
+
+
+def serve(path: Path = SOCKET_PATH, workers: Optional[int] = None, use_cache: bool = True) -> None:
+    """Run daemon in the foreground, without progress output."""
+    import asyncio  # pylint: disable=import-outside-toplevel
+    progress.disable()
+    asyncio.run(Daemon(path, workers, use_cache).serve())
+
+
+# --------------------------------------------------
+def test_daemon(tmp_path):
+    """Tests solving over the socket, a second request is served warm"""
+    import asyncio  # pylint: disable=import-outside-toplevel
+    path = tmp_path / 'daemon.sock'
+    (tmp_path / 'input').write_text(days.load(6).TEST_DATA, encoding='utf-8')
+    server = threading.Thread(target=lambda: asyncio.run(Daemon(path, workers=2, use_cache=False).serve()))
+    server.start()
+    try:
+        for _ in range(500):
+            if path.exists():
+                break
+            time.sleep(0.01)
+        first = request({'day': 6, 'path': str(tmp_path / 'input')}, path, timeout=30)
+        second = request({'day': 6, 'path': str(tmp_path / 'input'), 'parts': [2]}, path, timeout=30)
+        inline = request({'day': 6, 'data': days.load(6).TEST_DATA, 'parts': [1]}, path, timeout=30)
+        assert ['288', '71503'] == [res['result'] for res in first['results']]
+        assert not first['warm'] and second['warm'] and '288' == inline['results'][0]['result']
+        assert not request({'day': 99}, path, timeout=30)['ok']
+    finally:
+        request({'op': 'shutdown'}, path, timeout=30)
+        server.join()
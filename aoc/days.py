@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Discover and import the 'NN/aoc_2023_NN.py' day modules.
+"""
+
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Final
+
+from aoc import ROOT
+
+
+DAY_REGEX: Final[re.Pattern] = re.compile(r'^(\d{2})/aoc_2023_\1\.py$')
+
+
+def discover(root: Path = ROOT) -> dict[int, Path]:
+    """Map day number to module path, nothing gets imported here."""
+    days: dict[int, Path] = {}
+    for path in sorted(root.glob('[0-9][0-9]/aoc_2023_[0-9][0-9].py')):
+        match = DAY_REGEX.match(path.relative_to(root).as_posix())
+        if match:
+            days[int(match.group(1))] = path
+    return days
+
+
+def module_name(day: int) -> str:
+    """Module name a day gets imported as."""
+    return f'aoc_2023_{day:02d}'
+
+
+def load(day: int, root: Path = ROOT) -> ModuleType:
+    """Import module of given day, only once per process."""
+    name = module_name(day)
+    if name in sys.modules:
+        return sys.modules[name]
+
+    days = discover(root)
+    if day not in days:
+        raise ValueError(f"no solution for day {day}")
+
+    spec = importlib.util.spec_from_file_location(name, days[day])
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # dataclasses and pickle look modules up by name
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def input_path(day: int, pattern: str, root: Path = ROOT) -> Path:
+    """Expand input path pattern like '{day:02d}/input', relative to repository root."""
+    return root / pattern.format(day=day)
+
+
+# --------------------------------------------------
+def test_discover():
+    """Tests discovery of day modules"""
+    days = discover()
+    assert 1 in days and days[1].name == 'aoc_2023_01.py'
+
+
+def test_load():
+    """Tests importing a day module once"""
+    module = load(1)
+    assert module is load(1)
+    assert '142' == module.part_01(module.TEST_DATA.split())
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Differential checks of fast engines against the reference engines.
+
+Usage  : python -m aoc check [DAY ...] [--part N] [--samples N] [--size N] [--input PATTERN ...] [--json]
+
+Days register alternative implementations per part, each taking input lines:
+
+    ENGINES = {2: {'reference': part_02_reference, 'fast': part_02}}
+
+Execution backends of a day (see aoc.backends) count as engines too.
+Regular runs only use the fast engine behind solve_NN(). Here all engines run
+on generated inputs and on given input files. The first input they disagree on
+is shrunk line by line (delta debugging) to a small reproducer that still
+shows the same kind of disagreement. Engines exceeding the time limit don't
+count as disagreeing, the input is skipped.
+"""
+
+import signal
+import threading
+from dataclasses import asdict, dataclass, field
+from types import ModuleType
+from typing import Callable, Final, Iterable, Iterator, Optional
+
+
+TIMEOUT: Final[float] = 10.0  # seconds per engine and input
+
+
+@dataclass
+class Outcome:
+    """Answer of an engine, or why there is none."""
+    result: Optional[str] = None
+    error: Optional[str] = None  # exception, 'timeout' if interrupted
+
+    @property
+    def kind(self) -> str:
+        """'ok' or the type of error, what minimizing has to preserve."""
+        return 'ok' if self.error is None else self.error.split(':')[0]
+
+
+@dataclass
+class Mismatch:
+    """First disagreement found and its minimized reproducer."""
+    source: str
+    outcomes: dict[str, Outcome]
+    reproducer: list[str]
+    reproducer_outcomes: dict[str, Outcome] = field(default_factory=dict)
+
+
+@dataclass
+class CheckReport:
+    """Result of checking the engines of a (day, part)."""
+    day: int
+    part: int
+    engines: list[str]
+    checked: int = 0
+    skipped: int = 0
+    mismatch: Optional[Mismatch] = None
+
+    def as_dict(self) -> dict:
+        """Plain representation for json reports."""
+        return asdict(self)
+
+
+# --------------------------------------------------
+def engines(module: ModuleType) -> dict[int, dict[str, Callable]]:
+    """Registered engines and backends of a day per part, empty if it has none."""
+    from aoc import backends  # pylint: disable=import-outside-toplevel
+    merged = {part: dict(funcs) for part, funcs in getattr(module, 'ENGINES', {}).items()}
+    for part, funcs in backends.as_engines(module).items():
+        merged.setdefault(part, {}).update(funcs)
+    return merged
+
+
+def interrupt(*_) -> None:
+    """Alarm handler ending a slow engine."""
+    raise TimeoutError('timeout')
+
+
+def run_engine(func: Callable, lines: list[str], timeout: Optional[float] = TIMEOUT) -> Outcome:
+    """Run an engine, time limited when running in the main thread."""
+    limited = bool(timeout) and threading.current_thread() is threading.main_thread()
+    if limited:
+        previous = signal.signal(signal.SIGALRM, interrupt)
+        signal.setitimer(signal.ITIMER_REAL, timeout)  # type: ignore[arg-type]
+    try:
+        return Outcome(result=func(list(lines)))
+    except TimeoutError:
+        return Outcome(error='timeout')
+    except Exception as exc:  # pylint: disable=broad-except
+        return Outcome(error=f'{type(exc).__name__}: {exc}')
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def run_all(funcs: dict[str, Callable], lines: list[str], timeout: Optional[float]) -> dict[str, Outcome]:
+    """Outcomes of all engines on one input."""
+    return {name: run_engine(func, lines, timeout) for name, func in funcs.items()}
+
+
+def disagree(outcomes: dict[str, Outcome]) -> bool:
+    """Engines differ in answer or in failing, timeouts are inconclusive."""
+    if any(outcome.error == 'timeout' for outcome in outcomes.values()):
+        return False
+    return len({(outcome.kind, outcome.result) for outcome in outcomes.values()}) > 1
+
+
+def signature(outcomes: dict[str, Outcome]) -> tuple:
+    """Kind of disagreement, which engines fail how."""
+    return tuple(sorted((name, outcome.kind) for name, outcome in outcomes.items()))
+
+
+def minimize(lines: list[str], failing: Callable[[list[str]], bool]) -> list[str]:
+    """Smallest set of lines found by delta debugging which still fails."""
+    granularity = 2
+    while len(lines) >= 2:
+        size = -(-len(lines) // granularity)
+        chunks = [lines[start:start + size] for start in range(0, len(lines), size)]
+        for index in range(len(chunks)):
+            complement = [line for other, chunk in enumerate(chunks) if other != index for line in chunk]
+            if failing(complement):
+                lines, granularity = complement, max(granularity - 1, 2)
+                break
+        else:
+            if granularity >= len(lines):
+                break
+            granularity = min(len(lines), 2 * granularity)
+    return lines
+
+
+# --------------------------------------------------
+def generated_inputs(day: int, samples: int, size: int = 1, seed: int = 0) -> Iterator[tuple[str, list[str]]]:
+    """Small generated inputs with different seeds."""
+    from aoc import generators  # pylint: disable=import-outside-toplevel
+    options = generators.SMALL.get(day, {})
+    for offset in range(samples):
+        yield f'generated size {size} seed {seed + offset}', generators.generate(day, size, seed + offset, **options).lines
+
+
+def file_inputs(filenames: Iterable[str]) -> Iterator[tuple[str, list[str]]]:
+    """Inputs read from files, compressed ones decoded on the fly."""
+    from aoc.inputs import open_input  # pylint: disable=import-outside-toplevel
+    for filename in filenames:
+        with open_input(filename) as file:
+            yield filename, [line.rstrip() for line in file]
+
+
+def check_part(module: ModuleType, day: int, part: int, inputs: Iterable[tuple[str, list[str]]],
+               timeout: Optional[float] = TIMEOUT) -> CheckReport:
+    """Run all engines of a part on inputs, stop at the first disagreement and minimize it."""
+    funcs = engines(module).get(part, {})
+    report = CheckReport(day=day, part=part, engines=list(funcs))
+    if len(funcs) < 2:
+        return report
+
+    for source, lines in inputs:
+        outcomes = run_all(funcs, lines, timeout)
+        if any(outcome.error == 'timeout' for outcome in outcomes.values()):
+            report.skipped += 1
+            continue
+        report.checked += 1
+        if disagree(outcomes):
+            kind = signature(outcomes)
+
+            def failing(candidate: list[str]) -> bool:
+                found = run_all(funcs, candidate, timeout)
+                return disagree(found) and signature(found) == kind
+
+            reproducer = minimize(lines, failing)
+            report.mismatch = Mismatch(source=source, outcomes=outcomes, reproducer=reproducer,
+                                       reproducer_outcomes=run_all(funcs, reproducer, timeout))
+            break
+
+    return report
+
+
+def format_human(reports: list[CheckReport]) -> str:
+    """Render check results."""
+    lines = []
+    for report in reports:
+        head = f'day {report.day:02d} part {report.part}: {" vs ".join(report.engines)}'
+        if report.mismatch is None:
+            lines.append(f'{head} agree on {report.checked} inputs'
+                         + (f', {report.skipped} skipped after timeout' if report.skipped else ''))
+            continue
+        mismatch = report.mismatch
+        lines.append(f'{head} MISMATCH on {mismatch.source}')
+        for name, outcome in mismatch.reproducer_outcomes.items():
+            lines.append(f'  {name}: {outcome.result if outcome.error is None else "ERROR " + outcome.error}')
+        lines.append(f'  reproducer ({len(mismatch.reproducer)} lines):')
+        lines += [f'    {line}' for line in mismatch.reproducer]
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------
+def test_minimized_mismatch():
+    """Tests the first mismatch gets reduced to the lines causing it"""
+    module = ModuleType('day99')
+    module.ENGINES = {1: {'reference': lambda lines: str(sum(map(int, lines))),  # type: ignore[attr-defined]
+                          'fast': lambda lines: str(sum(int(line) for line in lines if '7' not in line))}}
+    inputs = [('first', ['1', '2', '3']), ('second', [str(value) for value in range(1, 30)])]
+    report = check_part(module, 99, 1, inputs)
+    assert 2 == report.checked and report.mismatch is not None
+    assert report.mismatch.source == 'second' and 1 == len(report.mismatch.reproducer)
+    assert '7' in report.mismatch.reproducer[0]
+
+
+def test_timeouts_are_skipped():
+    """Tests slow engines do not count as mismatch"""
+    def slow(_):
+        while True:
+            pass
+    module = ModuleType('day99')
+    module.ENGINES = {1: {'reference': slow, 'fast': lambda lines: '1'}}  # type: ignore[attr-defined]
+    report = check_part(module, 99, 1, [('input', ['1'])], timeout=0.05)
+    assert (0, 1, None) == (report.checked, report.skipped, report.mismatch)
+
+
+def test_day_engines():
+    """Tests registered engines agree on generated inputs"""
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    for day in (1, 4, 5, 8, 9):
+        module = days.load(day)
+        for part in engines(module):
+            report = check_part(module, day, part, generated_inputs(day, samples=2))
+            assert report.mismatch is None and 2 == report.checked, (day, part)
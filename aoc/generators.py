@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Seeded generators of valid puzzle inputs of arbitrary size.
+
+Size 1 roughly matches the size of a real puzzle input, larger sizes scale the
+number of records. Answers are computed independently of the solutions, so
+they can be used as correctness checks. Days without a generator here may
+bring their own 'generate_input(size, seed)' returning lines and answers.
+
+Usage  : python -m aoc generate DAY [--size N] [--seed N] [-o FILE]
+"""
+
+import random
+import sys
+from dataclasses import dataclass, field
+from functools import reduce
+from math import gcd, isqrt
+from typing import Callable, Final, Optional
+
+
+NUMBERS: Final[list[str]] = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+# letters not occurring in any spelled number, so fillers never create or join numbers
+FILLER: Final[str] = 'abcdjklmpqyz'
+
+PRODUCT_LIMIT: Final[int] = 10 ** 1000  # part 1 of day 06, printable answers have less than 4300 digits
+
+CARDS: Final[str] = '23456789TJQKA'
+
+# node names neither starting nor ending a ghost walk
+NODE_ALPHABET: Final[str] = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+@dataclass
+class Generated:
+    """Generated input lines and, where known, the expected answers per part."""
+    lines: list[str]
+    answers: dict[int, Optional[str]] = field(default_factory=dict)
+
+    def text(self) -> str:
+        """Input as written to a file."""
+        return '\n'.join(self.lines) + '\n'
+
+
+# --------------------------------------------------
+def generate_01(size: int = 1, seed: int = 0, lines: int = 1000) -> Generated:
+    """Calibration lines mixing digits, spelled numbers and filler."""
+    rng = random.Random(seed)
+    data, first_last, first_last_spelled = [], 0, 0
+
+    for _ in range(lines * size):
+        tokens = [(str(value), True) if rng.random() < 0.5 else (NUMBERS[value - 1], False)
+                  for value in (rng.randint(1, 9) for _ in range(rng.randint(1, 6)))]
+        if not any(is_digit for _, is_digit in tokens):
+            tokens.insert(rng.randrange(len(tokens) + 1), (str(rng.randint(1, 9)), True))
+        values = [int(token) if is_digit else NUMBERS.index(token) + 1 for token, is_digit in tokens]
+        digits = [int(token) for token, is_digit in tokens if is_digit]
+        first_last += digits[0] * 10 + digits[-1]
+        first_last_spelled += values[0] * 10 + values[-1]
+        data.append(''.join(filler(rng) + token for token, _ in tokens) + filler(rng))
+
+    return Generated(lines=data, answers={1: str(first_last), 2: str(first_last_spelled)})
+
+
+def filler(rng: random.Random) -> str:
+    """Short run of filler letters, at least one to keep tokens apart."""
+    return ''.join(rng.choice(FILLER) for _ in range(rng.randint(1, 4)))
+
+
+def generate_02(size: int = 1, seed: int = 0, games: int = 100) -> Generated:
+    """Game logs with several draws of colored cubes."""
+    rng = random.Random(seed)
+    data, valid_ids, powers = [], 0, 0
+    limits = {'red': 12, 'green': 13, 'blue': 14}
+
+    for game_id in range(1, games * size + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(list(limits), rng.randint(1, 3))
+            draws.append({color: rng.randint(1, 20) for color in colors})
+        data.append(f'Game {game_id}: ' + '; '.join(
+            ', '.join(f'{amount} {color}' for color, amount in draw.items()) for draw in draws))
+
+        if all(draw.get(color, 0) <= limit for draw in draws for color, limit in limits.items()):
+            valid_ids += game_id
+        needed = [max(draw.get(color, 0) for draw in draws) for color in limits]
+        # colors never drawn do not take part in the product
+        powers += reduce(lambda a, b: a * b, (amount for amount in needed if amount), 1)
+
+    return Generated(lines=data, answers={1: str(valid_ids), 2: str(powers)})
+
+
+def generate_03(size: int = 1, seed: int = 0, width: int = 140, density: float = 0.1) -> Generated:
+    """Engine schematic, numbers never contain a zero which the solution takes for a symbol."""
+    rng = random.Random(seed)
+    height = width * size
+    grid = [['.'] * width for _ in range(height)]
+    numbers: list[tuple[int, int, int, int]] = []  # row, start, end, value
+
+    for row in range(height):
+        col = 0
+        while col < width - 3:
+            if rng.random() < density:
+                length = rng.randint(1, 3)
+                value = ''.join(rng.choice('123456789') for _ in range(length))
+                grid[row][col:col + length] = value
+                numbers.append((row, col, col + length, int(value)))
+                col += length + 1
+            elif rng.random() < density / 2:
+                grid[row][col] = rng.choice('*#+$/=%@&-')
+                col += 2
+            else:
+                col += 1
+
+    part_numbers, gears = 0, 0
+    adjacent: dict[tuple[int, int], list[int]] = {}
+    for row, start, end, value in numbers:
+        touches = [(y, x) for y in range(max(0, row - 1), min(height, row + 2))
+                   for x in range(max(0, start - 1), min(width, end + 1))
+                   if grid[y][x] not in '.123456789']
+        if touches:
+            part_numbers += value
+        for y, x in touches:
+            if grid[y][x] == '*':
+                adjacent.setdefault((y, x), []).append(value)
+    gears = sum(values[0] * values[1] for values in adjacent.values() if len(values) == 2)
+
+    return Generated(lines=[''.join(row) for row in grid], answers={1: str(part_numbers), 2: str(gears)})
+
+
+def generate_04(size: int = 1, seed: int = 0, cards: int = 200, winning: int = 10, numbers: int = 25,
+                mean_matches: float = 0.6) -> Generated:
+    """Scratch cards, keep mean matches below one or the card copies explode."""
+    rng = random.Random(seed)
+    total = cards * size
+    data, points = [], 0
+    copies = [1] * (total + 1)
+
+    for index in range(1, total + 1):
+        matches = min(sample_matches(rng, mean_matches, winning), total - index)
+        pool = rng.sample(range(1, 100), winning + numbers - matches)
+        wins, own = pool[:winning], pool[winning:] + pool[:matches]
+        rng.shuffle(own)
+        data.append(f'Card {index:>3}: ' + ' '.join(f'{n:>2}' for n in wins) + ' | ' + ' '.join(f'{n:>2}' for n in own))
+
+        points += 2 ** (matches - 1) if matches else 0
+        for other in range(index + 1, index + matches + 1):
+            copies[other] += copies[index]
+
+    return Generated(lines=data, answers={1: str(points), 2: str(sum(copies[1:]))})
+
+
+def sample_matches(rng: random.Random, mean: float, limit: int) -> int:
+    """Geometric like amount of matches with given mean."""
+    matches = 0
+    while matches < limit and rng.random() < mean / (1 + mean):
+        matches += 1
+    return matches
+
+
+def generate_05(size: int = 1, seed: int = 0, seeds: int = 10, maps: int = 7, entries: int = 20,
+                domain: int = 10 ** 6, range_length: int = 1000) -> Generated:
+    """Almanac with a chain of maps, seed ranges are kept short for brute force solvers."""
+    rng = random.Random(seed)
+    names = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+    names += [f'stage{i}' for i in range(maps + 1 - len(names))]
+
+    seed_values = [value for _ in range(seeds * size)
+                   for value in (rng.randint(1, domain), rng.randint(1, range_length))]
+    data = ['seeds: ' + ' '.join(map(str, seed_values))]
+    chain: list[list[tuple[int, int, int]]] = []
+
+    for step in range(maps):
+        cuts = sorted(rng.sample(range(1, 2 * domain), 2 * entries))
+        block = [(rng.randint(1, 2 * domain), start, end - start)
+                 for start, end in zip(cuts[::2], cuts[1::2])]
+        rng.shuffle(block)
+        chain.append(block)
+        data += ['', f'{names[step]}-to-{names[step + 1]} map:'] + [f'{d} {s} {n}' for d, s, n in block]
+
+    lowest = min(apply_chain(value, chain) for value in seed_values)
+    ranges = [(start, start + length) for start, length in zip(seed_values[::2], seed_values[1::2])]
+    for block in chain:
+        ranges = map_ranges(ranges, block)
+
+    return Generated(lines=data, answers={1: str(lowest), 2: str(min(start for start, _ in ranges))})
+
+
+def apply_chain(value: int, chain: list[list[tuple[int, int, int]]]) -> int:
+    """Push single value through all maps."""
+    for block in chain:
+        for dst, src, length in block:
+            if src <= value < src + length:
+                value = value - src + dst
+                break
+    return value
+
+
+def map_ranges(ranges: list[tuple[int, int]], block: list[tuple[int, int, int]]) -> list[tuple[int, int]]:
+    """Push half open ranges through one map, splitting them at entry borders."""
+    result = []
+    for start, end in ranges:
+        pending = [(start, end)]
+        for dst, src, length in block:
+            unmatched = []
+            for lo, hi in pending:
+                if max(lo, src) < min(hi, src + length):
+                    result.append((max(lo, src) - src + dst, min(hi, src + length) - src + dst))
+                unmatched += [(a, b) for a, b in ((lo, min(hi, src)), (max(lo, src + length), hi)) if a < b]
+            pending = unmatched
+        result += pending
+    return result
+
+
+def generate_06(size: int = 1, seed: int = 0, races: int = 4) -> Generated:
+    """Race table, part 2 joins all columns into one race, its answer is unknown beyond int conversion limits.
+
+    Once the product of part 1 gets close to that limit further races have a
+    single way to win, so the product stays printable."""
+    rng = random.Random(seed)
+    table, product = [], 1
+    for _ in range(races * size):
+        if product < PRODUCT_LIMIT:
+            time = rng.randint(7, 99)
+            record = rng.randint(time, time * time // 4 - 1)
+        else:
+            time = rng.randrange(8, 100, 2)
+            record = time * time // 4 - 1  # only charging half the time wins
+        table.append((time, record))
+        product *= ways_to_win(time, record)
+
+    joined_time = ''.join(str(time) for time, _ in table)
+    joined_record = ''.join(str(record) for _, record in table)
+    joined = None
+    if len(joined_record) <= (sys.get_int_max_str_digits() or len(joined_record)):  # too long to convert otherwise
+        joined = str(ways_to_win(int(joined_time), int(joined_record)))
+
+    width = max(len(str(value)) for race in table for value in race) + 1
+    return Generated(lines=['Time:    ' + ''.join(f'{time:>{width}}' for time, _ in table),
+                            'Distance:' + ''.join(f'{record:>{width}}' for _, record in table)],
+                     answers={1: str(product), 2: joined})
+
+
+def ways_to_win(time: int, record: int) -> int:
+    """Count charge times beating the record, exact integer arithmetic."""
+    discriminant = time * time - 4 * record
+    if discriminant <= 0:
+        return 0
+    low = (time - isqrt(discriminant)) // 2
+    while low * (time - low) <= record:
+        low += 1
+    while low > 0 and (low - 1) * (time - low + 1) > record:
+        low -= 1
+    high = time - low
+    return max(0, high - low + 1)
+
+
+def generate_07(size: int = 1, seed: int = 0, hands: int = 1000) -> Generated:
+    """Distinct hands with bids, equal hands would tie.
+
+    Raises ValueError beyond the 13 ** 5 distinct hands there are."""
+    rng = random.Random(seed)
+    if hands * size > len(CARDS) ** 5:
+        raise ValueError(f"{hands * size} hands asked for, only {len(CARDS) ** 5} distinct ones exist")
+    drawn = [''.join(CARDS[number // len(CARDS) ** digit % len(CARDS)] for digit in range(5))
+             for number in rng.sample(range(len(CARDS) ** 5), hands * size)]
+    table = [(cards, rng.randint(1, 1000)) for cards in sorted(drawn)]
+    rng.shuffle(table)
+
+    answers = {}
+    for part, order, joker in ((1, CARDS, False), (2, 'J' + CARDS.replace('J', ''), True)):
+        ranked = sorted(table, key=lambda hand: (hand_kind(hand[0], joker), [order.index(c) for c in hand[0]]))
+        answers[part] = str(sum(rank * bid for rank, (_, bid) in enumerate(ranked, start=1)))
+
+    return Generated(lines=[f'{cards} {bid}' for cards, bid in table], answers=answers)
+
+
+def hand_kind(cards: str, joker: bool) -> list[int]:
+    """Sorted group sizes, comparing them orders hand types, jokers join the largest group."""
+    jokers = cards.count('J') if joker else 0
+    groups = sorted((cards.count(card) for card in set(cards) if not (joker and card == 'J')), reverse=True) or [0]
+    groups[0] += jokers
+    return groups
+
+
+def generate_08(size: int = 1, seed: int = 0, ghosts: int = 6,
+                cycles: tuple[int, ...] = (3, 5, 7, 11, 13, 17, 19, 23),
+                instruction_length: Optional[int] = None, nodes: int = 750) -> Generated:
+    """Node network where every ghost loops back to its start's successor after its Z node.
+
+    The instructions end with the only run of 'marker' L's. Every ghost walks
+    a small automaton counting these runs, ghost k reaches its Z node after
+    cycles[k] runs, that is cycles[k] * len(instructions) steps, and only there,
+    so part 2 is len(instructions) * lcm(cycles). 'AAA' and 'ZZZ' belong to the
+    first ghost. The walk needs sum(cycles) * marker nodes only, unreachable
+    decoys make up 'nodes' * size nodes, as far as 3 character names go."""
+    rng = random.Random(seed)
+    length = instruction_length or next_prime(13 * size)
+    marker = max(3, length.bit_length())
+    if length < marker + 2:
+        raise ValueError(f"instructions need at least {marker + 2} steps")
+    letters = [rng.choice('LR') for _ in range(length - marker)] + ['L'] * marker
+    letters[0] = letters[-marker - 1] = 'R'
+    run = 0
+    for step in range(length - marker):  # no other run reaches the marker
+        run = run + 1 if letters[step] == 'L' else 0
+        if run == marker:
+            letters[step], run = 'R', 0
+    instructions = ''.join(letters)
+    cycles = cycles[:ghosts]
+
+    inner = [a + b + c for a in NODE_ALPHABET for b in NODE_ALPHABET for c in NODE_ALPHABET if c not in 'AZ']
+    needed = sum(cycle * marker - 1 for cycle in cycles)
+    if needed > len(inner) or ghosts > len(cycles):
+        raise ValueError(f"network with {needed} nodes does not fit into 3 character names")
+    names = iter(rng.sample(inner, min(len(inner), max(needed, nodes * size))))
+    ends = ['AA'] + rng.sample([a + b for a in NODE_ALPHABET for b in NODE_ALPHABET if a + b not in ('AA', 'ZZ')],
+                               len(cycles) - 1)
+
+    network: dict[str, tuple[str, str]] = {}
+    for ghost, cycle in enumerate(cycles):
+        start, target = ends[ghost] + 'A', ('ZZ' if ghost == 0 else ends[ghost]) + 'Z'
+        # state (laps, trailing L's) of the walk, seeing the marker completes a lap
+        states = {(lap, run): next(names) for lap in range(cycle) for run in range(marker) if lap or run}
+        states[0, 0] = start
+        for (lap, run), node in states.items():
+            left = (states[lap, run + 1] if run + 1 < marker else
+                    states[lap + 1, 0] if lap + 1 < cycle else target)
+            network[node] = (left, states[lap, 0])
+        # the Z node continues like the start node, it is reached at the end of the instructions
+        network[target] = network[start]
+    decoys = list(names)
+    for node in decoys:
+        network[node] = (rng.choice(decoys), rng.choice(decoys))
+
+    lines = [instructions, ''] + [f'{node} = ({left}, {right})'
+                                  for node, (left, right) in rng.sample(list(network.items()), len(network))]
+    return Generated(lines=lines, answers={1: str(cycles[0] * length),
+                                           2: str(length * reduce(lambda a, b: a * b // gcd(a, b), cycles))})
+
+
+def next_prime(number: int) -> int:
+    """Smallest prime not below number."""
+    while any(number % divisor == 0 for divisor in range(2, isqrt(number) + 1)):
+        number += 1
+    return number
+
+
+def generate_09(size: int = 1, seed: int = 0, rows: int = 200, length: int = 21, degree: int = 8) -> Generated:
+    """OASIS report rows sampled from integer polynomials of limited degree."""
+    rng = random.Random(seed)
+    data, forward, backward = [], 0, 0
+    for _ in range(rows * size):
+        coefficients = [rng.randint(-9, 9) for _ in range(rng.randint(1, min(degree, length - 2) + 1))]
+
+        def poly(x: int, coefficients=coefficients) -> int:
+            return sum(c * x ** i for i, c in enumerate(coefficients))
+        data.append(' '.join(str(poly(x)) for x in range(length)))
+        forward += poly(length)
+        backward += poly(-1)
+    return Generated(lines=data, answers={1: str(forward), 2: str(backward)})
+
+
+GENERATORS: Final[dict[int, Callable[..., Generated]]] = {
+    1: generate_01,
+    2: generate_02,
+    3: generate_03,
+    4: generate_04,
+    5: generate_05,
+    6: generate_06,
+    7: generate_07,
+    8: generate_08,
+    9: generate_09,
+}
+
+
+def generate(day: int, size: int = 1, seed: int = 0, **options) -> Generated:
+    """Generate input for given day, with the day's own generator if there is none here."""
+    if day in GENERATORS:
+        return GENERATORS[day](size=size, seed=seed, **options)
+
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    module = days.load(day) if day in days.discover() else None
+    if not hasattr(module, 'generate_input'):
+        raise ValueError(f"no generator for day {day}")
+    lines, answers = module.generate_input(size=size, seed=seed, **options)  # type: ignore[union-attr]
+    return Generated(lines=list(lines), answers=dict(answers))
+
+
+# --------------------------------------------------
+SMALL: Final[dict[int, dict]] = {
+    1: {'lines': 50}, 2: {'games': 30}, 3: {'width': 30}, 4: {'cards': 40}, 5: {'seeds': 4, 'range_length': 50},
+    6: {}, 7: {'hands': 100}, 8: {'ghosts': 3, 'cycles': (3, 5, 7)}, 9: {'rows': 20},
+}
+
+
+def test_generated_answers():
+    """Tests solutions agree with generated answers"""
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    for day, options in SMALL.items():
+        module = days.load(day)
+        for seed in range(2):
+            generated = generate(day, seed=seed, **options)
+            for part, answer in generated.answers.items():
+                assert answer == getattr(module, f'part_{part:02d}')(generated.lines), (day, part, seed)
+
+
+def test_reproducible():
+    """Tests generators are seeded"""
+    assert generate(8, seed=3, ghosts=2, cycles=(3, 5)) == generate(8, seed=3, ghosts=2, cycles=(3, 5))
+    assert generate(9, seed=1).lines != generate(9, seed=2).lines
+
+
+def test_large_sizes():
+    """Tests generators scale beyond limits of conversion and node names"""
+    races = generate(6, size=1000)
+    assert races.answers[2] is None and len(races.answers[1]) < 1100
+    network = generate(8, size=1000, ghosts=2)
+    assert len(network.lines) > 40000 and ['39003', '195015'] == [network.answers[1], network.answers[2]]
+    try:
+        generate(7, size=1000)
+        assert False, 'more hands than distinct ones generated'
+    except ValueError:
+        pass
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Character grids as one flat byte buffer, for the grid puzzles.
+
+Rows are stored back to back with a stride, surrounded by 'pad' cells of a
+sentinel byte on every side. A cell is addressed by a single index, its
+neighbours are the index plus precomputed offsets, and as long as walks stay
+within 'pad' steps of the grid they see sentinels instead of needing bounds
+checks. Regular expressions run directly on the buffer row by row.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Final, Iterable, Iterator
+
+
+SENTINEL: Final[int] = ord('.')
+
+
+@dataclass
+class Grid:
+    """Padded flat grid of bytes, cell (row, col) lives at index (row + pad) * stride + col + pad."""
+    data: bytearray
+    width: int
+    height: int
+    pad: int = 1
+    stride: int = field(init=False)
+    offsets: tuple[int, ...] = field(init=False, repr=False)  # 8 neighbours, row by row
+    orthogonal: tuple[int, ...] = field(init=False, repr=False)  # up, left, right, down
+
+    def __post_init__(self) -> None:
+        self.stride = self.width + 2 * self.pad
+        self.offsets = tuple(dy * self.stride + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx)
+        self.orthogonal = (-self.stride, -1, 1, self.stride)
+
+    @staticmethod
+    def from_lines(lines: Iterable[str], pad: int = 1, sentinel: int = SENTINEL) -> "Grid":
+        """Grid of text lines, shorter lines get filled up with the sentinel."""
+        rows = [line.rstrip('\r\n').encode('ascii') for line in lines]
+        while rows and not rows[-1]:
+            rows.pop()
+        width = max(map(len, rows), default=0)
+        stride = width + 2 * pad
+        filler = bytes([sentinel])
+
+        data = bytearray(filler * (stride * pad))
+        for row in rows:
+            data += filler * pad + row.ljust(width, filler) + filler * pad
+        data += filler * (stride * pad)
+        return Grid(data=data, width=width, height=len(rows), pad=pad)
+
+    def index(self, row: int, col: int) -> int:
+        """Flat index of a cell."""
+        return (row + self.pad) * self.stride + col + self.pad
+
+    def coords(self, index: int) -> tuple[int, int]:
+        """Cell (row, col) of a flat index."""
+        row, col = divmod(index, self.stride)
+        return row - self.pad, col - self.pad
+
+    def row(self, row: int) -> bytes:
+        """Bytes of a row without padding."""
+        start = self.index(row, 0)
+        return bytes(self.data[start:start + self.width])
+
+    def rows(self) -> Iterator[tuple[int, int]]:
+        """Start and end index of every row, padding excluded."""
+        for row in range(self.height):
+            start = self.index(row, 0)
+            yield start, start + self.width
+
+    def finditer(self, pattern: re.Pattern) -> Iterator[re.Match]:
+        """Matches of a bytes pattern within rows, positions are flat indices."""
+        for start, end in self.rows():
+            yield from pattern.finditer(self.data, start, end)
+
+    def find(self, values: bytes) -> list[int]:
+        """Flat indices of all cells holding one of given bytes, in order."""
+        return [match.start() for match in self.finditer(re.compile(b'[' + re.escape(values) + b']'))]
+
+    def border(self, index: int, length: int) -> list[int]:
+        """Indices around a horizontal run of cells, diagonals included."""
+        above, below = index - self.stride, index + self.stride
+        return ([*range(above - 1, above + length + 1), index - 1, index + length,
+                 *range(below - 1, below + length + 1)])
+
+    def array(self):
+        """Numpy view (height + 2 pad, stride) of the buffer, without copying."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(-1, self.stride)
+
+
+# --------------------------------------------------
+def test_grid():
+    """Tests addressing, padding and neighbours"""
+    grid = Grid.from_lines(['ab', 'cde', ''])
+    assert (3, 2, 5) == (grid.width, grid.height, grid.stride)
+    assert ord('d') == grid.data[grid.index(1, 1)] and (1, 1) == grid.coords(grid.index(1, 1))
+    assert b'ab.' == grid.row(0)
+    assert b'.....bcd' == bytes(sorted(grid.data[grid.index(0, 0) + offset] for offset in grid.offsets))
+    assert [grid.index(1, 0)] == grid.find(b'c')
+    assert [(0, 0, b'ab'), (1, 0, b'cde')] == [(*grid.coords(match.start()), match.group())
+                                               for match in grid.finditer(re.compile(rb'\w+'))]
+    assert 12 == len(grid.border(grid.index(1, 0), 3)) and (4, 5) == grid.array().shape
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Compressed inputs read transparently and a content-addressed input store.
+
+Usage  : python -m aoc store INPUT ... [--store DIR]
+
+Inputs may be gzip, bz2 or xz compressed, recognized by their leading magic
+bytes rather than their names. open_input() decodes them incrementally, so
+lines and chunks stream through without the whole file being inflated at
+once, plain inputs are opened as they are. The compression modules are only
+imported for compressed inputs.
+
+The store keeps every distinct input once, gzip compressed, under the sha256
+of its decoded content, the same hash the cache keys parsed models by:
+
+    store/ab/ab12...ef
+
+Adding an input already stored only costs reading it. Stored inputs are
+inputs like any other, 'python -m aoc batch 9 "store/*/*"' solves them all.
+"""
+
+import hashlib
+import importlib
+import os
+from pathlib import Path
+from typing import IO, Final, Iterable, Iterator, Optional
+
+from aoc import ROOT
+
+
+MAGIC: Final[dict[bytes, str]] = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'lzma'}
+
+STORE_DIR: Final[Path] = Path(os.getenv('AOC_STORE', str(ROOT / 'store')))
+
+CHUNK: Final[int] = 2 ** 20
+
+
+def compression(filename: str) -> Optional[str]:
+    """Name of the module decoding a file, None if it is not compressed."""
+    with open(filename, 'rb') as file:
+        head = file.read(max(map(len, MAGIC)))
+    return next((name for magic, name in MAGIC.items() if head.startswith(magic)), None)
+
+
+def open_input(filename: str, mode: str = 'rt') -> IO:
+    """Open an input for reading, decoding compressed ones on the fly, text as utf-8."""
+    name = compression(filename)
+    encoding = 'utf-8' if 't' in mode else None
+    if name is None:
+        return open(filename, mode, encoding=encoding)  # pylint: disable=consider-using-with
+    return importlib.import_module(name).open(filename, mode, encoding=encoding)
+
+
+def read_chunks(filename: str, size: int = CHUNK) -> Iterator[bytes]:
+    """Decoded content of an input in chunks."""
+    with open_input(filename, 'rb') as file:
+        yield from iter(lambda: file.read(size), b'')
+
+
+def decoded_size(filename: str) -> int:
+    """Size of an input in bytes once decoded, compressed ones get decoded to count them."""
+    if compression(filename) is None:
+        return os.path.getsize(filename)
+    return sum(map(len, read_chunks(filename)))
+
+
+def read_bytes(filename: str) -> bytes:
+    """Decoded content of an input."""
+    with open_input(filename, 'rb') as file:
+        return file.read()
+
+
+# --------------------------------------------------
+def store_path(digest: str, directory: Path = STORE_DIR) -> Path:
+    """Where the store keeps the input with a content hash."""
+    return directory / digest[:2] / digest
+
+
+def add(filename: str, directory: Path = STORE_DIR) -> tuple[str, bool]:
+    """Put an input into the store, returns its content hash and whether it was new.
+
+    Content gets hashed and compressed in one pass, into a staging file
+    dropped again if the store has the input already."""
+    import gzip  # pylint: disable=import-outside-toplevel
+    directory.mkdir(parents=True, exist_ok=True)
+    staging = directory / f'.tmp{os.getpid()}'
+    digest = hashlib.sha256()
+    try:
+        with gzip.open(staging, 'wb') as file:
+            for chunk in read_chunks(filename):
+                digest.update(chunk)
+                file.write(chunk)
+        target = store_path(digest.hexdigest(), directory)
+        if target.exists():
+            return digest.hexdigest(), False
+        target.parent.mkdir(exist_ok=True)
+        os.replace(staging, target)
+        return digest.hexdigest(), True
+    finally:
+        staging.unlink(missing_ok=True)
+
+
+def add_all(filenames: Iterable[str], directory: Path = STORE_DIR) -> Iterator[tuple[str, str, bool]]:
+    """Put inputs into the store, yields file, content hash and whether it was new."""
+    for filename in filenames:
+        digest, new = add(filename, directory)
+        yield filename, digest, new
+
+
+# --------------------------------------------------
+def test_open_input(tmp_path):
+    """Tests compressed inputs read like plain ones"""
+    import bz2  # pylint: disable=import-outside-toplevel
+    import gzip  # pylint: disable=import-outside-toplevel
+    import lzma  # pylint: disable=import-outside-toplevel
+    content = 'one\ntwo\n' * 1000
+    (tmp_path / 'plain').write_text(content, encoding='utf-8')
+    for name, module in (('gzip', gzip), ('bz2', bz2), ('lzma', lzma)):
+        (tmp_path / name).write_bytes(module.compress(content.encode()))
+    for name in ('plain', 'gzip', 'bz2', 'lzma'):
+        assert (None if name == 'plain' else name) == compression(str(tmp_path / name))
+        with open_input(str(tmp_path / name)) as file:
+            assert 2000 == sum(1 for _ in file)
+        assert content.encode() == b''.join(read_chunks(str(tmp_path / name), size=100)) == read_bytes(str(tmp_path / name))
+        assert len(content) == decoded_size(str(tmp_path / name))
+
+
+def test_store(tmp_path):
+    """Tests identical inputs are stored once, compressed"""
+    import lzma  # pylint: disable=import-outside-toplevel
+    (tmp_path / 'a').write_text('1 2 3\n', encoding='utf-8')
+    (tmp_path / 'b.xz').write_bytes(lzma.compress(b'1 2 3\n'))
+    (tmp_path / 'c').write_text('4 5 6\n', encoding='utf-8')
+    added = list(add_all([str(tmp_path / name) for name in ('a', 'b.xz', 'c')], tmp_path / 'store'))
+    assert [True, False, True] == [new for _, _, new in added] and added[0][1] == added[1][1]
+    stored = store_path(added[0][1], tmp_path / 'store')
+    assert 'gzip' == compression(str(stored)) and b'1 2 3\n' == read_bytes(str(stored))
+    assert 2 == sum(1 for path in (tmp_path / 'store').rglob('*') if path.is_file())
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Peak memory accounting and budgets with tracemalloc.
+
+Intermediates are usually gone once a solver returns, so a snapshot at the end
+shows nothing useful. A watcher thread therefore takes a snapshot whenever the
+traced memory reaches a new high, the allocation sites of the last one are
+those alive close to the peak.
+
+Budgets come from the command line ('256M' for all days, '4=1G' for one day)
+or a day module's MEMORY_BUDGET in bytes, the command line wins.
+"""
+
+import re
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Final, Optional
+
+
+SIZE_REGEX: Final[re.Pattern] = re.compile(r'^(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?$', re.IGNORECASE)
+
+UNITS: Final[dict[str, int]] = {'': 1, 'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30, 'T': 2 ** 40}
+
+TOP_SITES: Final[int] = 10
+
+
+@dataclass
+class MemoryReport:
+    """Peak of traced allocations in bytes and the largest allocation sites near it."""
+    peak: int = 0
+    sites: list[dict] = field(default_factory=list)
+
+
+class MemoryTracker:
+    """Context manager tracking peak allocations of the enclosed code."""
+    def __init__(self, frames: int = 5, interval: float = 0.01, growth: float = 1.1, sites: bool = True) -> None:
+        self.frames = frames if sites else 1
+        self.sites = sites  # without, only the peak is measured, much cheaper
+        self.interval = interval
+        self.growth = growth
+        self.report = MemoryReport()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self.baseline = 0
+        self.halt = threading.Event()
+        self.watcher = threading.Thread(target=self.watch, name='memory-watcher', daemon=True)
+        self.started = False
+
+    def __enter__(self) -> "MemoryTracker":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started = True
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        if self.sites:
+            self.watcher.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.halt.set()
+        if self.sites:
+            self.watcher.join()
+        if self.snapshot is None and self.sites:  # too quick for the watcher, what is left is better than nothing
+            self.take_snapshot(0)
+        self.report.peak = max(0, tracemalloc.get_traced_memory()[1] - self.baseline)
+        if self.snapshot is not None:
+            self.report.sites = top_sites(self.snapshot)
+        if self.started:
+            tracemalloc.stop()
+
+    def watch(self) -> None:
+        """Snapshot every time memory grew noticeably beyond the last snapshot."""
+        while not self.halt.wait(self.interval):
+            current = tracemalloc.get_traced_memory()[0] - self.baseline
+            if current > self.snapshot_size * self.growth:
+                self.take_snapshot(current)
+
+    def take_snapshot(self, current: int) -> None:
+        """Keep snapshot of live allocations, without those of tracemalloc itself."""
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        self.snapshot_size = current
+
+
+def top_sites(snapshot: tracemalloc.Snapshot, limit: int = TOP_SITES) -> list[dict]:
+    """Largest allocation sites of a snapshot."""
+    return [{'site': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}', 'size': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:limit]]
+
+
+# --------------------------------------------------
+def parse_size(text: str) -> int:
+    """Turn '512M', '1.5G' or '1048576' into bytes."""
+    match = SIZE_REGEX.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid size {text}")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def parse_budgets(specs: list[str]) -> dict[Optional[int], int]:
+    """Budgets per day from 'SIZE' (all days, key None) or 'DAY=SIZE' entries."""
+    budgets: dict[Optional[int], int] = {}
+    for spec in specs:
+        day, _, size = spec.rpartition('=')
+        budgets[int(day) if day else None] = parse_size(size)
+    return budgets
+
+
+def budget_for(day: int, module: ModuleType, budgets: dict[Optional[int], int]) -> Optional[int]:
+    """Budget applying to a day, None for unlimited."""
+    if day in budgets:
+        return budgets[day]
+    if None in budgets:
+        return budgets[None]
+    return getattr(module, 'MEMORY_BUDGET', None)
+
+
+def format_size(size: int) -> str:
+    """Readable byte size."""
+    for unit in ('', 'K', 'M', 'G'):
+        if size < 1024 or unit == 'G':
+            return f'{size:.0f}{unit}B' if not unit else f'{size:.1f}{unit}iB'
+        size /= 1024
+    return f'{size}B'
+
+
+# --------------------------------------------------
+def allocate(amount: int) -> int:
+    """Allocate a buffer of given size, hold it a moment and drop it again."""
+    buffer = bytearray(amount)
+    time.sleep(0.05)
+    return len(buffer)
+
+
+def test_memory_tracker():
+    """Tests peak of freed intermediates is seen with its site"""
+    with MemoryTracker(interval=0.001) as tracker:
+        allocate(2 ** 24)
+    assert tracker.report.peak >= 2 ** 24
+    assert any('memory.py' in site['site'] for site in tracker.report.sites)
+
+
+def test_budgets():
+    """Tests budget specs"""
+    budgets = parse_budgets(['1G', '4=512M'])
+    assert {None: 2 ** 30, 4: 512 * 2 ** 20} == budgets
+    assert 2 ** 30 == budget_for(3, ModuleType('day03'), budgets)
+    assert '1.5MiB' == format_size(3 * 2 ** 19)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Work counters of hot paths, next to free while nobody collects them.
+
+Solvers count the work they do, like calls, probes or comparisons:
+
+    metrics.add('map_convert_calls')
+
+Counting only happens inside collecting(), otherwise add() returns right
+away. Loops too hot even for that check ENABLED once and sum up locally:
+
+    counting, probes = metrics.ENABLED, 0
+    ...
+    metrics.add('neighbour_probes', probes)
+
+The runner collects per (day, part) with 'run --metrics FILE' and writes the
+counters as json or in the Prometheus text format, along with the input size
+to line them up against.
+"""
+
+import collections
+import contextlib
+import json
+import re
+from typing import Any, Final, Iterable, Iterator
+
+
+ENABLED: bool = False
+
+COUNTS: collections.Counter = collections.Counter()
+
+PREFIX: Final[str] = 'aoc'
+
+NAME_REGEX: Final[re.Pattern] = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def add(name: str, amount: int = 1) -> None:
+    """Count work, if collecting."""
+    if ENABLED:
+        COUNTS[name] += amount
+
+
+@contextlib.contextmanager
+def collecting() -> Iterator[collections.Counter]:
+    """Count work of the enclosed code into the yielded counter."""
+    global ENABLED, COUNTS  # pylint: disable=global-statement
+    previous = ENABLED, COUNTS
+    counts: collections.Counter = collections.Counter()
+    ENABLED, COUNTS = True, counts
+    try:
+        yield counts
+    finally:
+        ENABLED, COUNTS = previous
+
+
+# --------------------------------------------------
+def format_json(runs: Iterable[dict[str, Any]]) -> str:
+    """Render runs, each with day, part, input_bytes and counters, as json."""
+    return json.dumps({'metrics': list(runs)}, indent=2)
+
+
+def format_prometheus(runs: Iterable[dict[str, Any]]) -> str:
+    """Render runs in the Prometheus text format, one sample per counter and run."""
+    samples: dict[str, list[str]] = {}
+    for run in runs:
+        labels = f'{{day="{run["day"]:02d}",part="{run["part"]}"}}'
+        samples.setdefault(f'{PREFIX}_input_bytes', []).append(f'{PREFIX}_input_bytes{labels} {run["input_bytes"]}')
+        for name, count in sorted(run['counters'].items()):
+            metric = f'{PREFIX}_{NAME_REGEX.sub("_", name)}_total'
+            samples.setdefault(metric, []).append(f'{metric}{labels} {count}')
+
+    lines = []
+    for metric, values in samples.items():
+        lines.append(f'# TYPE {metric} {"counter" if metric.endswith("_total") else "gauge"}')
+        lines.extend(values)
+    return '\n'.join(lines) + '\n'
+
+
+# --------------------------------------------------
+def test_collecting():
+    """Tests counts only while collecting, nested collections kept apart"""
+    add('calls')
+    with collecting() as outer:
+        add('calls')
+        with collecting() as inner:
+            add('calls', 3)
+        add('probes', 2)
+    add('calls')
+    assert {'calls': 1, 'probes': 2} == outer and {'calls': 3} == inner and not ENABLED
+
+
+def test_format():
+    """Tests json and Prometheus text output"""
+    runs = [{'day': 5, 'part': 1, 'input_bytes': 100, 'counters': {'map_convert_calls': 7}},
+            {'day': 5, 'part': 2, 'input_bytes': 100, 'counters': {}}]
+    assert 7 == json.loads(format_json(runs))['metrics'][0]['counters']['map_convert_calls']
+    assert format_prometheus(runs).splitlines() == [
+        '# TYPE aoc_input_bytes gauge', 'aoc_input_bytes{day="05",part="1"} 100', 'aoc_input_bytes{day="05",part="2"} 100',
+        '# TYPE aoc_map_convert_calls_total counter', 'aoc_map_convert_calls_total{day="05",part="1"} 7']
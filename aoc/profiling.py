@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: CPU profiling of single solver runs.
+
+Every profiled section writes, next to each other,
+
+    <prefix>.pstats   cProfile statistics, for snakeviz, pstats and friends
+    <prefix>.txt      top functions by cumulative and own time
+    <prefix>.folded   collapsed stacks ('a;b;c count'), input of flamegraph.pl,
+                      speedscope or inferno
+
+Stacks come from a sampling thread peeking at the profiled thread's frames.
+In 'sampling' mode cProfile stays off, which keeps the overhead low.
+"""
+
+import io
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Final, Optional
+
+
+MODES: Final[tuple[str, ...]] = ('deterministic', 'sampling')
+
+TOP_FUNCTIONS: Final[int] = 30
+
+
+class StackSampler(threading.Thread):
+    """Collect collapsed stacks of one thread at a fixed interval."""
+    def __init__(self, thread_id: int, interval: float = 0.001) -> None:
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.halt = threading.Event()
+
+    def run(self) -> None:
+        while not self.halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread."""
+        self.halt.set()
+        self.join()
+
+
+def collapse(frame: Optional[FrameType]) -> str:
+    """Stack of a frame from root to leaf as 'func (file:line);...'."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class Profile:
+    """Context manager profiling the enclosed code of the current thread."""
+    def __init__(self, prefix: Path, mode: str = 'deterministic', interval: float = 0.001) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode}")
+        import cProfile  # pylint: disable=import-outside-toplevel
+        self.prefix = prefix
+        self.profiler = cProfile.Profile() if mode == 'deterministic' else None
+        self.sampler = StackSampler(threading.get_ident(), interval)
+
+    def __enter__(self) -> "Profile":
+        self.sampler.start()
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *_) -> None:
+        if self.profiler:
+            self.profiler.disable()
+        self.sampler.stop()
+        self.write()
+
+    def write(self) -> None:
+        """Dump statistics and collapsed stacks."""
+        self.prefix.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.prefix.with_suffix('.folded'), 'wt', encoding='utf-8') as file:
+            for stack, count in sorted(self.sampler.stacks.items()):
+                file.write(f'{stack} {count}\n')
+
+        if self.profiler:
+            import pstats  # pylint: disable=import-outside-toplevel
+            self.profiler.dump_stats(self.prefix.with_suffix('.pstats'))
+            report = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=report)
+            stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+            stats.sort_stats('tottime').print_stats(TOP_FUNCTIONS)
+            self.prefix.with_suffix('.txt').write_text(report.getvalue(), encoding='utf-8')
+
+
+# --------------------------------------------------
+def busy(limit: int) -> int:
+    """Something to profile."""
+    return sum(i * i for i in range(limit))
+
+
+def test_profile(tmp_path):
+    """Tests profile output files"""
+    import pstats  # pylint: disable=import-outside-toplevel
+    with Profile(tmp_path / 'day05-part2', interval=0.0005):
+        for _ in range(20):
+            busy(20000)
+    assert 'busy' in (tmp_path / 'day05-part2.txt').read_text(encoding='utf-8')
+    assert pstats.Stats(str(tmp_path / 'day05-part2.pstats')).total_calls > 0
+    for line in (tmp_path / 'day05-part2.folded').read_text(encoding='utf-8').splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert stack and int(count) > 0
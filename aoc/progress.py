@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Progress reporting cheap enough for hot loops.
+
+update() only adds to a counter. Every 'quantum' units of work the clock gets
+checked, and at most every 'interval' seconds the display is refreshed, the
+quantum adapts to the observed rate. tqdm is imported on the first refresh,
+so nothing is paid when progress is off or finishes before the first refresh.
+
+Progress is off when AOC_PROGRESS=0 (disable() sets it for child processes
+too) and, unless AOC_PROGRESS=1, whenever stderr is no terminal. Inside pool
+workers attached to a Monitor, counts are sent to the parent instead, which
+shows one combined bar per description.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Final, Optional
+
+
+INTERVAL: Final[float] = 0.2  # seconds between refreshes
+
+SINK: Optional[Any] = None  # queue of the parent's monitor, in worker processes
+
+
+def enabled() -> bool:
+    """Whether progress gets shown or sent anywhere."""
+    setting = os.getenv('AOC_PROGRESS', '')
+    if setting:
+        return setting != '0'
+    return SINK is not None or sys.stderr.isatty()
+
+
+def disable() -> None:
+    """Switch progress off, also for processes started later on."""
+    os.environ['AOC_PROGRESS'] = '0'
+
+
+def attach(queue: Any) -> None:
+    """Pool initializer, sends progress of this worker to a monitor."""
+    global SINK  # pylint: disable=global-statement
+    SINK = queue
+
+
+class Progress:
+    """Counter with a progress bar refreshed by time and work quantum."""
+    def __init__(self, total: Optional[float] = None, desc: str = '', quantum: int = 1,
+                 interval: float = INTERVAL, position: int = 0) -> None:
+        self.total = total
+        self.desc = desc
+        self.interval = interval
+        self.position = position
+        self.count = 0
+        self.shown = 0  # count when display or monitor saw it last
+        self.quantum = max(1, quantum)
+        self.active = enabled()
+        self.checkpoint: float = self.quantum if self.active else float('inf')
+        self.last = time.monotonic()
+        self.key = f'{os.getpid()}-{id(self)}'
+        self.bar: Optional[Any] = None
+
+    def update(self, amount: int = 1) -> None:
+        """Count work done, cheap unless a quantum is full."""
+        self.count += amount
+        if self.count >= self.checkpoint:
+            self.refresh()
+
+    def refresh(self, force: bool = False) -> None:
+        """Show progress if the interval passed, then size the next quantum to the rate."""
+        now = time.monotonic()
+        elapsed = now - self.last
+        if force or elapsed >= self.interval:
+            rate = (self.count - self.shown) / max(elapsed, 1e-9)
+            self.quantum = max(1, int(rate * self.interval / 4))
+            self.show()
+            self.last = now
+        self.checkpoint = self.count + self.quantum
+
+    def show(self) -> None:
+        """Hand counted work to the monitor or the display."""
+        delta, self.shown = self.count - self.shown, self.count
+        if SINK is not None:
+            SINK.put((self.key, self.desc, self.total, delta))
+            return
+        if self.bar is None:
+            self.bar = make_bar(self.total, self.desc, self.position)
+        self.bar.total = self.total
+        self.bar.update(delta)
+
+    def close(self) -> None:
+        """Report the rest and release the display."""
+        if self.active:
+            if self.count > self.shown or (SINK is not None and self.shown == 0):
+                self.show()
+            if self.bar is not None:
+                self.bar.close()
+        self.checkpoint = float('inf')
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def make_bar(total: Optional[float], desc: str, position: int) -> Any:
+    """tqdm bar, or a plain line on stderr if it is not installed."""
+    try:
+        from tqdm import tqdm  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return Line(total, desc)
+    return tqdm(total=total, desc=desc, position=position, leave=position == 0)
+
+
+class Line:
+    """Minimal stand-in for a tqdm bar."""
+    def __init__(self, total: Optional[float], desc: str) -> None:
+        self.total, self.desc, self.count = total, desc, 0
+
+    def update(self, amount: int) -> None:
+        """Rewrite the line."""
+        self.count += amount
+        print(f'\r{self.desc} {self.count}{"/" + str(self.total) if self.total else ""}', end='', file=sys.stderr)
+
+    def close(self) -> None:
+        """End the line."""
+        print(file=sys.stderr)
+
+
+# --------------------------------------------------
+class Monitor:
+    """Parent side of worker progress, one combined bar per description.
+
+    Pools pass 'initializer=attach, initargs=(monitor.queue,)'."""
+    def __init__(self) -> None:
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+        self.queue: Any = multiprocessing.Queue()
+        self.bars: dict[str, Progress] = {}
+        self.seen: set[str] = set()
+        self.thread = threading.Thread(target=self.collect, name='progress-monitor', daemon=True)
+
+    def collect(self) -> None:
+        """Merge counts until told to stop."""
+        while (message := self.queue.get()) is not None:
+            key, desc, total, delta = message
+            bar = self.bars.setdefault(desc, Progress(total=0, desc=desc, position=len(self.bars)))
+            if key not in self.seen:
+                self.seen.add(key)
+                bar.total = (bar.total or 0) + (total or 0) or None
+            bar.update(delta)
+
+    def __enter__(self) -> "Monitor":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.queue.put(None)
+        self.thread.join()
+        for bar in self.bars.values():
+            bar.close()
+        self.queue.close()
+
+
+# --------------------------------------------------
+def test_progress(monkeypatch):
+    """Tests counting with progress off and quanta with progress on"""
+    monkeypatch.setenv('AOC_PROGRESS', '0')
+    with Progress(total=10) as bar:
+        for _ in range(10):
+            bar.update()
+    assert 10 == bar.count and bar.bar is None
+
+    monkeypatch.setenv('AOC_PROGRESS', '1')
+    shown = []
+    monkeypatch.setattr(Progress, 'show', lambda self: shown.append(self.count))
+    with Progress(total=10 ** 5, interval=0.01) as bar:
+        for _ in range(10 ** 5):
+            bar.update()
+    assert 0 < len(shown) < 100
+
+
+def count_work(amount: int) -> int:
+    """Worker side of the test below."""
+    with Progress(total=amount, desc='work') as bar:
+        for _ in range(amount):
+            bar.update()
+    return amount
+
+
+def test_monitor(monkeypatch):
+    """Tests progress of workers gets combined"""
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    monkeypatch.setenv('AOC_PROGRESS', '1')
+    with Monitor() as monitor:
+        with ProcessPoolExecutor(max_workers=2, initializer=attach, initargs=(monitor.queue,)) as pool:
+            assert 300 == sum(pool.map(count_work, (100, 200)))
+    assert 300 == monitor.bars['work'].count and 300 == monitor.bars['work'].total
@@ -0,0 +1,692 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Run and time the daily solutions from one entry point.
+
+Usage  : python -m aoc run [DAY ...] [--part N] [--input PATTERN] [--jobs N] [--backend KIND] [--profile DIR]
+                           [--memory] [--memory-budget [DAY=]SIZE ...] [--metrics FILE] [--json]
+         python -m aoc bench [DAY ...] [--sizes N ...] [--repeat N] [--calibrate] [--json]
+         python -m aoc baseline [DAY ...] [--part N] [--sizes N ...] [--update] [--json]
+         python -m aoc startup [DAY ...] [--repeat N] [--budget [DAY=]TIME ...] [--json]
+         python -m aoc generate DAY [--size N] [--seed N] [-o FILE]
+         python -m aoc check [DAY ...] [--part N] [--samples N] [--size N] [--input PATTERN ...] [--json]
+         python -m aoc batch DAY INPUT ... [--part N] [--jobs N] [--in-flight N] [--timeout S] [-o FILE]
+         python -m aoc store INPUT ... [--store DIR]
+         python -m aoc serve [--socket PATH] [--jobs N]
+         python -m aoc ask DAY [--part N] [--input FILE | --stdin] [--socket PATH]
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterator, Optional
+
+from aoc import cache, days, memory, metrics, progress
+from aoc.profiling import MODES, Profile
+
+if TYPE_CHECKING:
+    from aoc.shared import SharedInputHandle
+
+
+DEFAULT_INPUT: Final[str] = '{day:02d}/input'
+
+
+@dataclass
+class PartResult:
+    """Outcome and timings of a single (day, part) run, times in seconds."""
+    day: int
+    part: int
+    result: Optional[str]
+    import_time: float
+    parse_time: float
+    solve_time: float
+    wall_time: float
+    error: Optional[str] = None
+    cached: bool = False
+    parse_peak_memory: Optional[int] = None  # bytes
+    peak_memory: Optional[int] = None
+    allocation_sites: Optional[list[dict]] = None
+    backend: Optional[str] = None  # execution backend of days offering several
+    counters: Optional[dict[str, int]] = None  # work counted by the part, see aoc.metrics
+
+
+# --------------------------------------------------
+def run_day(day: int, parts: tuple[int, ...], pattern: str = DEFAULT_INPUT,
+            use_cache: bool = True, verify: bool = False,
+            shared: Optional["SharedInputHandle"] = None, profile: Optional[Path] = None,
+            profile_mode: str = 'deterministic', track_memory: bool = False,
+            budgets: Optional[dict[Optional[int], int]] = None, backend: str = 'auto',
+            collect_metrics: bool = False) -> list[PartResult]:
+    """Import day, load and parse its input once and run requested parts.
+
+    Days exposing parse() and solve_NN() share one parsed model between the
+    parts, others get the raw lines passed to part_NN(). Parsed models and
+    answers are served from the on-disk cache unless 'use_cache' is off, with
+    'verify' answers are recomputed and compared against the cached ones.
+    Workers pass the handle of the input the parent already put into shared memory.
+    With a 'profile' directory parsing and every part get profiled, with
+    'track_memory' their peak allocations get recorded and checked against
+    the memory 'budgets', with 'collect_metrics' the work they count. Cached
+    answers are not used in these cases. Parts of days registering BACKENDS
+    get solved by the 'backend' asked for, or the one planned for the input size."""
+    start = time.perf_counter()
+    module = days.load(day)
+    import_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    filename = str(days.input_path(day, pattern))
+    try:
+        if shared:
+            input_hash = shared.input_hash
+        else:
+            input_hash = cache.file_hash(filename) if use_cache else ''
+    except Exception as exc:  # pylint: disable=broad-except
+        return failed_parts(day, parts, exc, import_time, time.perf_counter() - start)
+    known = {part: cache.load_result(module, part, input_hash) for part in parts} if use_cache else {}
+    hash_time = time.perf_counter() - start
+
+    chosen: dict[int, Optional[str]] = dict.fromkeys(parts)
+    if getattr(module, 'BACKENDS', None) and hasattr(module, 'parse'):
+        from aoc import backends  # pylint: disable=import-outside-toplevel
+        try:
+            chosen = backends.plan(module, day, parts, input_size(filename, shared), backend,
+                                   backends.load_thresholds())
+        except ValueError as exc:
+            return failed_parts(day, parts, exc, import_time, hash_time)
+
+    track_memory = track_memory or bool(budgets)
+    budget = memory.budget_for(day, module, budgets or {}) if track_memory else None
+    if not verify and not profile and not track_memory and not collect_metrics and backend == 'auto' and known \
+            and all(result is not None for result in known.values()):
+        return [PartResult(day=day, part=part, result=known[part], import_time=import_time, parse_time=0.0,
+                           solve_time=0.0, wall_time=hash_time, cached=True) for part in parts]
+
+    start = time.perf_counter()
+    fused = hasattr(module, 'parse')
+    try:
+        with reading(module, filename, shared) as read, \
+                measured(profile, f'day{day:02d}-parse', profile_mode, track_memory) as parse_memory:
+            if fused:
+                model = cache.load_model(module, filename, use_cache=use_cache, input_hash=input_hash or None,
+                                         read=read)
+            else:
+                model = read()
+    except Exception as exc:  # pylint: disable=broad-except
+        return failed_parts(day, parts, exc, import_time, hash_time + time.perf_counter() - start)
+    parse_time = time.perf_counter() - start
+
+    results = []
+    for part in parts:
+        start = time.perf_counter()
+        result, error = None, None
+        solve_memory, counts = None, None
+        if chosen[part]:
+            solve = module.BACKENDS[part][chosen[part]]
+        else:
+            solve = getattr(module, f'solve_{part:02d}' if fused else f'part_{part:02d}')
+        try:
+            with measured(profile, f'day{day:02d}-part{part}', profile_mode, track_memory) as solve_memory, \
+                    metrics.collecting() if collect_metrics else contextlib.nullcontext() as counts:
+                result = solve(model)
+        except Exception as exc:  # pylint: disable=broad-except
+            error = f'{type(exc).__name__}: {exc}'
+        solve_time = time.perf_counter() - start
+
+        if error is None and budget is not None and solve_memory and parse_memory:
+            peak = max(solve_memory.peak, parse_memory.peak)
+            if peak > budget:
+                error = f'memory budget exceeded: peak {memory.format_size(peak)} > {memory.format_size(budget)}'
+
+        if error is None and use_cache:
+            if verify and known.get(part) not in (None, result):
+                error = f'verify: cached answer {known[part]} differs from {result}'
+            else:
+                cache.store_result(module, part, input_hash, result)
+        results.append(PartResult(day=day, part=part, result=result, import_time=import_time,
+                                  parse_time=parse_time, solve_time=solve_time,
+                                  wall_time=hash_time + parse_time + solve_time, error=error,
+                                  parse_peak_memory=parse_memory.peak if parse_memory else None,
+                                  peak_memory=solve_memory.peak if solve_memory else None,
+                                  allocation_sites=solve_memory.sites if solve_memory else None,
+                                  backend=chosen[part], counters=dict(counts) if counts is not None else None))
+    return results
+
+
+def input_size(filename: str, shared: Optional["SharedInputHandle"] = None) -> int:
+    """Decoded size of an input in bytes, 0 if it cannot be read, reading it reports that."""
+    from aoc.inputs import decoded_size  # pylint: disable=import-outside-toplevel
+    if shared:
+        return shared.size
+    try:
+        return decoded_size(filename)
+    except Exception:  # pylint: disable=broad-except
+        return 0
+
+
+def failed_parts(day: int, parts: tuple[int, ...], exc: Exception, import_time: float,
+                 wall_time: float) -> list[PartResult]:
+    """Results of parts that could not run since reading or parsing their input failed."""
+    error = f'{type(exc).__name__}: {exc}'
+    return [PartResult(day=day, part=part, result=None, import_time=import_time, parse_time=0.0, solve_time=0.0,
+                       wall_time=wall_time, error=error) for part in parts]
+
+
+HEADER: Final[str] = f"{'day':>3} {'part':>4} {'parse':>10} {'solve':>10} {'wall':>10}  result"
+
+
+@contextlib.contextmanager
+def measured(directory: Optional[Path], name: str, mode: str,
+             track_memory: bool) -> Iterator[Optional[memory.MemoryReport]]:
+    """Profile enclosed code into directory, if any, and track its memory if asked to."""
+    with contextlib.ExitStack() as stack:
+        if directory is not None:
+            stack.enter_context(Profile(directory / name, mode))
+        tracker = stack.enter_context(memory.MemoryTracker()) if track_memory else None
+        yield tracker.report if tracker else None
+
+
+@contextlib.contextmanager
+def reading(module: ModuleType, filename: str,
+            shared: Optional["SharedInputHandle"] = None) -> Iterator[Callable[[], Any]]:
+    """Reader of a day's input, valid within the context.
+
+    Inputs in shared memory stay attached meanwhile. Days declaring
+    PARSE_BYTES get its read-only bytes passed to parse(), without decoding
+    and copying lines, others get lines as from load_data()."""
+    if not shared:
+        yield lambda: module.load_data(filename)
+        return
+    from aoc.shared import SharedInput  # pylint: disable=import-outside-toplevel
+    with SharedInput.attach(shared) as attached:
+        if hasattr(module, 'parse') and getattr(module, 'PARSE_BYTES', False):
+            yield lambda: attached.buffer
+        else:
+            yield attached.lines
+
+
+def format_row(res: PartResult) -> str:
+    """Render one result as table row."""
+    peak = max(res.peak_memory or 0, res.parse_peak_memory or 0)
+    return (f'{res.day:>3} {res.part:>4} {format_seconds(res.parse_time):>10} '
+            f'{format_seconds(res.solve_time):>10} {format_seconds(res.wall_time):>10}  '
+            f'{res.result if res.error is None else "ERROR " + res.error}'
+            f'{"  (cached)" if res.cached else ""}'
+            f'{"  (" + res.backend + ")" if res.backend else ""}'
+            f'{"  (peak " + memory.format_size(peak) + ")" if res.peak_memory is not None else ""}')
+
+
+def format_human(results: list[PartResult]) -> str:
+    """Render results as table."""
+    lines = [HEADER] + [format_row(res) for res in results]
+    lines.append(f"total wall time {format_seconds(sum(res.wall_time for res in results))}")
+    return '\n'.join(lines)
+
+
+def format_json(results: list[PartResult]) -> str:
+    """Render results as json report."""
+    report: dict[str, Any] = {'results': [asdict(res) for res in results]}
+    return json.dumps(report, indent=2)
+
+
+def write_metrics(results: list[PartResult], pattern: str, filename: Path, style: str) -> None:
+    """Write counters of results along with their input sizes, as json or Prometheus text."""
+    runs = [{'day': res.day, 'part': res.part, 'input_bytes': input_size(str(days.input_path(res.day, pattern))),
+             'counters': res.counters or {}} for res in results if res.error is None]
+    with open(filename, 'wt', encoding='utf-8') as file:
+        file.write(metrics.format_prometheus(runs) if style == 'prometheus' else metrics.format_json(runs) + '\n')
+
+
+def format_seconds(seconds: float) -> str:
+    """Pick a readable unit for a duration."""
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f}µs'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f}ms'
+    return f'{seconds:.3f}s'
+
+
+# --------------------------------------------------
+def get_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Get command line arguments."""
+    parser = argparse.ArgumentParser(prog='aoc', description='Run advent of code 2023 solutions')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run and time solutions',
+                              formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    run.add_argument('days', nargs='*', type=int, help='Days to run, all discovered days if omitted')
+    run.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    run.add_argument('-i', '--input', default=DEFAULT_INPUT,
+                     help='Input path pattern relative to repository root, {day} gets replaced')
+    run.add_argument('--no-cache', action='store_true', help='Bypass cache of parsed inputs and answers')
+    run.add_argument('--verify', action='store_true', help='Recompute cached answers and compare')
+    run.add_argument('-j', '--jobs', type=int, default=1,
+                     help='Run (day, part) jobs on a pool of that many processes, 0 for one per cpu')
+    run.add_argument('--backend', choices=('auto', 'pure', 'vectorized', 'parallel'), default='auto',
+                     help='Execution backend of days offering several, by input size if auto')
+    run.add_argument('--profile', type=Path, metavar='DIR',
+                     help='Write cProfile stats and collapsed stacks for flamegraphs per parse and part')
+    run.add_argument('--profile-mode', choices=MODES, default='deterministic',
+                     help='Sampling only skips cProfile and keeps overhead low')
+    run.add_argument('--memory', action='store_true',
+                     help='Record peak allocations and top allocation sites per parse and part')
+    run.add_argument('--memory-budget', action='append', metavar='[DAY=]SIZE', default=[],
+                     help='Fail parts exceeding a peak memory like 512M, for all or one day, implies --memory')
+    run.add_argument('--metrics', type=Path, metavar='FILE',
+                     help='Write work counted per part, like map conversions or comparisons, bypasses cached answers')
+    run.add_argument('--metrics-format', choices=('json', 'prometheus'), default='json',
+                     help='Format of the metrics file')
+    run.add_argument('--json', action='store_true', help='Print json report')
+
+    benchmark = commands.add_parser('bench', help='Benchmark scaling of solutions',
+                                    formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    benchmark.add_argument('days', nargs='*', type=int, help='Days to benchmark, all discovered days if omitted')
+    benchmark.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    benchmark.add_argument('-s', '--sizes', type=int, nargs='+',
+                           help='Input scale factors, BENCH_SIZES of a day or default sizes if omitted')
+    benchmark.add_argument('-r', '--repeat', type=int, default=5, help='Timed runs per size')
+    benchmark.add_argument('-w', '--warmup', type=int, default=1, help='Untimed runs per size')
+    benchmark.add_argument('--max-seconds', type=float, default=2.0,
+                           help='Skip sizes predicted to take longer per run')
+    benchmark.add_argument('--seed', type=int, default=0, help='Seed of generated inputs')
+    benchmark.add_argument('--calibrate', action='store_true',
+                           help='Time the backends of days offering several and store size thresholds for them')
+    benchmark.add_argument('--json', action='store_true', help='Print json report')
+
+    gate = commands.add_parser('baseline', help='Compare performance with stored baseline, or update it',
+                               formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    gate.add_argument('days', nargs='*', type=int, help='Days to measure, all discovered days if omitted')
+    gate.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    gate.add_argument('-s', '--sizes', type=int, nargs='+', help='Input scale factors, default sizes if omitted')
+    gate.add_argument('-r', '--repeat', type=int, default=7, help='Timed runs per size')
+    gate.add_argument('--max-seconds', type=float, default=1.0, help='Skip sizes predicted to take longer per run')
+    gate.add_argument('--tolerance', type=float, default=0.25,
+                      help='Relative slowdown counting as regression, if beyond noise')
+    gate.add_argument('--memory-tolerance', type=float, default=0.10,
+                      help='Relative growth of peak memory counting as regression')
+    gate.add_argument('-f', '--file', type=Path, help='Baseline file, baseline.json in repository root if omitted')
+    gate.add_argument('--update', action='store_true', help='Record measurements as new baseline instead of failing')
+    gate.add_argument('--json', action='store_true', help='Print json report')
+
+    cold = commands.add_parser('startup', help='Measure cold start per day against a budget',
+                               formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    cold.add_argument('days', nargs='*', type=int, help='Days to start, all discovered days if omitted')
+    cold.add_argument('-r', '--repeat', type=int, default=5, help='Starts per day, the fastest counts')
+    cold.add_argument('--budget', action='append', metavar='[DAY=]TIME', default=[],
+                      help='Fail days starting slower than e.g. 50ms, for all or one day, 100ms if omitted')
+    cold.add_argument('--json', action='store_true', help='Print json report')
+
+    generate = commands.add_parser('generate', help='Generate synthetic input',
+                                   formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    generate.add_argument('day', type=int, help='Day to generate input for')
+    generate.add_argument('-s', '--size', type=int, default=1, help='Scale relative to a real puzzle input')
+    generate.add_argument('--seed', type=int, default=0, help='Random seed')
+    generate.add_argument('-o', '--output', type=argparse.FileType('wt', encoding='utf-8'), default=sys.stdout,
+                          help='Input file to write')
+    generate.add_argument('-a', '--answers', type=argparse.FileType('wt', encoding='utf-8'),
+                          help='Write expected answers as json')
+
+    check = commands.add_parser('check', help='Compare fast engines with reference engines',
+                                formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    check.add_argument('days', nargs='*', type=int, help='Days to check, all days with engines if omitted')
+    check.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    check.add_argument('-n', '--samples', type=int, default=20, help='Generated inputs per part')
+    check.add_argument('-s', '--size', type=int, default=1, help='Scale of generated inputs')
+    check.add_argument('--seed', type=int, default=0, help='Seed of first generated input')
+    check.add_argument('-i', '--input', nargs='+', default=[],
+                       help='Input files, directories or glob patterns checked before generated ones')
+    check.add_argument('--timeout', type=float, default=10.0,
+                       help='Seconds per engine and input before the input gets skipped')
+    check.add_argument('--json', action='store_true', help='Print json report')
+
+    solve_batch = commands.add_parser('batch', help='Solve many inputs of a day, one json line each',
+                                      formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    solve_batch.add_argument('day', type=int, help='Day the inputs belong to')
+    solve_batch.add_argument('inputs', nargs='+', help='Input files, directories or glob patterns')
+    solve_batch.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    solve_batch.add_argument('-j', '--jobs', type=int, default=0, help='Worker processes, 0 for one per cpu')
+    solve_batch.add_argument('--in-flight', type=int, help='Files submitted at once, twice the workers if omitted')
+    solve_batch.add_argument('--timeout', type=float, help='Seconds per file before it counts as failed')
+    solve_batch.add_argument('-o', '--output', type=argparse.FileType('wt', encoding='utf-8'), default=sys.stdout,
+                             help='Json lines file to write')
+
+    store = commands.add_parser('store', help='Keep inputs once each, compressed, by content hash',
+                                formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    store.add_argument('inputs', nargs='+', help='Input files, directories or glob patterns, may be compressed')
+    store.add_argument('--store', type=Path, help='Store directory, $AOC_STORE or store/ in repository root if omitted')
+
+    serve = commands.add_parser('serve', help='Keep solutions warm in a daemon',
+                                formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    serve.add_argument('--socket', type=Path, help='Unix socket to listen on, $AOC_SOCKET or .cache/daemon.sock if omitted')
+    serve.add_argument('-j', '--jobs', type=int, default=0, help='Worker processes, 0 for one per cpu')
+    serve.add_argument('--no-cache', action='store_true', help='Bypass cache of parsed inputs')
+
+    ask = commands.add_parser('ask', help='Solve with a running daemon',
+                              formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    ask.add_argument('day', type=int, help='Day to solve')
+    ask.add_argument('-p', '--part', type=int, choices=(1, 2), action='append', help='Restrict to part')
+    source = ask.add_mutually_exclusive_group()
+    source.add_argument('-i', '--input', default=DEFAULT_INPUT,
+                        help='Input path pattern relative to repository root, {day} gets replaced')
+    source.add_argument('--stdin', action='store_true', help='Send input read from stdin along')
+    ask.add_argument('--socket', type=Path, help='Unix socket of the daemon, $AOC_SOCKET or .cache/daemon.sock if omitted')
+    ask.add_argument('--json', action='store_true', help='Print raw response')
+
+    return parser.parse_args(argv)
+
+
+def main_run(args: argparse.Namespace) -> None:
+    """Run solutions."""
+    selected = args.days or sorted(days.discover())
+    parts = tuple(sorted(set(args.part or (1, 2))))
+
+    if args.profile and args.jobs != 1:
+        sys.exit('profiling needs --jobs 1')
+    budgets = memory.parse_budgets(args.memory_budget)
+
+    if args.jobs == 1:
+        results = [res for day in selected
+                   for res in run_day(day, parts, args.input, not args.no_cache, args.verify,
+                                      profile=args.profile, profile_mode=args.profile_mode,
+                                      track_memory=args.memory, budgets=budgets, backend=args.backend,
+                                      collect_metrics=bool(args.metrics))]
+        print(format_json(results) if args.json else format_human(results))
+    else:
+        from aoc import schedule  # pylint: disable=import-outside-toplevel
+        start = time.perf_counter()
+        results = []
+        if not args.json:
+            print(HEADER, flush=True)
+        for res in schedule.run_parallel([(day, part) for day in selected for part in parts], args.input,
+                                         args.jobs or None, use_cache=not args.no_cache, verify=args.verify,
+                                         track_memory=args.memory, budgets=budgets, backend=args.backend,
+                                         collect_metrics=bool(args.metrics)):
+            results.append(res)
+            if not args.json:
+                print(format_row(res), flush=True)
+        results.sort(key=lambda res: (res.day, res.part))
+        if args.json:
+            print(format_json(results))
+        else:
+            print(f'elapsed {format_seconds(time.perf_counter() - start)}, '
+                  f'sum of wall times {format_seconds(sum(res.wall_time for res in results))}')
+
+    if args.metrics:
+        write_metrics(results, args.input, args.metrics, args.metrics_format)
+
+    if any(res.error for res in results):
+        sys.exit(1)
+
+
+def main_bench(args: argparse.Namespace) -> None:
+    """Benchmark solutions."""
+    from aoc import bench  # pylint: disable=import-outside-toplevel
+    selected = args.days or sorted(days.discover())
+    parts = tuple(sorted(set(args.part or (1, 2))))
+    if args.calibrate:
+        calibrate(selected, parts, args)
+        return
+    benchmarks = [bench.bench_part(day, part, tuple(args.sizes or ()), repeat=args.repeat, warmup=args.warmup,
+                                   max_seconds=args.max_seconds, seed=args.seed)
+                  for day in selected for part in parts]
+
+    if args.json:
+        print(json.dumps({'benchmarks': [b.as_dict() for b in benchmarks]}, indent=2))
+    else:
+        print(bench.format_human(benchmarks))
+
+
+def calibrate(selected: list[int], parts: tuple[int, ...], args: argparse.Namespace) -> None:
+    """Derive backend thresholds of days offering several backends and store them."""
+    from aoc import backends  # pylint: disable=import-outside-toplevel
+    progress.disable()
+    thresholds = {}
+    for day in selected:
+        for part in parts:
+            if len(backends.registered(days.load(day)).get(part, {})) < 2:
+                continue
+            found, timings = backends.calibrate(day, part, tuple(args.sizes or ()), repeat=args.repeat,
+                                                max_seconds=args.max_seconds, seed=args.seed)
+            thresholds[backends.part_key(day, part)] = found
+            if args.json:
+                print(json.dumps({'day': day, 'part': part, 'thresholds': found, 'timings': timings}))
+            else:
+                print(backends.format_calibration(day, part, found, timings))
+    if not thresholds:
+        sys.exit('no selected day offers several backends')
+    backends.store_thresholds(thresholds)
+    print(f'thresholds written to {backends.THRESHOLDS_FILE}', file=sys.stderr)
+
+
+def main_baseline(args: argparse.Namespace) -> None:
+    """Measure performance, then gate on the stored baseline or update it."""
+    from aoc import baseline  # pylint: disable=import-outside-toplevel
+    progress.disable()
+    filename = args.file or baseline.BASELINE_FILE
+    try:
+        baselines, recorded_on = baseline.load(filename)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    if recorded_on and recorded_on != baseline.machine() and not args.update:
+        print(f'WARNING baseline was recorded on {recorded_on}, timings may not compare', file=sys.stderr)
+
+    jobs = [(day, part) for day in args.days or sorted(days.discover()) for part in sorted(set(args.part or (1, 2)))]
+    current, verdicts = baseline.gate(baselines, jobs, tuple(args.sizes or ()), repeat=args.repeat,
+                                      max_seconds=args.max_seconds, tolerance=args.tolerance,
+                                      memory_tolerance=args.memory_tolerance)
+
+    if args.json:
+        print(json.dumps({'verdicts': [asdict(verdict) for verdict in verdicts]}, indent=2))
+    else:
+        print(baseline.format_human(verdicts))
+    if args.update:
+        baseline.store(current, filename)
+    elif any(verdict.status == 'regression' for verdict in verdicts):
+        sys.exit(1)
+
+
+def main_startup(args: argparse.Namespace) -> None:
+    """Measure cold starts and check them against budgets."""
+    from aoc import startup  # pylint: disable=import-outside-toplevel
+    try:
+        budgets = {None: startup.DEFAULT_BUDGET} | startup.parse_budgets(args.budget)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    interpreter = startup.fastest(None, args.repeat)
+    reports = [startup.measure(day, args.repeat, interpreter, budgets.get(day, budgets[None]))
+               for day in args.days or sorted(days.discover())]
+
+    if args.json:
+        print(json.dumps({'startup': [report.as_dict() for report in reports]}, indent=2))
+    else:
+        print(startup.format_human(reports))
+    if any(report.over_budget for report in reports):
+        sys.exit(1)
+
+
+def main_generate(args: argparse.Namespace) -> None:
+    """Write generated input and optionally its answers."""
+    from aoc import generators  # pylint: disable=import-outside-toplevel
+    try:
+        generated = generators.generate(args.day, size=args.size, seed=args.seed)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    args.output.write(generated.text())
+    if args.answers:
+        json.dump({str(part): answer for part, answer in generated.answers.items()}, args.answers)
+
+
+def main_check(args: argparse.Namespace) -> None:
+    """Check fast engines against reference engines."""
+    from aoc import batch, differential  # pylint: disable=import-outside-toplevel
+    progress.disable()
+    selected = args.days or [day for day in sorted(days.discover()) if differential.engines(days.load(day))]
+    reports = []
+    for day in selected:
+        module = days.load(day)
+        for part in sorted(set(args.part or differential.engines(module))):
+            inputs = itertools.chain(differential.file_inputs(batch.expand(args.input)),
+                                     differential.generated_inputs(day, args.samples, args.size, args.seed))
+            reports.append(differential.check_part(module, day, part, inputs, args.timeout))
+
+    if args.json:
+        print(json.dumps({'checks': [report.as_dict() for report in reports]}, indent=2))
+    else:
+        print(differential.format_human(reports))
+    if any(report.mismatch for report in reports):
+        sys.exit(1)
+
+
+def main_batch(args: argparse.Namespace) -> None:
+    """Solve many inputs of a day."""
+    from aoc import batch  # pylint: disable=import-outside-toplevel
+    parts = tuple(sorted(set(args.part or (1, 2))))
+    records = batch.run_batch(args.day, batch.expand(args.inputs), parts, workers=args.jobs or None,
+                              in_flight=args.in_flight, timeout=args.timeout)
+    counts = batch.write_records(records, args.output)
+    print(f"{counts['inputs']} inputs, {counts['failed']} failed", file=sys.stderr)
+    if counts['failed']:
+        sys.exit(1)
+
+
+def main_store(args: argparse.Namespace) -> None:
+    """Add inputs to the content-addressed store."""
+    from aoc import batch, inputs  # pylint: disable=import-outside-toplevel
+    directory = args.store or inputs.STORE_DIR
+    counts = {'inputs': 0, 'new': 0}
+    for filename, digest, new in inputs.add_all(batch.expand(args.inputs), directory):
+        counts['inputs'] += 1
+        counts['new'] += new
+        print(f"{digest}  {filename}{'' if new else '  (duplicate)'}")
+    print(f"{counts['inputs']} inputs, {counts['new']} new in {directory}", file=sys.stderr)
+
+
+def main_serve(args: argparse.Namespace) -> None:
+    """Run solver daemon until interrupted."""
+    from aoc import daemon  # pylint: disable=import-outside-toplevel
+    daemon.serve(args.socket or daemon.SOCKET_PATH, args.jobs or None, not args.no_cache)
+
+
+def main_ask(args: argparse.Namespace) -> None:
+    """Solve a day with a running daemon."""
+    from aoc import daemon  # pylint: disable=import-outside-toplevel
+    payload: dict[str, Any] = {'op': 'solve', 'day': args.day, 'parts': sorted(set(args.part or (1, 2)))}
+    if args.stdin:
+        payload['data'] = sys.stdin.read()
+    else:
+        payload['path'] = str(days.input_path(args.day, args.input))
+    try:
+        response = daemon.request(payload, args.socket or daemon.SOCKET_PATH)
+    except OSError as exc:
+        sys.exit(f'no daemon at {args.socket or daemon.SOCKET_PATH}: {exc}')
+
+    if args.json:
+        print(json.dumps(response, indent=2))
+    elif not response['ok']:
+        print(f"ERROR {response['error']}")
+    else:
+        for res in response['results']:
+            print(f"day {response['day']:02d} part {res['part']}: "
+                  f"{res['result'] if res['error'] is None else 'ERROR ' + res['error']}"
+                  f"  ({format_seconds(res['solve_time'])}{', warm' if response['warm'] else ''})")
+    if not response['ok'] or any(res['error'] for res in response['results']):
+        sys.exit(1)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Main wrapper."""
+    args = get_args(argv)
+    {'run': main_run, 'bench': main_bench, 'baseline': main_baseline, 'startup': main_startup,
+     'generate': main_generate, 'check': main_check, 'batch': main_batch, 'store': main_store,
+     'serve': main_serve, 'ask': main_ask}[args.command](args)
+
+
+# --------------------------------------------------
+def test_run_day(tmp_path):
+    """Tests running a day on a given input"""
+    (tmp_path / 'input').write_text(days.load(9).TEST_DATA, encoding='utf-8')
+    results = run_day(9, (1, 2), str(tmp_path / 'input'), use_cache=False)
+    assert ['114', '2'] == [res.result for res in results]
+    assert json.loads(format_json(results))['results'][1]['part'] == 2
+
+
+def test_run_day_backend(tmp_path):
+    """Tests backends asked for run, planned ones by input size, unknown ones fail"""
+    (tmp_path / 'input').write_text(days.load(9).TEST_DATA, encoding='utf-8')
+    results = run_day(9, (1, 2), str(tmp_path / 'input'), use_cache=False, backend='vectorized')
+    assert ['114', '2'] == [res.result for res in results] and {'vectorized'} == {res.backend for res in results}
+    assert 'pure' == run_day(9, (1,), str(tmp_path / 'input'), use_cache=False)[0].backend
+    assert run_day(9, (1,), str(tmp_path / 'input'), backend='parallel')[0].error.startswith('ValueError')
+
+
+def test_metrics(tmp_path):
+    """Tests work gets counted per part and written as Prometheus text"""
+    (tmp_path / 'input').write_text(days.load(8).STAGE_TWO_TEST_DATA, encoding='utf-8')
+    results = run_day(8, (2,), str(tmp_path / 'input'), use_cache=False, collect_metrics=True)
+    assert {'path_steps': 5} == results[0].counters and not results[0].cached
+    write_metrics(results, str(tmp_path / 'input'), tmp_path / 'metrics.prom', 'prometheus')
+    assert 'aoc_path_steps_total{day="08",part="2"} 5\n' in (tmp_path / 'metrics.prom').read_text(encoding='utf-8')
+
+
+def test_run_day_compressed(tmp_path):
+    """Tests compressed inputs get solved and cached like plain ones"""
+    import bz2  # pylint: disable=import-outside-toplevel
+    content = days.load(5).TEST_DATA.encode()
+    (tmp_path / 'input').write_bytes(content)
+    (tmp_path / 'input.bz2').write_bytes(bz2.compress(content))
+    assert cache.file_hash(str(tmp_path / 'input')) == cache.file_hash(str(tmp_path / 'input.bz2'))
+    assert ['35', '46'] == [res.result for res in run_day(5, (1, 2), str(tmp_path / 'input.bz2'), use_cache=False)]
+    assert len(content) == input_size(str(tmp_path / 'input.bz2')) == input_size(str(tmp_path / 'input'))
+
+
+def test_memory_budget(tmp_path):
+    """Tests peaks are reported and budgets fail parts"""
+    (tmp_path / 'input').write_text(days.load(9).TEST_DATA, encoding='utf-8')
+    results = run_day(9, (1,), str(tmp_path / 'input'), use_cache=False, track_memory=True)
+    assert results[0].error is None and results[0].peak_memory is not None
+    results = run_day(9, (1,), str(tmp_path / 'input'), use_cache=False, budgets={9: 1})
+    assert results[0].error.startswith('memory budget exceeded')
+
+
+def test_run_day_failing_input(tmp_path):
+    """Tests missing and malformed inputs fail their parts instead of the run"""
+    results = run_day(9, (1, 2), str(tmp_path / 'missing'))
+    assert 2 == len(results) and all(res.error.startswith('FileNotFoundError') for res in results)
+    (tmp_path / 'input').write_text('garbage\n', encoding='utf-8')
+    results = run_day(7, (1, 2), str(tmp_path / 'input'), use_cache=False)
+    assert all(res.error.startswith('ValueError') and res.result is None for res in results)
+
+
+def test_reading_shared_failing():
+    """Tests parse errors on shared memory are reported, not hidden by views they leave behind"""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from aoc.shared import SharedInput  # pylint: disable=import-outside-toplevel
+
+    def failing(data):
+        values = np.frombuffer(data, dtype=np.uint8)
+        raise ValueError(f'malformed input of {len(values)} bytes')
+    module = days.load(9)
+    with SharedInput.from_bytes(b'1 2 x\n') as shared:
+        try:
+            with reading(module, '', shared.handle) as read:
+                failing(read())
+            assert False, 'parse error swallowed'
+        except ValueError as exc:
+            assert 'malformed input of 6 bytes' == str(exc)
+
+
+def test_reading_shared():
+    """Tests days parsing bytes get them from shared memory, others get lines"""
+    from aoc.shared import SharedInput  # pylint: disable=import-outside-toplevel
+    for day in (6, 7):
+        module = days.load(day)
+        with SharedInput.from_bytes(module.TEST_DATA.encode()) as shared:
+            with reading(module, '', shared.handle) as read:
+                assert (day == 6) == isinstance(read(), memoryview)
+                model = module.parse(read())
+            assert module.solve_01(model) == module.part_01(module.TEST_DATA.split('\n'))
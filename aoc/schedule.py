@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Run (day, part) jobs concurrently on a process pool.
+
+Jobs are submitted longest expected first, using the durations recorded by
+previous runs, and results are yielded as soon as they finish. Jobs without
+history are assumed to be slow so they start early. Every input is read once
+by the parent into shared memory, workers attach instead of reading files.
+"""
+
+import contextlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Iterator, Optional
+
+from aoc import cache, days, progress
+
+if TYPE_CHECKING:
+    from aoc.shared import SharedInput
+
+
+DURATIONS_FILE: Final[Path] = cache.CACHE_DIR / 'durations.json'
+
+
+def job_key(day: int, part: int) -> str:
+    """Key of a job in the duration history."""
+    return f'{day:02d}-{part}'
+
+
+def load_durations(filename: Path = DURATIONS_FILE) -> dict[str, float]:
+    """Recorded wall times of previous runs."""
+    try:
+        with open(filename, 'rt', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_durations(durations: dict[str, float], filename: Path = DURATIONS_FILE) -> None:
+    """Merge wall times into the recorded history."""
+    history = load_durations(filename) | durations
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    staging = filename.with_suffix(f'.tmp{os.getpid()}')
+    with open(staging, 'wt', encoding='utf-8') as file:
+        json.dump(history, file, indent=1, sort_keys=True)
+    os.replace(staging, filename)
+
+
+def order_jobs(jobs: list[tuple[int, int]], durations: dict[str, float]) -> list[tuple[int, int]]:
+    """Longest expected job first, unknown jobs before all known ones."""
+    return sorted(jobs, key=lambda job: -durations.get(job_key(*job), float('inf')))
+
+
+# --------------------------------------------------
+def run_job(day: int, part: int, pattern: str, **options):
+    """Worker side of a single job, options are passed on to run_day()."""
+    from aoc.runner import run_day  # pylint: disable=import-outside-toplevel
+    return run_day(day, (part,), pattern, **options)[0]
+
+
+def failed_job(day: int, part: int, exc: Exception):
+    """Result of a job whose worker raised or died."""
+    from aoc.runner import PartResult  # pylint: disable=import-outside-toplevel
+    return PartResult(day=day, part=part, result=None, import_time=0.0, parse_time=0.0, solve_time=0.0,
+                      wall_time=0.0, error=f'{type(exc).__name__}: {exc}')
+
+
+def share_inputs(jobs: list[tuple[int, int]], pattern: str) -> dict[int, "SharedInput"]:
+    """Put every day's input into shared memory once, missing files are left to the jobs to report."""
+    from aoc.shared import SharedInput  # pylint: disable=import-outside-toplevel
+    inputs = {}
+    for day in sorted({day for day, _ in jobs}):
+        try:
+            inputs[day] = SharedInput.create(str(days.input_path(day, pattern)))
+        except OSError:
+            continue
+    return inputs
+
+
+def run_parallel(jobs: list[tuple[int, int]], pattern: str, workers: Optional[int] = None,
+                 history: Path = DURATIONS_FILE, **options) -> Iterator:
+    """Run jobs on a process pool and yield their results in order of completion.
+
+    Options like 'use_cache' or 'track_memory' are passed on to run_day().
+    Jobs raising in their worker are yielded as failed results. Progress of the workers is shown combined, if progress is on."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed  # pylint: disable=import-outside-toplevel
+    durations = load_durations(history)
+    finished: dict[str, float] = {}
+
+    inputs = share_inputs(jobs, pattern)
+    monitor = progress.Monitor() if progress.enabled() else None
+    hooks = {'initializer': progress.attach, 'initargs': (monitor.queue,)} if monitor else {}
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if monitor:
+                stack.enter_context(monitor)  # closed after the pool, it gets the last counts
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers, **hooks))
+            futures = {pool.submit(run_job, day, part, pattern,
+                                   shared=inputs[day].handle if day in inputs else None, **options): (day, part)
+                       for day, part in order_jobs(jobs, durations)}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    result = failed_job(*futures[future], exc)
+                if not result.cached and result.error is None:
+                    finished[job_key(result.day, result.part)] = result.wall_time
+                yield result
+    finally:
+        for shared in inputs.values():  # workers are gone, segments can go as well
+            shared.close()
+        if finished:
+            store_durations(finished, history)
+
+
+# --------------------------------------------------
+def test_order_jobs():
+    """Tests longest expected jobs come first"""
+    durations = {'05-2': 9.0, '01-1': 0.1, '05-1': 0.5}
+    assert [(3, 1), (5, 2), (5, 1), (1, 1)] == order_jobs([(1, 1), (5, 1), (3, 1), (5, 2)], durations)
+
+
+def test_run_parallel(tmp_path):
+    """Tests jobs run on a pool and durations get recorded"""
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    for day in (6, 9):
+        (tmp_path / f'{day}').write_text(days.load(day).TEST_DATA, encoding='utf-8')
+    results = list(run_parallel([(6, 1), (6, 2), (9, 1), (9, 2)], str(tmp_path / '{day}'), workers=2,
+                                use_cache=False, history=tmp_path / 'durations.json'))
+    assert {(6, 1, '288'), (6, 2, '71503'), (9, 1, '114'), (9, 2, '2')} == {(r.day, r.part, r.result) for r in results}
+    assert 4 == len(load_durations(tmp_path / 'durations.json'))
+
+
+def test_run_parallel_failing(tmp_path):
+    """Tests failing jobs are reported instead of ending the run"""
+    results = list(run_parallel([(6, 1), (99, 1)], str(tmp_path / 'missing{day}'), workers=1, use_cache=False,
+                                history=tmp_path / 'durations.json'))
+    assert {(6, 'FileNotFoundError'), (99, 'ValueError')} == {(res.day, res.error.split(':')[0]) for res in results}
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Zero-copy input buffers shared between the runner and its workers.
+
+The parent reads each input once into one shared memory segment laid out as
+
+    line count (int64) | line start offsets (int64, count + 1) | raw bytes
+
+and hands workers a tiny picklable handle. Workers attach to the segment and
+get read-only views on bytes and offsets, nothing is copied until lines are
+actually decoded, so attaching costs the same for any input size.
+"""
+
+import hashlib
+import multiprocessing
+from array import array
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Final, Iterator, Optional
+
+from aoc.inputs import read_bytes
+
+
+OFFSET: Final[str] = 'q'
+
+OFFSET_SIZE: Final[int] = array(OFFSET).itemsize
+
+
+@dataclass(frozen=True)
+class SharedInputHandle:
+    """Everything a worker needs to attach, cheap to pickle."""
+    name: str
+    size: int
+    lines: int
+    input_hash: str
+
+
+class SharedInput:
+    """Input bytes and line offsets in one shared memory segment."""
+    def __init__(self, memory: shared_memory.SharedMemory, handle: SharedInputHandle, owner: bool) -> None:
+        self.memory = memory
+        self.handle = handle
+        self.owner = owner
+        header = OFFSET_SIZE * (handle.lines + 2)
+        self.view = memory.buf.toreadonly()
+        self.offsets = self.view[OFFSET_SIZE:header].cast(OFFSET)
+        self.buffer = self.view[header:header + handle.size]
+
+    @staticmethod
+    def create(filename: str) -> "SharedInput":
+        """Load file once into a new segment, owned by the caller, compressed files decoded."""
+        return SharedInput.from_bytes(read_bytes(filename))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "SharedInput":
+        """Copy bytes into a new segment and index its lines."""
+        offsets = array(OFFSET, [0])
+        position = data.find(b'\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = data.find(b'\n', position + 1)
+        if offsets[-1] != len(data):  # last line without newline
+            offsets.append(len(data))
+        lines = len(offsets) - 1
+
+        header = OFFSET_SIZE * (lines + 2)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, header + len(data)))
+        memory.buf[:OFFSET_SIZE] = array(OFFSET, [lines]).tobytes()
+        memory.buf[OFFSET_SIZE:header] = offsets.tobytes()
+        memory.buf[header:header + len(data)] = data
+
+        handle = SharedInputHandle(name=memory.name, size=len(data), lines=lines,
+                                   input_hash=hashlib.sha256(data).hexdigest())
+        return SharedInput(memory, handle, owner=True)
+
+    @staticmethod
+    def attach(handle: SharedInputHandle) -> "SharedInput":
+        """Map an existing segment in a worker."""
+        memory = shared_memory.SharedMemory(name=handle.name)
+        if multiprocessing.get_start_method() == 'spawn':
+            # spawned workers run their own tracker, which would unlink the parent's segment on exit
+            resource_tracker.unregister(memory._name, 'shared_memory')  # pylint: disable=protected-access
+        return SharedInput(memory, handle, owner=False)
+
+    def line(self, index: int) -> memoryview:
+        """Raw bytes of a line including its newline."""
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]]
+
+    def iter_lines(self) -> Iterator[str]:
+        """Decode lines one by one, without newline."""
+        for index in range(self.handle.lines):
+            yield str(self.line(index), 'utf-8').rstrip('\r\n')
+
+    def lines(self) -> list[str]:
+        """All lines decoded, the representation the day parsers expect."""
+        return list(self.iter_lines())
+
+    def array(self, dtype: Optional[str] = 'uint8'):
+        """Numpy view on the raw bytes, without copying, has to be dropped before close()."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        return np.frombuffer(self.buffer, dtype=dtype)
+
+    def close(self) -> None:
+        """Release views, the owner also frees the segment.
+
+        Views still exported, like arrays held by the traceback of a failed
+        parse, keep the segment mapped until they are dropped, unlinking it
+        works regardless."""
+        try:
+            self.offsets.release()
+            self.buffer.release()
+            self.view.release()
+            self.memory.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self) -> "SharedInput":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+# --------------------------------------------------
+def count_lines(handle: SharedInputHandle) -> tuple[int, int]:
+    """Worker side of the test below."""
+    with SharedInput.attach(handle) as shared:
+        return len(shared.lines()), len(shared.line(1))
+
+
+def test_shared_input():
+    """Tests lines and offsets survive the trip to a worker"""
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    with SharedInput.from_bytes(b'0 3 6\n1 3 6 10\nlast') as shared:
+        assert ['0 3 6', '1 3 6 10', 'last'] == shared.lines()
+        assert b'last' == bytes(shared.line(2))
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            assert (3, 9) == pool.submit(count_lines, shared.handle).result()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Cold start times per day and a budget for them.
+
+Usage  : python -m aoc startup [DAY ...] [--repeat N] [--budget [DAY=]TIME ...] [--json]
+
+Every day is started in fresh interpreters the way the runner does it, import
+of the tooling, import of the day's module and solving both parts of its test
+input without cache, and the fastest start counts. One extra start with
+'-X importtime' splits it up: the interpreter itself, the tooling, the day
+and solving, with the heaviest packages the day pulls in. Heavy dependencies
+like numpy belong inside the functions needing them, so a day only pays for
+them when it actually uses them, which small inputs should not.
+
+Budgets are like '50ms' or '0.05' seconds, for all days or one ('9=200ms').
+Note PYTHONDONTWRITEBYTECODE makes every start compile all sources again.
+"""
+
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Final, Optional
+
+from aoc import ROOT
+
+
+DEFAULT_BUDGET: Final[float] = 0.1  # seconds, interpreter included
+
+DURATION_REGEX: Final[re.Pattern] = re.compile(r'^(\d+(?:\.\d+)?)\s*(ms|s)?$', re.IGNORECASE)
+
+IMPORT_REGEX: Final[re.Pattern] = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+MARKER: Final[str] = '@aoc-day'  # stderr lines around loading and solving the day, it is no regular import
+
+HEAVIEST: Final[int] = 3
+
+
+@dataclass
+class Imported:
+    """Line of '-X importtime' output, times in seconds."""
+    name: str
+    depth: int
+    own: float
+    cumulative: float
+
+
+@dataclass
+class StartupReport:
+    """Cold start of one day, times in seconds."""
+    day: int
+    wall: float  # fastest start, interpreter included
+    interpreter: float
+    tooling: float  # import of the runner and the shared package
+    module: float  # import of the day's module
+    solve: float = 0.0  # parse and solve of the day's test input
+    heaviest: list[dict] = field(default_factory=list)  # packages imported by the day
+    budget: Optional[float] = None
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the start took longer than allowed."""
+        return self.budget is not None and self.wall > self.budget
+
+    def as_dict(self) -> dict:
+        """Plain representation for json reports."""
+        return asdict(self) | {'over_budget': self.over_budget}
+
+
+# --------------------------------------------------
+def startup_code(day: Optional[int], filename: str = '') -> str:
+    """What a cold start of a day on an input file executes, nothing for the bare interpreter."""
+    if day is None:
+        return 'pass'
+    return (f'import sys, time; import aoc.runner; from aoc import days; print("{MARKER}", file=sys.stderr); '
+            f'begin = time.perf_counter(); days.load({day}); '
+            f'print("{MARKER} load", time.perf_counter() - begin, file=sys.stderr); '
+            f'begin = time.perf_counter(); aoc.runner.run_day({day}, (1, 2), {filename!r}, use_cache=False); '
+            f'print("{MARKER} solve", time.perf_counter() - begin, file=sys.stderr)')
+
+
+def write_test_input(day: int, directory: str) -> str:
+    """Write the test input of a day into directory, the file to start with."""
+    from aoc import days  # pylint: disable=import-outside-toplevel
+    filename = f'{directory}/{day:02d}.txt'
+    with open(filename, 'wt', encoding='utf-8') as file:
+        file.write(days.load(day).TEST_DATA + '\n')
+    return filename
+
+
+def start(day: Optional[int], importtime: bool = False, filename: str = '') -> tuple[float, str]:
+    """Wall time and stderr of one fresh interpreter."""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', startup_code(day, filename)]
+    begin = time.perf_counter()
+    process = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=False)
+    wall = time.perf_counter() - begin
+    if process.returncode:
+        raise RuntimeError(f'start of day {day} failed: {process.stderr.strip().splitlines()[-1:]}')
+    return wall, process.stderr
+
+
+def fastest(day: Optional[int], repeat: int, filename: str = '') -> float:
+    """Fastest of some starts, after one to warm up file system and bytecode caches."""
+    start(day, filename=filename)
+    return min(start(day, filename=filename)[0] for _ in range(repeat))
+
+
+def parse_importtime(output: str) -> tuple[list[Imported], list[Imported], dict[str, float]]:
+    """Imports listed by '-X importtime' before and since loading the day, and how long its steps took.
+
+    Children come before their parent."""
+    sections: list[list[Imported]] = [[]]
+    steps: dict[str, float] = {}
+    for line in output.splitlines():
+        if line.startswith(MARKER):
+            words = line.split()
+            if len(words) > 2:
+                steps[words[1]] = float(words[2])
+            if len(sections) == 1:
+                sections.append([])
+        elif match := IMPORT_REGEX.match(line):
+            sections[-1].append(Imported(name=match.group(4), depth=len(match.group(3)) // 2,
+                                         own=int(match.group(1)) / 1e6, cumulative=int(match.group(2)) / 1e6))
+    return sections[0], sections[1] if len(sections) > 1 else [], steps
+
+
+def heaviest(imports: list[Imported], limit: int = HEAVIEST) -> list[dict]:
+    """Top level packages taking longest, by summed own time of their modules."""
+    packages: dict[str, float] = {}
+    for entry in imports:
+        package = entry.name.split('.')[0]
+        packages[package] = packages.get(package, 0.0) + entry.own
+    ranked = sorted(packages.items(), key=lambda item: -item[1])[:limit]
+    return [{'package': package, 'time': seconds} for package, seconds in ranked]
+
+
+def measure(day: int, repeat: int = 5, interpreter: Optional[float] = None,
+            budget: Optional[float] = None) -> StartupReport:
+    """Cold start of a day on its test input and where its time goes."""
+    interpreter = fastest(None, repeat) if interpreter is None else interpreter
+    with tempfile.TemporaryDirectory() as directory:
+        filename = write_test_input(day, directory)
+        wall = fastest(day, repeat, filename)
+        tooling, pulled_in, steps = parse_importtime(start(day, importtime=True, filename=filename)[1])
+    return StartupReport(day=day, wall=wall, interpreter=interpreter,
+                         tooling=sum(entry.cumulative for entry in tooling if entry.depth == 0 and entry.name.startswith('aoc')),
+                         module=steps.get('load', 0.0), solve=steps.get('solve', 0.0), heaviest=heaviest(pulled_in),
+                         budget=budget)
+
+
+# --------------------------------------------------
+def parse_duration(text: str) -> float:
+    """Turn '50ms', '0.05s' or '0.05' into seconds."""
+    match = DURATION_REGEX.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid duration {text}")
+    return float(match.group(1)) / (1000 if (match.group(2) or '').lower() == 'ms' else 1)
+
+
+def parse_budgets(specs: list[str]) -> dict[Optional[int], float]:
+    """Budgets per day from 'TIME' (all days, key None) or 'DAY=TIME' entries."""
+    budgets: dict[Optional[int], float] = {}
+    for spec in specs:
+        day, _, duration = spec.rpartition('=')
+        budgets[int(day) if day else None] = parse_duration(duration)
+    return budgets
+
+
+def format_human(reports: list[StartupReport]) -> str:
+    """Render startup reports, one line per day."""
+    lines = []
+    for report in reports:
+        packages = ', '.join(f"{entry['package']} {entry['time'] * 1e3:.1f}ms" for entry in report.heaviest)
+        verdict = f'  OVER BUDGET {report.budget * 1e3:.0f}ms' if report.over_budget else ''
+        lines.append(f'day {report.day:02d}: {report.wall * 1e3:6.1f}ms  (python {report.interpreter * 1e3:.1f}ms'
+                     f', tooling {report.tooling * 1e3:.1f}ms, day {report.module * 1e3:.1f}ms'
+                     f', solve {report.solve * 1e3:.1f}ms'
+                     f'{": " + packages if packages else ""}){verdict}')
+    return '\n'.join(lines)
+
+
+# --------------------------------------------------
+def test_parse_importtime():
+    """Tests nesting of imports"""
+    output = '\n'.join(['import time: self [us] | cumulative | imported package',
+                        'import time:        10 |         10 |   _ast',
+                        'import time:        20 |         30 | aoc.runner',
+                        MARKER,
+                        'import time:        50 |         50 | re',
+                        f'{MARKER} load 0.001',
+                        'import time:       300 |        300 |   numpy.core',
+                        'import time:       100 |        400 | numpy',
+                        f'{MARKER} solve 0.002'])
+    tooling, pulled_in, steps = parse_importtime(output)
+    assert ['_ast', 'aoc.runner'] == [entry.name for entry in tooling] and {'load': 0.001, 'solve': 0.002} == steps
+    assert 1 == pulled_in[1].depth and abs(pulled_in[2].cumulative - 400e-6) < 1e-12
+    assert ['numpy', 're'] == [entry['package'] for entry in heaviest(pulled_in, limit=2)]
+
+
+def test_budgets():
+    """Tests budget specs"""
+    assert {None: 0.05, 9: 0.2} == parse_budgets(['50ms', '9=0.2'])
+    assert 1.5 == parse_duration('1.5s')
+
+
+def test_measure():
+    """Tests a real cold start gets split up"""
+    report = measure(6, repeat=1)
+    assert report.wall > report.interpreter > 0 and report.tooling > 0 and report.module > 0 and report.solve > 0
+    assert 'numpy' not in [entry['package'] for entry in report.heaviest]
+    assert not report.over_budget and 'day 06' in format_human([report])
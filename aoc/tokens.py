@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+Purpose: Bulk integer tokenizer for the number list puzzles.
+
+All integers of an input are pulled out of its bytes in one vectorized pass,
+without creating a string per token. The result is a flat int64 array of
+values plus line offsets, the integers of line i are values[offsets[i]:offsets[i + 1]].
+A '-' directly in front of digits makes a number negative.
+
+Inputs up to PURE_BYTES are tokenized with regular expressions into plain
+int64 arrays of the standard library instead, as long as numpy has not been
+imported yet, importing it takes far longer than tokenizing them. Both kinds
+of arrays offer slicing and tolist(), groups() hands out nested lists for them.
+Integers beyond MAX_DIGITS digits do not fit into int64, inputs holding any
+take the standard library path and get exact python ints in a list instead.
+"""
+
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final, Iterable, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+MAX_DIGITS: Final[int] = 18  # always fits into int64, longer integers are kept exact
+
+PURE_BYTES: Final[int] = 32 * 2 ** 10
+
+NUMBER_REGEX: Final[re.Pattern] = re.compile(rb'\d+')
+
+SIGNED_NUMBER_REGEX: Final[re.Pattern] = re.compile(rb'-?\d+')
+
+TOO_LONG_REGEX: Final[re.Pattern] = re.compile(rb'\d{%d}' % (MAX_DIGITS + 1))
+
+# everything but digits (and minus signs) becomes a separator
+UNSIGNED: Final[bytes] = bytes(byte if chr(byte).isdigit() and byte < 128 else ord(' ') for byte in range(256))
+
+SIGNED: Final[bytes] = bytes(byte if byte == ord('-') else UNSIGNED[byte] for byte in range(256))
+
+DASH_REGEX: Final[re.Pattern] = re.compile(rb'-(?!\d)')
+
+
+class ExactValues(list):
+    """Python ints beyond int64, offering what tokens get used with of arrays."""
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        return ExactValues(item) if isinstance(index, slice) else item
+
+    def tolist(self) -> list[int]:
+        """Plain list of the integers."""
+        return list(self)
+
+
+@dataclass
+class Tokens:
+    """Integers of an input and where every line's integers start, numpy or standard library arrays."""
+    values: Union["np.ndarray", array, ExactValues]
+    offsets: Union["np.ndarray", array]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def line(self, index: int) -> "np.ndarray":
+        """Integers of a line, as view."""
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    def counts(self) -> Union["np.ndarray", array]:
+        """Amount of integers per line."""
+        if isinstance(self.offsets, array):
+            return array('q', [stop - start for start, stop in zip(self.offsets, self.offsets[1:])])
+        return self.offsets[1:] - self.offsets[:-1]
+
+    def table(self, start: int = 0, stop: Optional[int] = None) -> "np.ndarray":
+        """Lines [start, stop) as 2d array, they need to hold equally many integers."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        stop = len(self) if stop is None else stop
+        counts = np.asarray(self.counts()[start:stop])
+        if len(counts) and (counts != counts[0]).any():
+            raise ValueError("lines hold different amounts of integers")
+        return np.asarray(self.values[self.offsets[start]:self.offsets[stop]]).reshape(stop - start, -1)
+
+    def rows(self) -> list[list[int]]:
+        """Integers of every line as lists."""
+        values = self.values.tolist()
+        return [values[start:stop] for start, stop in zip(self.offsets.tolist(), self.offsets[1:].tolist())]
+
+    def groups(self) -> dict[int, Any]:
+        """Non-empty lines stacked into one 2d array per amount of integers, lists of rows for small inputs."""
+        if isinstance(self.values, (array, ExactValues)):
+            rows: dict[int, list[list[int]]] = {}
+            for row in self.rows():
+                if row:
+                    rows.setdefault(len(row), []).append(row)
+            return dict(sorted(rows.items()))
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        counts = self.counts()
+        groups = {}
+        for count in np.unique(counts[counts > 0]).tolist():
+            starts = self.offsets[:-1][counts == count]
+            groups[count] = self.values[starts[:, None] + np.arange(count)]
+        return groups
+
+
+# --------------------------------------------------
+def tokenize(data: Union[bytes, str, Iterable[str]], negative: bool = True, pure: Optional[bool] = None) -> Tokens:
+    """Every integer of an input, given as bytes, text or lines.
+
+    'pure' forces or rules out the standard library path, by default inputs up to
+    PURE_BYTES take it unless numpy is imported already."""
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = list(data)
+    size = len(data) if isinstance(data, (bytes, bytearray, memoryview)) else sum(map(len, data)) + len(data)
+    if pure or (pure is None and size <= PURE_BYTES and 'numpy' not in sys.modules):
+        if isinstance(data, list):
+            return tokenize_lines([line.encode('ascii') for line in data], negative)
+        lines = bytes(data).split(b'\n')
+        return tokenize_lines(lines[:-1] if lines[-1] == b'' else lines, negative)
+
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        lines = int((buffer == 10).sum()) + int(len(buffer) > 0 and buffer[-1] != 10)
+    else:
+        buffer = np.frombuffer('\n'.join(data).encode('ascii'), dtype=np.uint8)
+        lines = len(data)
+
+    # runs of digits locate the integers, numpy's own text parser reads them
+    digit = (buffer >= ord('0')) & (buffer <= ord('9'))
+    edges = np.diff(digit.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) and (ends - starts).max() > MAX_DIGITS:
+        return tokenize(data, negative, pure=True)
+
+    if len(starts):
+        text = buffer.tobytes().translate(SIGNED if negative else UNSIGNED)
+        if negative and b'-' in text:
+            text = DASH_REGEX.sub(b' ', text).replace(b'-', b' -')  # lone dashes go, dashes after digits split
+        values = np.fromstring(text, dtype=np.int64, sep=' ')
+        if len(values) != len(starts):
+            raise ValueError("unexpected integer syntax")
+    else:
+        values = np.zeros(0, dtype=np.int64)
+
+    line_of_run = np.searchsorted(np.flatnonzero(buffer == 10), starts)
+    offsets = np.searchsorted(line_of_run, np.arange(lines + 1))
+    return Tokens(values=values, offsets=offsets)
+
+
+def tokenize_lines(lines: list[bytes], negative: bool = True) -> Tokens:
+    """Standard library path of tokenize(), for small inputs."""
+    regex = SIGNED_NUMBER_REGEX if negative else NUMBER_REGEX
+    values: Union[array, ExactValues] = array('q')
+    offsets = array('q', [0])
+    for line in lines:
+        if isinstance(values, array) and TOO_LONG_REGEX.search(line):
+            values = ExactValues(values)
+        values.extend(map(int, regex.findall(line)))
+        offsets.append(len(values))
+    return Tokens(values=values, offsets=offsets)
+
+
+def first_line(data: Union[bytes, str, Iterable[str]]) -> str:
+    """First non-blank line of an input given as bytes, text or lines, the rest is not decoded."""
+    if isinstance(data, str):
+        data = data.splitlines()
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        view, start = memoryview(data), 0
+        while start < len(view):
+            end = start
+            while end < len(view) and view[end] != 10:
+                end += 1
+            if bytes(view[start:end]).strip():
+                return str(view[start:end], 'ascii').strip()
+            start = end + 1
+        return ''
+    return next((line.strip() for line in data if line.strip()), '')
+
+
+# --------------------------------------------------
+def test_tokenize():
+    """Tests integers, signs and line offsets, with and without numpy"""
+    for pure in (False, True):
+        tokens = tokenize(b'Card 1: 41 48 | 83\n\nx-5 10 --0 3-4 123456789012345678\n', pure=pure)
+        assert 3 == len(tokens)
+        assert [[1, 41, 48, 83], [], [-5, 10, 0, 3, -4, 123456789012345678]] == tokens.rows()
+        assert [4, 0, 6] == tokens.counts().tolist()
+        assert {4: [[1, 41, 48, 83]], 6: [[-5, 10, 0, 3, -4, 123456789012345678]]} == {
+            count: list(map(list, group)) for count, group in tokens.groups().items()}
+        assert [[1, 3, 4]] == tokenize('1-3 -4', negative=False, pure=pure).rows()
+
+
+def test_tokenize_exact():
+    """Tests integers beyond int64 are kept exact on both paths"""
+    for pure in (False, True):
+        tokens = tokenize(b'1 2\n-10000000000000000000 3\n', pure=pure)
+        assert isinstance(tokens.values, ExactValues) and [-10 ** 19, 3] == tokens.line(1).tolist()
+        assert {2: [[1, 2], [-10 ** 19, 3]]} == tokens.groups() and [2, 2] == tokens.counts().tolist()
+
+
+def test_tokenize_lines():
+    """Tests lines given as list, empty lines included"""
+    for pure in (False, True):
+        tokens = tokenize(['1 2', '3 4', ''], pure=pure)
+        assert [[1, 2], [3, 4]] == tokens.table(0, 2).tolist() and 3 == len(tokens)
+        assert [] == tokenize('', pure=pure).rows()
+
+
+def test_first_line():
+    """Tests the first line is found in any representation"""
+    assert ['a 1', 'a 1', 'a 1', ''] == [first_line(data) for data in (b'\n a 1\nb', memoryview(b'a 1\r\n'),
+                                                                       ['', 'a 1'], '')]
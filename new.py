@@ -81,6 +81,7 @@ def main() -> None:
         subprocess.run(['chmod', '+x', program], check=True)
 
     print(f'Done, see new script "{program}."')
+    print(f'It is picked up by "python -m aoc run {args.day}" and "python -m aoc bench {args.day}".')
 
 
 # --------------------------------------------------
@@ -98,50 +99,97 @@ Date   : {today}
 Purpose: Solves day {args.day:02d} from advent of code 2023.
 \"\"\"
 
-from typing import Final
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Final, Iterable, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # shared 'aoc' package, also when run as script
+from aoc.inputs import open_input  # noqa: E402  pylint: disable=wrong-import-position
+
+
+PARSER_VERSION: Final = 1  # bump whenever parse() or its model changes
+
+BENCH_SIZES: Final = (1, 10, 100, 1000)  # input scale factors for 'python -m aoc bench'
 
 
-TEST_DATA: Final = [
-    ""
-]
+TEST_DATA: Final = \"\"\"\"\"\"
 
 
 # --------------------------------------------------
-def load_data(filename: str):
-    with open(filename, 'rt', encoding='utf-8') as file:
-        return file.readlines()
+def iter_lines(filename: str) -> Iterator[str]:
+    \"\"\"Stream input lines without line endings, compressed inputs decoded on the fly.\"\"\"
+    with open_input(filename) as file:
+        for line in file:
+            yield line.rstrip('\\n')
+
+
+def load_data(filename: str) -> list[str]:
+    \"\"\"Load input lines.\"\"\"
+    return list(iter_lines(filename))
+
+
+def parse(lines: Iterable[str]) -> list[str]:
+    \"\"\"Parse input once for both parts, in a single pass over the lines.\"\"\"
+    return [line for line in lines if line]
+
+
+def solve_01(model) -> str:
+    \"\"\"Solves part 01 on parsed model.\"\"\"
+    return ''
+
+
+def solve_02(model) -> str:
+    \"\"\"Solves part 02 on parsed model.\"\"\"
+    return ''
+
+
+def solve_both(model) -> tuple[str, str]:
+    \"\"\"Solves both parts on parsed model.\"\"\"
+    return solve_01(model), solve_02(model)
 
 
 def part_01(data) -> str:
     \"\"\"Solves part 01\"\"\"
-    return ''
-    
+    return solve_01(parse(data))
+
 
 def part_02(data) -> str:
-    \"\"\"solves part 02\"\"\"
-    return ''
+    \"\"\"Solves part 02\"\"\"
+    return solve_02(parse(data))
+
+
+def generate_input(size: int = 1, seed: int = 0) -> tuple[list[str], dict[int, Optional[str]]]:
+    \"\"\"Seeded synthetic input, size 1 like a real input, and its answers where known.\"\"\"
+    rng = random.Random(seed)
+    lines = [str(rng.randint(1, 100)) for _ in range(100 * size)]
+    return lines, {{1: None, 2: None}}
 
 
 # --------------------------------------------------
-def test_part_01():
-    \"\"\"Tests part 01\"\"\"
-    data = TEST_DATA
-    assert '' == part_01(data)
+def test_solve_both():
+    \"\"\"Tests solving both parts on one parsed model\"\"\"
+    assert ('', '') == solve_both(parse(TEST_DATA.split('\\n')))
 
 
-def test_part_02():
-    \"\"\"Tests part 02\"\"\"
-    data = TEST_DATA
-    assert '' == part_02(data)
+def test_generate_input():
+    \"\"\"Tests solutions agree with generated answers\"\"\"
+    lines, answers = generate_input(seed=1)
+    for part, answer in zip((1, 2), solve_both(parse(lines))):
+        assert answers[part] in (None, answer)
 
 
 # --------------------------------------------------
 def main() -> None:
     \"\"\"Main wrapper.\"\"\"
-    data = load_data('./input')
-    print(part_01(data))
-    print(part_02(data))
- 
+    start = time.perf_counter()
+    model = parse(iter_lines(sys.argv[1] if len(sys.argv) > 1 else './{args.day:02d}/input'))
+    parsed = time.perf_counter()
+    for answer in solve_both(model):
+        print(answer)
+    print(f'parse {{parsed - start:.3f}}s, solve {{time.perf_counter() - parsed:.3f}}s', file=sys.stderr)
+
 
 if __name__ == '__main__':
     main()